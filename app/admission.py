@@ -0,0 +1,135 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+# Degradation ladder, one step per level: each level keeps the ones below it
+DEGRADATION_LEVELS = ("normal", "skip_objects", "reduced_resolution", "reject_sessions")
+
+
+class AdmissionController:
+    """Node-level session and frame budget with a graceful degradation ladder.
+
+    Frames analysed by the node are counted in one-second windows. Pressure is
+    the larger of the frame rate against ``max_fps`` and the mean analysis
+    latency against ``latency_target``. Above 1.0 the node steps one level up
+    the ladder (skip YOLO, then analyse at reduced resolution, then refuse new
+    sessions); below ``recover_below`` it steps back down. Steps are at least
+    ``min_dwell`` seconds apart so the level does not flap.
+    """
+
+    def __init__(self, max_sessions: int = 32, max_fps: float = 60.0, latency_target: float = 0.25,
+                 recover_below: float = 0.7, min_dwell: float = 2.0, window: float = 1.0):
+        self.max_sessions = max_sessions
+        self.max_fps = max_fps
+        self.latency_target = latency_target
+        self.recover_below = recover_below
+        self.min_dwell = min_dwell
+        self.window = window
+        self.level = 0
+        self.pressure = 0.0
+        self.fps = 0.0
+        self.latency = 0.0
+        self._window_start = time.monotonic()
+        self._window_frames = 0
+        self._window_seconds = 0.0
+        self._last_step = 0.0
+
+    @property
+    def level_name(self) -> str:
+        return DEGRADATION_LEVELS[self.level]
+
+    def record_frame(self, seconds: float, now: Optional[float] = None):
+        """Account one analysed frame and how long it took end to end"""
+        now = time.monotonic() if now is None else now
+        self._window_frames += 1
+        self._window_seconds += seconds
+        if now - self._window_start >= self.window:
+            self._close_window(now)
+
+    def _close_window(self, now: float):
+        elapsed = now - self._window_start
+        fps = self._window_frames / elapsed
+        latency = self._window_seconds / self._window_frames if self._window_frames else 0.0
+        # Light smoothing: one bursty window should not move the ladder on its own
+        self.fps = 0.5 * self.fps + 0.5 * fps
+        self.latency = 0.5 * self.latency + 0.5 * latency
+        self.pressure = max(self.fps / self.max_fps if self.max_fps > 0 else 0.0,
+                            self.latency / self.latency_target if self.latency_target > 0 else 0.0)
+        self._window_start, self._window_frames, self._window_seconds = now, 0, 0.0
+
+        if now - self._last_step < self.min_dwell:
+            return
+        if self.pressure > 1.0 and self.level < len(DEGRADATION_LEVELS) - 1:
+            self.level += 1
+        elif self.pressure < self.recover_below and self.level > 0:
+            self.level -= 1
+        else:
+            return
+        self._last_step = now
+        print(f"⚖️ Degradation level -> {self.level_name} (pressure {self.pressure:.2f}, "
+              f"{self.fps:.1f} fps, {self.latency * 1000:.0f} ms)")
+
+    def idle(self, now: Optional[float] = None):
+        """Let the windows close while no frames arrive, so an idle node recovers"""
+        now = time.monotonic() if now is None else now
+        if now - self._window_start >= self.window:
+            self._close_window(now)
+
+    def try_admit(self, active_sessions: int) -> Tuple[bool, str]:
+        """Whether a new session may start on this node"""
+        if active_sessions >= self.max_sessions:
+            return False, "session limit reached"
+        if self.level_name == "reject_sessions":
+            return False, "node overloaded"
+        return True, ""
+
+    def headroom(self, active_sessions: int) -> Dict:
+        """Spare capacity for load balancers"""
+        self.idle()
+        accepting = self.try_admit(active_sessions)[0]
+        return {
+            "accepting_sessions": accepting,
+            "sessions": active_sessions,
+            "max_sessions": self.max_sessions,
+            "sessions_available": max(0, self.max_sessions - active_sessions) if accepting else 0,
+            "fps": round(self.fps, 2),
+            "max_fps": self.max_fps,
+            "fps_available": round(max(0.0, self.max_fps - self.fps), 2),
+            "latency_ms": round(self.latency * 1000, 1),
+            "pressure": round(self.pressure, 3),
+            "degradation": self.level_name,
+        }
+
+
+class LatestFrameQueue:
+    """Bounded per-session inbound queue: when full, the oldest frame is dropped"""
+
+    def __init__(self, maxsize: int = 1):
+        self.maxsize = max(1, maxsize)
+        self._items = deque()
+        self._ready = asyncio.Event()
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, item: Any) -> Optional[Any]:
+        """Queue ``item``; returns the stale item it displaced, if any"""
+        dropped = self._items.popleft() if len(self._items) >= self.maxsize else None
+        self._items.append(item)
+        self._ready.set()
+        return dropped
+
+    async def get(self) -> Optional[Any]:
+        """Oldest queued item, waiting if empty; None once closed and drained"""
+        while not self._items:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        return self._items.popleft()
+
+    def close(self):
+        self._closed = True
+        self._ready.set()
@@ -0,0 +1,102 @@
+"""
+Benchmark suite: offline pipeline benchmarks plus a spawned-server load run,
+written as one JSON document and optionally checked against a baseline.
+
+    cd app
+    python -m benchmarks --output bench.json
+    python -m benchmarks --output bench.json --baseline main-bench.json --tolerance 0.1
+
+Exits with status 1 when frames/second/core drops by more than --tolerance
+relative to the baseline for any frame category or for the load run.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from argparse import Namespace
+
+from benchmarks import load, pipeline
+
+
+def environment():
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                  text=True, check=False).stdout.strip()
+    except OSError:
+        revision = ""
+    return {
+        "timestamp": time.time(),
+        "git_revision": revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def throughput_points(result):
+    """Flatten the numbers that are compared against a baseline"""
+    points = {}
+    for category, runs in result.get("end_to_end", {}).items():
+        for name, run in runs.items():
+            points[f"end_to_end.{category}.{name}"] = run["frames_per_second_per_core"]
+    if "load" in result:
+        cores = result["environment"]["cpu_count"] or 1
+        points["load.websocket"] = result["load"]["websocket"]["frames_per_second"] / cores
+    return points
+
+
+def compare(result, baseline, tolerance):
+    """List regressions beyond tolerance in frames/second/core"""
+    current, previous = throughput_points(result), throughput_points(baseline)
+    regressions = []
+    for key, old in previous.items():
+        new = current.get(key)
+        if new is not None and old > 0 and new < old * (1 - tolerance):
+            regressions.append({"metric": key, "baseline": old, "current": new, "change": new / old - 1})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    pipeline.add_arguments(parser)
+    parser.add_argument("--skip-load", action="store_true", help="Only run the offline pipeline benchmarks")
+    parser.add_argument("--ws-clients", type=int, default=8)
+    parser.add_argument("--rest-clients", type=int, default=2)
+    parser.add_argument("--load-fps", type=float, default=2.0)
+    parser.add_argument("--load-duration", type=float, default=20.0)
+    parser.add_argument("--binary", action="store_true")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Previous results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed fractional throughput drop")
+    args = parser.parse_args()
+
+    result = {"environment": environment()}
+    result.update(pipeline.run(args))
+    if not args.skip_load:
+        result["load"] = load.run(Namespace(
+            url=None, spawn=True, port=args.port, ws_clients=args.ws_clients, rest_clients=args.rest_clients,
+            fps=args.load_fps, duration=args.load_duration, binary=args.binary, frames_dir=args.frames_dir,
+            width=args.width, height=args.height,
+        ))
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            result["regressions"] = compare(result, json.load(f), args.tolerance)
+        status = 1 if result["regressions"] else 0
+
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
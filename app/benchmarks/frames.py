@@ -0,0 +1,86 @@
+"""
+Reference frame sets for the benchmarks.
+
+Frames come from ``--frames-dir`` when given, one sub-directory per category
+(``face/``, ``no_face/``, ``multiple_faces/``, ``object/``). Otherwise a set is
+generated offline: background-only frames for ``no_face`` and crops of the
+sample photos that ship with ultralytics for ``face`` / ``multiple_faces``.
+Realistic phone/book frames cannot be synthesised, so the ``object`` category
+only exists when it is supplied on disk.
+"""
+import os
+from typing import Dict, List
+
+import cv2
+import numpy as np
+
+CATEGORIES = ("face", "no_face", "multiple_faces", "object")
+
+
+def load_frames_dir(directory: str, size) -> Dict[str, List[np.ndarray]]:
+    """Read <directory>/<category>/*.jpg|png into resized BGR frames"""
+    frames = {}
+    for category in CATEGORIES:
+        category_dir = os.path.join(directory, category)
+        if not os.path.isdir(category_dir):
+            continue
+        images = []
+        for name in sorted(os.listdir(category_dir)):
+            image = cv2.imread(os.path.join(category_dir, name))
+            if image is not None:
+                images.append(cv2.resize(image, size, interpolation=cv2.INTER_AREA))
+        if images:
+            frames[category] = images
+    return frames
+
+
+def _ultralytics_asset(name: str):
+    try:
+        from ultralytics.utils import ASSETS
+    except ImportError:
+        return None
+    return cv2.imread(str(ASSETS / name))
+
+
+def generate_frames(size, count: int = 8, seed: int = 0) -> Dict[str, List[np.ndarray]]:
+    """Deterministic offline frame set"""
+    rng = np.random.default_rng(seed)
+    width, height = size
+    frames = {}
+
+    # Empty room: smooth gradient plus sensor noise, different each frame
+    gradient = np.linspace(60, 200, width, dtype=np.float32)[None, :, None].repeat(height, 0).repeat(3, 2)
+    frames["no_face"] = [
+        np.clip(gradient + rng.normal(0, 6, gradient.shape), 0, 255).astype(np.uint8) for _ in range(count)
+    ]
+
+    zidane = _ultralytics_asset("zidane.jpg")  # two people facing the camera
+    if zidane is not None:
+        h, w = zidane.shape[:2]
+        both = cv2.resize(zidane, size, interpolation=cv2.INTER_AREA)
+        # The right-hand person alone, framed like a webcam shot
+        single = cv2.resize(zidane[:, w // 2:], size, interpolation=cv2.INTER_AREA)
+        frames["face"] = [_jitter(single, rng) for _ in range(count)]
+        frames["multiple_faces"] = [_jitter(both, rng) for _ in range(count)]
+    return frames
+
+
+def _jitter(frame: np.ndarray, rng) -> np.ndarray:
+    """Small per-frame noise so change gating and caches see distinct frames"""
+    noise = rng.integers(-3, 4, frame.shape, dtype=np.int16)
+    return np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def load_reference_frames(frames_dir: str = None, size=(640, 480), count: int = 8) -> Dict[str, List[np.ndarray]]:
+    """Frames per category, from disk if available, else generated"""
+    frames = load_frames_dir(frames_dir, size) if frames_dir else {}
+    for category, generated in generate_frames(size, count).items():
+        frames.setdefault(category, generated)
+    return frames
+
+
+def encode_jpeg(frame: np.ndarray, quality: int = 80) -> bytes:
+    ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("JPEG encoding failed")
+    return encoded.tobytes()
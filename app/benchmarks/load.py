@@ -0,0 +1,143 @@
+"""
+Concurrent load against a running service: N WebSocket clients on
+/stream/{interview_id} plus M REST clients on /analyze_frame, replaying the
+reference frame set. Use --spawn to start a local uvicorn for the run.
+
+    python -m benchmarks.load --spawn --ws-clients 16 --rest-clients 4 --duration 30
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+import websockets
+
+from benchmarks.frames import encode_jpeg, load_reference_frames
+from benchmarks.stream_latency import summarize
+from frame_protocol import encode_binary_frame
+
+
+async def ws_client(url, interview_id, payloads, fps, duration, binary, latencies, errors):
+    interval = 1.0 / fps
+    try:
+        async with websockets.connect(f"{url}/stream/{interview_id}", max_size=None) as ws:
+            if binary:
+                await ws.send(json.dumps({"type": "hello", "protocol": "binary", "version": 1}))
+                binary = json.loads(await ws.recv()).get("protocol") == "binary"
+            deadline = time.perf_counter() + duration
+            seq = 0
+            while time.perf_counter() < deadline:
+                jpeg = payloads[seq % len(payloads)]
+                sent = time.perf_counter()
+                if binary:
+                    await ws.send(encode_binary_frame(jpeg, seq, time.time() * 1000))
+                else:
+                    await ws.send(json.dumps({"image": base64.b64encode(jpeg).decode(), "seq": seq,
+                                              "timestamp": time.time() * 1000}))
+                seq += 1
+                while json.loads(await ws.recv()).get("type") != "events":
+                    pass
+                latencies.append(time.perf_counter() - sent)
+                await asyncio.sleep(max(0.0, interval - (time.perf_counter() - sent)))
+    except Exception as e:
+        errors.append(f"{interview_id}: {e}")
+
+
+async def rest_client(url, payloads, fps, duration, latencies, errors):
+    interval = 1.0 / fps
+    async with httpx.AsyncClient(base_url=url, timeout=60.0) as client:
+        deadline = time.perf_counter() + duration
+        index = 0
+        while time.perf_counter() < deadline:
+            body = {"image": base64.b64encode(payloads[index % len(payloads)]).decode()}
+            index += 1
+            sent = time.perf_counter()
+            response = await client.post("/analyze_frame", json=body)
+            if response.status_code != 200:
+                errors.append(f"/analyze_frame {response.status_code}")
+            else:
+                latencies.append(time.perf_counter() - sent)
+            await asyncio.sleep(max(0.0, interval - (time.perf_counter() - sent)))
+
+
+async def run_load(args, payloads):
+    ws_url = args.url.replace("http", "ws", 1)
+    ws_latencies, rest_latencies, errors = [], [], []
+    tasks = [ws_client(ws_url, f"load_{i}", payloads, args.fps, args.duration, args.binary, ws_latencies, errors)
+             for i in range(args.ws_clients)]
+    tasks += [rest_client(args.url, payloads, args.fps, args.duration, rest_latencies, errors)
+              for _ in range(args.rest_clients)]
+    start = time.perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    return {
+        "ws_clients": args.ws_clients,
+        "rest_clients": args.rest_clients,
+        "target_fps_per_client": args.fps,
+        "protocol": "binary" if args.binary else "json",
+        "websocket": dict(summarize(ws_latencies), frames_per_second=len(ws_latencies) / elapsed),
+        "analyze_frame": dict(summarize(rest_latencies), frames_per_second=len(rest_latencies) / elapsed),
+        "errors": errors[:20],
+        "error_count": len(errors),
+    }
+
+
+def spawn_server(port, env_overrides=None):
+    """Start uvicorn in a subprocess and wait until /ready reports the models warm"""
+    env = dict(os.environ, **(env_overrides or {}))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 300
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit("Service exited during startup")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/ready", timeout=1.0).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise SystemExit("Service did not become ready in time")
+
+
+def run(args):
+    frames = load_reference_frames(args.frames_dir, (args.width, args.height))
+    payloads = [encode_jpeg(frame) for images in frames.values() for frame in images]
+    server = None
+    if args.spawn:
+        server = spawn_server(args.port)
+        args.url = f"http://127.0.0.1:{args.port}"
+    try:
+        return asyncio.run(run_load(args, payloads))
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+def add_arguments(parser):
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--spawn", action="store_true", help="Start a local service for the run")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ws-clients", type=int, default=8)
+    parser.add_argument("--rest-clients", type=int, default=2)
+    parser.add_argument("--fps", type=float, default=2.0, help="Target frames per second per client")
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--binary", action="store_true")
+    parser.add_argument("--frames-dir")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    print(json.dumps(run(parser.parse_args()), indent=2))
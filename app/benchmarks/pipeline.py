@@ -0,0 +1,144 @@
+"""
+Offline latency and throughput of the analysis pipeline (no server, no webcam).
+
+* per-stage: colour conversion, FaceMesh, FaceDetection and YOLO, timed
+  inside ``FrameDetectors`` for each frame category
+* end-to-end: ``ProctoringService.analyze_frame`` with change gating off and
+  every detector on every frame, single stream and with N concurrent sessions
+
+    python -m benchmarks.pipeline --iterations 50 --sessions 8 --output pipeline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from benchmarks.frames import load_reference_frames
+from benchmarks.stream_latency import summarize
+
+
+def configure_full_pipeline(args):
+    """Every detector on every frame, no change gating: worst-case, repeatable numbers"""
+    os.environ["FRAME_GATE_THRESHOLD"] = "0"
+    os.environ["FACE_MESH_FPS"] = "0"
+    os.environ["FACE_DETECTION_FPS"] = "0"
+    os.environ["OBJECT_DETECTION_FPS"] = "0"
+    os.environ["INFERENCE_MODE"] = args.mode
+    os.environ["INFERENCE_WORKERS"] = str(args.workers)
+    os.environ["INFERENCE_THREADS_PER_WORKER"] = str(args.threads)
+    if args.engine:
+        os.environ["OBJECT_ENGINE"] = args.engine
+
+
+def bench_stages(frames, iterations):
+    """Per-stage latency per category, measured directly on one FrameDetectors"""
+    from detectors import create_frame_detectors
+    from inference_pool import pin_native_threads
+
+    pin_native_threads(1)
+    detectors = create_frame_detectors(object_engine=os.getenv("OBJECT_ENGINE", "torch"))
+    results = {}
+    for category, images in frames.items():
+        stages = {}
+        roi = None
+        for i in range(iterations):
+            frame = images[i % len(images)]
+            detections = detectors.detect_faces(frame, f"stages_{category}", True, True, roi)
+            roi = detections["roi"]
+            _, yolo_seconds = detectors.detect_objects_batch_timed([frame])
+            for stage, seconds in dict(detections["timings"], yolo=yolo_seconds).items():
+                stages.setdefault(stage, []).append(seconds)
+        detectors.release_session(f"stages_{category}")
+        results[category] = {stage: summarize(values) for stage, values in stages.items()}
+    detectors.close()
+    return results
+
+
+async def bench_end_to_end(frames, iterations, sessions):
+    """analyze_frame latency and throughput, 1 session and N concurrent sessions"""
+    from proctoring_service import ProctoringService
+
+    service = ProctoringService()
+    await service.initialize()
+    results = {}
+    try:
+        for category, images in frames.items():
+            # Warm the graphs so compilation is not counted
+            await service.analyze_frame(images[0], f"warmup_{category}")
+            await service.end_session(f"warmup_{category}")
+
+            single = []
+            start = time.perf_counter()
+            for i in range(iterations):
+                frame_start = time.perf_counter()
+                await service.analyze_frame(images[i % len(images)], f"single_{category}")
+                single.append(time.perf_counter() - frame_start)
+            single_elapsed = time.perf_counter() - start
+            await service.end_session(f"single_{category}")
+
+            concurrent = []
+
+            async def run_session(index):
+                for i in range(iterations):
+                    frame_start = time.perf_counter()
+                    await service.analyze_frame(images[(i + index) % len(images)], f"load_{category}_{index}")
+                    concurrent.append(time.perf_counter() - frame_start)
+                await service.end_session(f"load_{category}_{index}")
+
+            start = time.perf_counter()
+            await asyncio.gather(*(run_session(index) for index in range(sessions)))
+            concurrent_elapsed = time.perf_counter() - start
+
+            results[category] = {
+                "single_stream": dict(summarize(single), frames_per_second=iterations / single_elapsed),
+                "concurrent": dict(summarize(concurrent), sessions=sessions,
+                                   frames_per_second=len(concurrent) / concurrent_elapsed),
+            }
+    finally:
+        await service.cleanup()
+    return results
+
+
+def run(args):
+    configure_full_pipeline(args)
+    frames = load_reference_frames(args.frames_dir, (args.width, args.height), args.count)
+    cores = os.cpu_count() or 1
+    result = {
+        "config": {"mode": args.mode, "workers": args.workers, "threads_per_worker": args.threads,
+                   "engine": os.getenv("OBJECT_ENGINE", "torch"), "resolution": [args.width, args.height],
+                   "iterations": args.iterations, "categories": {k: len(v) for k, v in frames.items()}},
+        "stages": bench_stages(frames, args.iterations),
+        "end_to_end": asyncio.run(bench_end_to_end(frames, args.iterations, args.sessions)),
+    }
+    # Throughput normalised by the cores the pool may use
+    used_cores = min(cores, args.workers * args.threads) if args.mode != "inline" else 1
+    for category in result["end_to_end"].values():
+        for run_result in category.values():
+            run_result["frames_per_second_per_core"] = run_result["frames_per_second"] / used_cores
+    return result
+
+
+def add_arguments(parser):
+    parser.add_argument("--frames-dir", help="Directory with face/ no_face/ multiple_faces/ object/ frames")
+    parser.add_argument("--count", type=int, default=8, help="Generated frames per category")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--sessions", type=int, default=4, help="Concurrent sessions for the load run")
+    parser.add_argument("--mode", default="thread", choices=("inline", "thread", "process"))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--threads", type=int, default=1, help="Native threads per worker")
+    parser.add_argument("--engine", help="OBJECT_ENGINE override (torch | onnxruntime | openvino)")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument("--output", help="Write the JSON result here as well as to stdout")
+    args = parser.parse_args()
+    output = json.dumps(run(args), indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
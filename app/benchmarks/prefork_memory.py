@@ -0,0 +1,74 @@
+"""
+Memory of the inference workers with and without pre-fork model loading.
+
+For every worker count, starts the service's inference pool in ``process``
+mode (every worker loads its own models) and in ``prefork`` mode (models
+loaded once, workers forked from the frozen parent), warms the models up
+and reports per-worker unique vs. shared resident memory. Each run is a
+separate Python process, so runs do not share anything.
+
+    cd app
+    python -m benchmarks.prefork_memory --workers 8 16 --output prefork.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+
+async def measure(mode: str, workers: int):
+    os.environ["INFERENCE_MODE"] = mode
+    os.environ["INFERENCE_WORKERS"] = str(workers)
+    from memory_usage import memory_report
+    from proctoring_service import ProctoringService
+
+    service = ProctoringService()
+    await service.initialize()
+    try:
+        report = memory_report(service.pool.worker_pids())
+    finally:
+        await service.cleanup()
+    return dict(report, mode=mode, workers=workers)
+
+
+def run_isolated(mode: str, workers: int):
+    output = subprocess.run([sys.executable, "-m", "benchmarks.prefork_memory", "--measure", mode, str(workers)],
+                            capture_output=True, text=True, check=True).stdout
+    # The service prints startup lines; the report is the last one
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[8, 16])
+    parser.add_argument("--modes", nargs="+", default=["process", "prefork"])
+    parser.add_argument("--output", help="Write the JSON results here as well")
+    parser.add_argument("--measure", nargs=2, metavar=("MODE", "WORKERS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(asyncio.run(measure(args.measure[0], int(args.measure[1])))))
+        return
+
+    results = []
+    print(f"{'mode':<8} {'workers':>7} {'RSS sum MB':>11} {'PSS sum MB':>11} "
+          f"{'unique/worker MB':>17} {'shared/worker MB':>17}")
+    for workers in args.workers:
+        for mode in args.modes:
+            result = run_isolated(mode, workers)
+            results.append(result)
+            totals = result["totals"]
+            measured = [usage for usage in result["workers"].values() if usage]
+            shared = sum(usage["shared"] for usage in measured) / max(1, len(measured))
+            print(f"{mode:<8} {workers:>7} {totals['rss_sum']:>11.0f} {totals['pss_sum']:>11.0f} "
+                  f"{totals['worker_unique_mean']:>17.0f} {shared:>17.0f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
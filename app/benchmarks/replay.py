@@ -0,0 +1,208 @@
+"""
+Replay captured /stream sessions against a running service and check its events.
+
+Captures come from a service run with STREAM_CAPTURE_DIR set (see
+stream_capture). Every replayed session opens /stream/{interview_id},
+negotiates the binary protocol and sends the recorded frames on their
+recorded schedule, scaled by --speed; --speed 0 sends each frame as soon as
+the previous one was answered. --sessions replays more sessions than were
+recorded by cycling through the recordings, each under its own interview id.
+
+For every frame that was answered when it was recorded, the event types of
+the reply are compared with the recorded ones. Timeouts and cooldowns run
+on the service's clock, so exact matches are only expected at --speed 1 on
+a node that is not degrading; the run exits with status 1 on mismatches
+unless --no-check is given. Set RESULT_CACHE_SIZE=0 on the service when
+several sessions replay the same recording, or re-sent images are answered
+from the result cache.
+
+    cd app
+    python -m benchmarks.replay captures/ --sessions 200 --speed 1 --output replay.json
+    python -m benchmarks.replay captures/ --spawn --speed 0 --no-check
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from typing import Dict, List
+
+import websockets
+
+from benchmarks.load import spawn_server
+from benchmarks.stream_latency import summarize
+from frame_protocol import encode_binary_frame
+from stream_capture import CaptureReader
+
+
+def load_recordings(directories: List[str]) -> List[Dict]:
+    """Every recorded interview: its frames (copied out of the capture) and recorded events"""
+    recordings = []
+    for directory in directories:
+        reader = CaptureReader(directory)
+        try:
+            for interview_id in reader.interviews():
+                frames = [(arrival, bytes(image), image_format)
+                          for arrival, image, image_format in reader.frames(interview_id)]
+                if frames:
+                    recordings.append({"interview_id": interview_id, "frames": frames,
+                                       "events": reader.events(interview_id)})
+        finally:
+            reader.close()
+    return recordings
+
+
+async def replay_session(url: str, interview_id: str, recording: Dict, speed: float, stats: Dict):
+    """One replayed client; frame numbers from the capture are sent as seq"""
+    frames = recording["frames"]
+    sent_at: Dict[int, float] = {}
+    answered = asyncio.Event()
+    done = asyncio.Event()
+
+    async def receive(ws):
+        try:
+            await read_replies(ws)
+        finally:
+            # A closed socket must not leave the sender waiting for a reply
+            answered.set()
+
+    async def read_replies(ws):
+        async for message in ws:
+            if isinstance(message, bytes):
+                continue
+            reply = json.loads(message)
+            if reply.get("type") == "ack" and reply.get("dropped"):
+                stats["dropped"] += 1
+                sent_at.pop(reply.get("ack"), None)
+            elif reply.get("type") == "events" and reply.get("seq") is not None:
+                seq = reply["seq"]
+                if seq in sent_at:
+                    stats["latencies"].append(time.perf_counter() - sent_at.pop(seq))
+                types = sorted(event["eventType"] for event in reply["events"])
+                stats["replayed_events"].update(types)
+                expected = recording["events"].get(seq)
+                if expected is not None:
+                    stats["compared"] += 1
+                    if sorted(expected) != types:
+                        stats["mismatches"].append({"interview_id": interview_id, "frame": seq,
+                                                    "recorded": sorted(expected), "replayed": types})
+            elif reply.get("type") == "events":
+                # Timeouts raised between frames by the session timers
+                stats["timer_events"].update(event["eventType"] for event in reply["events"])
+            elif reply.get("type") in ("error", "redirect"):
+                stats["errors"].append(f"{interview_id}: {reply}")
+                sent_at.pop(reply.get("ack"), None)
+            else:
+                continue
+            answered.set()
+            if not sent_at and done.is_set():
+                return
+
+    try:
+        async with websockets.connect(f"{url}/stream/{interview_id}", max_size=None) as ws:
+            await ws.send(json.dumps({"type": "hello", "protocol": "binary", "version": 1}))
+            while json.loads(await ws.recv()).get("type") != "hello_ack":
+                pass
+            receiver = asyncio.create_task(receive(ws))
+            start, first_arrival = time.perf_counter(), frames[0][0]
+            for seq, (arrival, image, image_format) in enumerate(frames):
+                if speed > 0:
+                    await asyncio.sleep(max(0.0, start + (arrival - first_arrival) / speed - time.perf_counter()))
+                else:
+                    answered.clear()
+                sent_at[seq] = time.perf_counter()
+                await ws.send(encode_binary_frame(image, seq, time.time() * 1000, image_format))
+                stats["sent"] += 1
+                if speed <= 0:
+                    await answered.wait()
+            done.set()
+            if sent_at:
+                # Wait for the last replies (dropped frames are acked too)
+                try:
+                    await asyncio.wait_for(asyncio.shield(receiver), timeout=30.0)
+                except asyncio.TimeoutError:
+                    stats["errors"].append(f"{interview_id}: {len(sent_at)} frames never answered")
+            receiver.cancel()
+    except Exception as e:
+        stats["errors"].append(f"{interview_id}: {e}")
+
+
+async def run_replay(args, recordings: List[Dict]) -> Dict:
+    ws_url = args.url.replace("http", "ws", 1)
+    sessions = args.sessions or len(recordings)
+    stats = {"sent": 0, "dropped": 0, "compared": 0, "latencies": [], "mismatches": [], "errors": [],
+             "replayed_events": Counter(), "timer_events": Counter()}
+    tasks = [
+        replay_session(ws_url, f"replay_{index}_{recordings[index % len(recordings)]['interview_id']}",
+                       recordings[index % len(recordings)], args.speed, stats)
+        for index in range(sessions)
+    ]
+    start = time.perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    recorded_events = Counter()
+    for index in range(sessions):
+        for types in recordings[index % len(recordings)]["events"].values():
+            recorded_events.update(types)
+    return {
+        "sessions": sessions,
+        "recordings": len(recordings),
+        "speed": args.speed,
+        "duration_s": elapsed,
+        "frames_sent": stats["sent"],
+        "frames_answered": len(stats["latencies"]),
+        "frames_dropped": stats["dropped"],
+        "frames_per_second": len(stats["latencies"]) / elapsed if elapsed else 0.0,
+        "frame_latency": summarize(stats["latencies"]),
+        "events": {
+            "frames_compared": stats["compared"],
+            "frames_mismatched": len(stats["mismatches"]),
+            "recorded": dict(recorded_events),
+            "replayed": dict(stats["replayed_events"]),
+            "timer_events": dict(stats["timer_events"]),
+            "mismatches": stats["mismatches"][:20],
+        },
+        "errors": stats["errors"][:20],
+        "error_count": len(stats["errors"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("captures", nargs="+", help="Capture directories (STREAM_CAPTURE_DIR of each worker)")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--spawn", action="store_true", help="Start a local service for the run")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sessions", type=int, default=0, help="Concurrent sessions (default: one per recording)")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = recorded pace, 2 = twice as fast, 0 = max")
+    parser.add_argument("--no-check", action="store_true", help="Report event mismatches without failing")
+    parser.add_argument("--output", help="Write the JSON results here as well")
+    args = parser.parse_args()
+
+    recordings = load_recordings(args.captures)
+    if not recordings:
+        raise SystemExit(f"No recorded sessions in {', '.join(args.captures)}")
+
+    server = None
+    if args.spawn:
+        # Recordings of one interview replayed as many must not be answered from the result cache
+        server = spawn_server(args.port, {"RESULT_CACHE_SIZE": "0", "STREAM_CAPTURE_DIR": ""})
+        args.url = f"http://127.0.0.1:{args.port}"
+    try:
+        result = asyncio.run(run_replay(args, recordings))
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=30)
+
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    return 1 if result["events"]["frames_mismatched"] and not args.no_check else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
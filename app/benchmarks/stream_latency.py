@@ -0,0 +1,133 @@
+"""
+Measure end-to-end frame latency with many /stream sockets open at once.
+
+Every simulated client opens ``/stream/{interview_id}``, sends JPEG frames at a
+fixed rate and records the time until the matching ``events`` reply arrives.
+A separate probe polls ``/health`` to show how much the event loop is blocked.
+
+Run it against a live service, once per ``INFERENCE_MODE``, and compare p99:
+
+    INFERENCE_MODE=inline uvicorn main:app --port 8000
+    python -m benchmarks.stream_latency --clients 20 --fps 2 --duration 30
+
+    INFERENCE_MODE=thread INFERENCE_WORKERS=4 uvicorn main:app --port 8000
+    python -m benchmarks.stream_latency --clients 20 --fps 2 --duration 30
+"""
+import argparse
+import asyncio
+import base64
+import json
+import time
+
+import cv2
+import httpx
+import numpy as np
+import websockets
+
+from frame_protocol import encode_binary_frame
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(values):
+    """p50/p95/p99/max in milliseconds"""
+    return {
+        "count": len(values),
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": (max(values) if values else float("nan")) * 1000,
+    }
+
+
+def load_frame(path, width, height):
+    """JPEG bytes from an image on disk, or a synthetic frame"""
+    if path:
+        frame = cv2.imread(path)
+        if frame is None:
+            raise SystemExit(f"Cannot read image {path}")
+    else:
+        rng = np.random.default_rng(0)
+        frame = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    return encoded.tobytes()
+
+
+async def run_client(url, interview_id, jpeg, fps, duration, latencies, binary=False):
+    """One simulated candidate: send a frame, wait for the reply, keep the rate"""
+    payload = base64.b64encode(jpeg).decode()
+    interval = 1.0 / fps
+    async with websockets.connect(f"{url}/stream/{interview_id}", max_size=None) as ws:
+        if binary:
+            await ws.send(json.dumps({"type": "hello", "protocol": "binary", "version": 1}))
+            binary = json.loads(await ws.recv()).get("protocol") == "binary"
+
+        seq = 0
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            sent = time.perf_counter()
+            if binary:
+                await ws.send(encode_binary_frame(jpeg, seq, time.time() * 1000))
+            else:
+                await ws.send(json.dumps({"image": payload, "seq": seq, "timestamp": time.time() * 1000}))
+            seq += 1
+            while True:
+                reply = json.loads(await ws.recv())
+                if reply.get("type") == "events":
+                    break
+            latencies.append(time.perf_counter() - sent)
+            await asyncio.sleep(max(0.0, interval - (time.perf_counter() - sent)))
+
+
+async def probe_health(http_url, duration, latencies):
+    """Poll /health to measure how long the event loop takes to answer"""
+    async with httpx.AsyncClient() as client:
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await client.get(f"{http_url}/health", timeout=30.0)
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.1)
+
+
+async def main(args):
+    jpeg = load_frame(args.image, args.width, args.height)
+    ws_url = args.url.replace("http", "ws", 1)
+    frame_latencies, health_latencies = [], []
+
+    clients = [
+        run_client(ws_url, f"bench_{i}", jpeg, args.fps, args.duration, frame_latencies, args.binary)
+        for i in range(args.clients)
+    ]
+    await asyncio.gather(probe_health(args.url, args.duration, health_latencies), *clients)
+
+    result = {
+        "clients": args.clients,
+        "protocol": "binary" if args.binary else "json",
+        "fps_per_client": args.fps,
+        "duration_s": args.duration,
+        "frames_per_second": len(frame_latencies) / args.duration,
+        "frame_latency": summarize(frame_latencies),
+        "health_latency": summarize(health_latencies),
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--fps", type=float, default=1.0)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--image", help="JPEG/PNG to send (default: synthetic noise frame)")
+    parser.add_argument("--binary", action="store_true", help="Negotiate the binary frame protocol")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    asyncio.run(main(parser.parse_args()))
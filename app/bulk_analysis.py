@@ -0,0 +1,169 @@
+"""
+Bulk analysis for one interview over plain HTTP (POST /analyze_frames/{interview_id}).
+
+Frames arrive in one request, as length-prefixed binary frames, as
+multipart image parts or as a short video clip, and per-frame results are
+streamed back as NDJSON while the rest are still being analysed. Frames are
+decoded in batches on a worker thread, one batch ahead of the analysis.
+Each batch goes through the detectors together (its YOLO runs form one
+batch, see ProctoringService.analyze_frames) and then through the same
+session pipeline (cooldowns, timeouts, tracks) as /stream frames, in upload
+order.
+"""
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from frame_protocol import FrameProtocolError, decode_image, iter_length_prefixed, parse_binary_frame
+from video_analysis import iter_video_frames
+
+
+def binary_items(body: bytes, max_frame_bytes: int, use_capture_clock: bool) -> Iterator[Dict]:
+    """Length-prefixed binary frames; the header's capture time is the frame time"""
+    for index, message in enumerate(iter_length_prefixed(body, max_frame_bytes)):
+        yield {"index": index, "binary": message, "use_capture_clock": use_capture_clock}
+
+
+def image_items(images: List[bytes], timestamps: Optional[List[float]], start_time: Optional[float],
+                sample_fps: float) -> Iterator[Dict]:
+    """Encoded images (multipart parts) with one timestamp in seconds each.
+
+    Without ``timestamps`` the images are taken as ``sample_fps`` frames a
+    second from ``start_time``; with neither, they are analysed at arrival.
+    """
+    for index, data in enumerate(images):
+        if timestamps is not None:
+            timestamp = timestamps[index]
+        elif start_time is not None:
+            timestamp = start_time + index / sample_fps
+        else:
+            timestamp = None
+        yield {"index": index, "seq": index, "timestamp": timestamp, "image": data}
+
+
+def clip_items(path: str, start_time: Optional[float], sample_fps: Optional[float]) -> Iterator[Dict]:
+    """Frames of a short clip, already decoded; times are ``start_time`` plus the clip time"""
+    for index, (seconds, frame) in enumerate(iter_video_frames(path, sample_fps=sample_fps)):
+        timestamp = start_time + seconds if start_time is not None else None
+        yield {"index": index, "seq": index, "timestamp": timestamp, "frame": frame}
+
+
+def decode_batch(items: Iterator[Dict], batch_size: int) -> List[Dict]:
+    """Take and decode the next ``batch_size`` items (runs on a worker thread)"""
+    batch = []
+    for item in items:
+        if "binary" in item:
+            try:
+                header, item["frame"] = parse_binary_frame(item.pop("binary"))
+                item["seq"] = header["seq"]
+                item["timestamp"] = header["capture_timestamp"] / 1000.0 if item["use_capture_clock"] else None
+            except FrameProtocolError as e:
+                item["frame"], item["error"] = None, str(e)
+        elif "image" in item:
+            item["frame"] = decode_image(item.pop("image"))
+        batch.append(item)
+        if len(batch) >= batch_size:
+            break
+    return batch
+
+
+async def save_upload(chunks: AsyncIterator[bytes], suffix: str, max_bytes: int) -> str:
+    """Spool an uploaded clip to a temporary file (OpenCV reads videos from paths)"""
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(f"Clip exceeds the {max_bytes} byte limit")
+                f.write(chunk)
+    except Exception:
+        os.unlink(path)
+        raise
+    return path
+
+
+def copy_upload(upload_file, suffix: str) -> str:
+    """Copy a multipart clip part to a temporary file"""
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    with os.fdopen(fd, "wb") as f:
+        upload_file.seek(0)
+        shutil.copyfileobj(upload_file, f)
+    return path
+
+
+def remove_files(paths: List[str]):
+    for path in paths:
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+async def stream_results(service, interview_id: str, items: Iterator[Dict], batch_size: int = 8,
+                         end_session: Optional[Callable[[], bool]] = None, deliver: Optional[Callable] = None,
+                         cleanup: Optional[Callable] = None) -> AsyncIterator[str]:
+    """Analyse ``items`` in order and yield one NDJSON line per frame, then a summary line.
+
+    ``end_session()`` is asked at the end whether to close the interview's session.
+    """
+    loop = asyncio.get_running_loop()
+    began = time.perf_counter()
+    frames = failed = events_total = 0
+    try:
+        # Decode the next batch on a thread while the current one is analysed
+        decoding = loop.run_in_executor(None, decode_batch, items, batch_size)
+        while True:
+            try:
+                batch = await decoding
+            except (FrameProtocolError, ValueError) as e:
+                yield json.dumps({"type": "error", "message": str(e)}) + "\n"
+                break
+            if not batch:
+                break
+            decoding = loop.run_in_executor(None, decode_batch, items, batch_size)
+
+            decoded = [item for item in batch if item["frame"] is not None]
+            if decoded:
+                received = time.perf_counter()
+                batch_events = await service.analyze_frames([item["frame"] for item in decoded], interview_id,
+                                                            [item["timestamp"] for item in decoded])
+                seconds = (time.perf_counter() - received) / len(decoded)
+                for item, events in zip(decoded, batch_events):
+                    service.admission.record_frame(seconds)
+                    item["events"] = events
+
+            for item in batch:
+                result = {"type": "frame", "index": item["index"], "seq": item.get("seq")}
+                if item["frame"] is None:
+                    failed += 1
+                    result.update(frame_processed=False, error=item.get("error", "Could not decode image"))
+                    yield json.dumps(result) + "\n"
+                    continue
+
+                events = item["events"]
+                frames += 1
+                events_total += len(events)
+                if events and deliver:
+                    deliver(interview_id, events)
+                result.update(frame_processed=True, timestamp=item["timestamp"], events=events)
+                yield json.dumps(result) + "\n"
+
+        elapsed = time.perf_counter() - began
+        yield json.dumps({
+            "type": "summary",
+            "interview_id": interview_id,
+            "frames_processed": frames,
+            "frames_failed": failed,
+            "events": events_total,
+            "elapsed": elapsed,
+            "fps": frames / elapsed if elapsed > 0 else None,
+        }) + "\n"
+    finally:
+        if end_session and end_session() and interview_id in service.sessions:
+            await service.end_session(interview_id)
+        if cleanup:
+            cleanup()
@@ -0,0 +1,89 @@
+"""
+Run several service workers on one host, each owning a share of the interviews.
+
+Every worker is its own uvicorn process on its own port with its own models
+and inference pool. Workers know each other through WORKER_NODES and
+redirect each interview to its owner (see worker_router), and keep session
+timing and cooldown state in a shared store, SQLite by default, so a
+restarted or failed-over worker continues the interviews it takes over.
+
+    cd app
+    python -m cluster --workers 4 --base-port 8001
+    python -m cluster --workers 4 --public-host proctor-1.internal --store redis://redis:6379/0
+
+Workers that exit are restarted. Across hosts, list every node's workers in
+WORKER_NODES (with --nodes) and point all of them at the same Redis store.
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+
+def worker_command(host: str, port: int) -> List[str]:
+    return [sys.executable, "-m", "uvicorn", "main:app", "--host", host, "--port", str(port)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0", help="Interface the workers listen on")
+    parser.add_argument("--public-host", default="127.0.0.1", help="Host name clients use to reach the workers")
+    parser.add_argument("--base-port", type=int, default=8001)
+    parser.add_argument("--nodes", default="", help="Comma-separated worker URLs on other hosts")
+    parser.add_argument("--store", default="sqlite:///sessions.db", help="SESSION_STORE for all workers")
+    args = parser.parse_args()
+
+    ports = [args.base_port + index for index in range(args.workers)]
+    local = [f"http://{args.public_host}:{port}" for port in ports]
+    nodes = local + [node for node in args.nodes.split(",") if node.strip()]
+    base_env = dict(os.environ, WORKER_NODES=",".join(nodes), SESSION_STORE=args.store)
+
+    processes: Dict[int, subprocess.Popen] = {}
+
+    def spawn(port: int, url: str):
+        env = dict(base_env, WORKER_SELF=url, PORT=str(port))
+        if base_env.get("STREAM_CAPTURE_DIR"):
+            # A capture directory has one writer: each worker records into its own
+            env["STREAM_CAPTURE_DIR"] = os.path.join(base_env["STREAM_CAPTURE_DIR"], str(port))
+        processes[port] = subprocess.Popen(worker_command(args.host, port), env=env)
+        print(f"🚀 Worker {url} started (pid {processes[port].pid})")
+
+    for port, url in zip(ports, local):
+        spawn(port, url)
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    try:
+        while not stopping:
+            time.sleep(1.0)
+            for port, url in zip(ports, local):
+                code = processes[port].poll()
+                if code is not None and not stopping:
+                    # Its interviews fail over to the other workers meanwhile
+                    print(f"⚠️ Worker {url} exited with {code}; restarting")
+                    spawn(port, url)
+    finally:
+        print("Stopping workers...")
+        for process in processes.values():
+            if process.poll() is None:
+                process.terminate()
+        for process in processes.values():
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import math
+import zlib
+from typing import Dict
+
+
+class DetectorScheduler:
+    """Decides which detectors run on each frame of a session.
+
+    Every detector has its own rate in runs per second (0 means every frame).
+    Runs are laid on a fixed per-session grid whose phase is derived from the
+    interview id, so with many sessions the expensive runs (YOLO, full-frame
+    face detection) are spread evenly over time instead of all landing on the
+    same tick. A frame that arrives after a missed slot triggers one run and
+    the schedule realigns to the next slot of the grid.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        self.rates = dict(rates)
+
+    def interval(self, detector: str) -> float:
+        rate = self.rates.get(detector, 0)
+        return 1.0 / rate if rate > 0 else 0.0
+
+    def new_session(self, interview_id: str, now: float) -> Dict:
+        """Create the per-session schedule with a stable, id-derived phase"""
+        phase = (zlib.crc32(interview_id.encode()) % 1000) / 1000.0
+        return {
+            "next_due": {name: now + phase * self.interval(name) for name in self.rates},
+            "runs": {name: 0 for name in self.rates},
+            "skips": {name: 0 for name in self.rates},
+        }
+
+    def due(self, schedule: Dict, detector: str, now: float) -> bool:
+        """Return True (and advance the schedule) if the detector should run now"""
+        interval = self.interval(detector)
+        if interval == 0:
+            schedule["runs"][detector] += 1
+            return True
+
+        next_due = schedule["next_due"][detector]
+        if now < next_due:
+            schedule["skips"][detector] += 1
+            return False
+
+        # Stay on the session's grid even if several slots were missed
+        schedule["next_due"][detector] = next_due + interval * (math.floor((now - next_due) / interval) + 1)
+        schedule["runs"][detector] += 1
+        return True
+
+    def force(self, schedule: Dict, detector: str):
+        """Record an out-of-schedule run (e.g. face detection after tracking loss)"""
+        schedule["runs"][detector] += 1
@@ -0,0 +1,279 @@
+import cv2
+import threading
+import time
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from face_graph_pool import FaceMeshPool
+from geometry import crop_to_frame, landmark_box, landmarks_to_array, padded_roi
+from object_engines import create_object_engine
+from preprocessing import BufferPool
+
+# One FaceMesh pool per process, shared by every inference thread in it
+_mesh_pool: Optional[FaceMeshPool] = None
+_mesh_pool_lock = threading.Lock()
+
+
+def _create_face_mesh():
+    import mediapipe as mp
+
+    return mp.solutions.face_mesh.FaceMesh(
+        static_image_mode=False,
+        max_num_faces=1,
+        refine_landmarks=True,
+        min_detection_confidence=0.6,
+        min_tracking_confidence=0.6
+    )
+
+
+def get_mesh_pool(max_size: int = 16, idle_timeout: float = 60.0) -> FaceMeshPool:
+    """Return this process's FaceMesh pool, creating it on first use"""
+    global _mesh_pool
+    with _mesh_pool_lock:
+        if _mesh_pool is None:
+            _mesh_pool = FaceMeshPool(_create_face_mesh, max_size=max_size, idle_timeout=idle_timeout)
+        return _mesh_pool
+
+
+class FrameDetectors:
+    """Holds the ML models used to analyze a frame.
+
+    Every inference worker (thread or process) owns its own instance, since
+    neither the MediaPipe graphs nor the object-detection engines are safe to
+    call from several threads at once. FaceMesh keeps per-face tracking state,
+    so its graphs are not owned by the worker but leased per session from the
+    process-wide ``FaceMeshPool``. ``detect`` only returns raw, picklable
+    detector outputs; turning them into proctoring events is left to
+    ``ProctoringService`` so that session state never leaves the event loop.
+    """
+
+    def __init__(self, object_engine: str = "torch", object_model_path: Optional[str] = None,
+                 object_confidence: float = 0.3, engine_threads: int = 1,
+                 mesh_pool_size: int = 16, mesh_idle_timeout: float = 60.0, roi_padding: float = 0.3,
+                 face_detection_width: int = 320):
+        self.object_engine_name = object_engine
+        self.object_model_path = object_model_path
+        self.object_confidence = object_confidence
+        self.engine_threads = engine_threads
+        self.mesh_pool_size = mesh_pool_size
+        self.mesh_idle_timeout = mesh_idle_timeout
+        self.roi_padding = roi_padding
+        # The face detector scales its input down to 128x128 anyway; 0 feeds it full frames
+        self.face_detection_width = face_detection_width
+        # Scratch arrays for model inputs, reused by every frame this worker processes
+        self.buffers = BufferPool()
+        self.object_engine = None
+        self.face_detector = None
+        self.mesh_pool = None
+
+    def preload(self):
+        """The part of ``load`` that forked workers can share: libraries and object-detection weights.
+
+        MediaPipe graphs start threads as soon as they are built, so they are
+        left to ``load`` in each worker after the fork.
+        """
+        import mediapipe  # noqa: F401
+
+        engine = create_object_engine(
+            self.object_engine_name, self.object_model_path, self.object_confidence, self.engine_threads
+        )
+        if engine.fork_safe and self.engine_threads == 1:
+            engine.freeze()
+            self.object_engine = engine
+        else:
+            print(f"⚠️ {self.object_engine_name} engine is loaded per worker (not fork-safe with "
+                  f"{self.engine_threads} threads)")
+        return self
+
+    def load(self):
+        """Load the object-detection engine and the MediaPipe face graphs"""
+        # Imported here so processes that never run models (the event loop in
+        # process mode, CLIs) do not pay for mediapipe at startup
+        import mediapipe as mp
+
+        # YOLOv8 through the configured backend (see object_engines), unless preloaded before a fork
+        if self.object_engine is None:
+            self.object_engine = create_object_engine(
+                self.object_engine_name, self.object_model_path, self.object_confidence, self.engine_threads
+            )
+
+        # Initialize MediaPipe face detection; face mesh graphs come from the shared pool
+        self.face_detector = mp.solutions.face_detection.FaceDetection(
+            model_selection=0,
+            min_detection_confidence=0.6
+        )
+        self.mesh_pool = get_mesh_pool(self.mesh_pool_size, self.mesh_idle_timeout)
+        return self
+
+    def warm_up(self, width: int = 640, height: int = 480, iterations: int = 2,
+                batch_size: int = 1) -> Dict[str, float]:
+        """Run every model on synthetic frames so graph setup and allocation happen before traffic.
+
+        Returns the last iteration's latency per model in seconds.
+        """
+        rng = np.random.default_rng(0)
+        frame = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        timings = {}
+        session_id = f"__warmup_{threading.get_ident()}"
+        try:
+            for _ in range(iterations):
+                start = time.perf_counter()
+                # Through the same buffers as real frames, so they are allocated here too
+                self.face_detector.process(self._detector_input(frame, {}))
+                timings["face_detection"] = time.perf_counter() - start
+                # Called directly: the cascade would skip the mesh on a frame without a face
+                start = time.perf_counter()
+                self.mesh_pool.process(session_id, self._to_rgb(frame, {}, "mesh_crop"))
+                timings["face_mesh"] = time.perf_counter() - start
+                start = time.perf_counter()
+                self.detect_objects_batch([frame] * batch_size)
+                timings["objects"] = time.perf_counter() - start
+        finally:
+            self.mesh_pool.release(session_id)
+        return timings
+
+    def detect_faces(self, frame: np.ndarray, session_id: str = "default",
+                     run_face_detection: bool = True, run_mesh: bool = True,
+                     roi: Optional[Tuple[int, int, int, int]] = None) -> Dict:
+        """Run the requested MediaPipe face stages on a BGR frame as a cascade.
+
+        ``roi`` is the padded pixel crop (x0, y0, x1, y1) that followed the
+        face on the previous frame. With one, FaceMesh only sees that crop and
+        the full frame is never converted or searched. Without one, the
+        full-frame face detector acquires the face first and the mesh runs on
+        the crop around the largest box. The detector also runs when asked to
+        (periodic multi-face check) or when the mesh loses the face inside its
+        ROI. The result's ``roi`` is the crop for the next frame, None meaning
+        re-acquire.
+
+        ``num_faces`` comes from the detector whenever it ran. A crop can only
+        show one face, so when the mesh alone tracked the face it is None and
+        the caller keeps its last full-frame count. Fields of stages that did
+        not run are None.
+        """
+        # Stage timings travel back with the result so process workers can report them
+        timings = {}
+        detections = {"num_faces": None, "face_landmarks": None, "face_detection_ran": False,
+                      "roi": roi, "timings": timings}
+        height, width = frame.shape[:2]
+        boxes = []
+
+        if run_face_detection or (run_mesh and roi is None):
+            boxes = self._detect_face_boxes(self._detector_input(frame, timings), width, height, detections)
+            if not boxes:
+                roi = None
+            elif roi is None:
+                roi = self._box_roi(boxes, width, height)
+            detections["roi"] = roi
+
+        if run_mesh:
+            detections["face_landmarks"] = []
+            if roi is not None:
+                x0, y0, x1, y1 = roi
+                # Converted straight from the BGR frame into a reused contiguous buffer
+                crop = self._to_rgb(frame[y0:y1, x0:x1], timings, "mesh_crop")
+                start = time.perf_counter()
+                face_mesh_results = self.mesh_pool.process(session_id, crop)
+                timings["face_mesh"] = time.perf_counter() - start
+                # One full-frame (N, 3) array per face: converted once here, compact to pickle across processes
+                detections["face_landmarks"] = [
+                    crop_to_frame(landmarks_to_array(face), roi, width, height)
+                    for face in face_mesh_results.multi_face_landmarks or []
+                ]
+
+            if detections["face_landmarks"]:
+                # The crop follows the face to where it is now
+                box = landmark_box(detections["face_landmarks"][0], width, height)
+                detections["roi"] = padded_roi(box, width, height, self.roi_padding)
+            else:
+                if not detections["face_detection_ran"]:
+                    # Lost the face inside its ROI: re-acquire on the full frame
+                    boxes = self._detect_face_boxes(self._detector_input(frame, timings), width, height, detections)
+                detections["roi"] = self._box_roi(boxes, width, height)
+
+        return detections
+
+    def _to_rgb(self, image: np.ndarray, timings: Dict, buffer: str) -> np.ndarray:
+        """RGB copy of a BGR image in the named scratch buffer (valid until its next use)"""
+        start = time.perf_counter()
+        img_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self.buffers.get(buffer, image.shape))
+        timings["color_convert"] = timings.get("color_convert", 0.0) + time.perf_counter() - start
+        return img_rgb
+
+    def _detector_input(self, frame: np.ndarray, timings: Dict) -> np.ndarray:
+        """The full frame as the face detector takes it: RGB, resized once to face_detection_width"""
+        height, width = frame.shape[:2]
+        if not self.face_detection_width or width <= self.face_detection_width:
+            return self._to_rgb(frame, timings, "face_detector_rgb")
+        start = time.perf_counter()
+        size = (self.face_detection_width, max(1, round(height * self.face_detection_width / width)))
+        small = cv2.resize(frame, size, dst=self.buffers.get("face_detector_bgr", (size[1], size[0], 3)),
+                           interpolation=cv2.INTER_AREA)
+        timings["resize"] = timings.get("resize", 0.0) + time.perf_counter() - start
+        return self._to_rgb(small, timings, "face_detector_rgb")
+
+    def _detect_face_boxes(self, img_rgb: np.ndarray, width: int, height: int,
+                           detections: Dict) -> List[Tuple[float, float, float, float]]:
+        """Full-frame face detector; records the face count and returns boxes in source-frame pixels"""
+        # Boxes come back relative to the (possibly downscaled) input, so they scale to any size
+        start = time.perf_counter()
+        face_results = self.face_detector.process(img_rgb)
+        detections["timings"]["face_detection"] = time.perf_counter() - start
+        boxes = []
+        for detection in face_results.detections or []:
+            box = detection.location_data.relative_bounding_box
+            boxes.append((box.xmin * width, box.ymin * height,
+                          (box.xmin + box.width) * width, (box.ymin + box.height) * height))
+        detections["num_faces"] = len(boxes)
+        detections["face_detection_ran"] = True
+        return boxes
+
+    def _box_roi(self, boxes, width: int, height: int):
+        """Mesh crop around the largest detected face, None when there is none"""
+        if not boxes:
+            return None
+        largest = max(boxes, key=lambda b: (b[2] - b[0]) * (b[3] - b[1]))
+        return padded_roi(largest, width, height, self.roi_padding)
+
+    def detect_objects_batch(self, frames: List[np.ndarray]) -> List[List[Dict]]:
+        """Run one batched YOLOv8 forward pass; returns one box list per input frame"""
+        if not self.object_engine or not frames:
+            return [[] for _ in frames]
+
+        try:
+            return self.object_engine.detect_batch(frames)
+        except Exception as e:
+            print(f"Error in object detection: {e}")
+            return [[] for _ in frames]
+
+    def detect_objects_batch_timed(self, frames: List[np.ndarray]):
+        """``detect_objects_batch`` plus the forward-pass wall time in seconds"""
+        start = time.perf_counter()
+        batch_objects = self.detect_objects_batch(frames)
+        return batch_objects, time.perf_counter() - start
+
+    def release_session(self, session_id: str):
+        """Hand the session's face mesh graph back to the pool"""
+        if self.mesh_pool:
+            self.mesh_pool.release(session_id)
+
+    def mesh_pool_stats(self) -> Dict:
+        """Leased and free face mesh graphs of this worker (see face_graph_pool.FaceMeshPool.stats)"""
+        return self.mesh_pool.stats() if self.mesh_pool else {}
+
+    def close(self):
+        """Release the MediaPipe graphs"""
+        if self.face_detector:
+            self.face_detector.close()
+        if self.mesh_pool:
+            self.mesh_pool.close()
+
+
+def create_frame_detectors(**kwargs) -> FrameDetectors:
+    """Picklable factory used by the inference pool to build per-worker detectors"""
+    return FrameDetectors(**kwargs).load()
+
+
+def preload_frame_detectors(**kwargs) -> FrameDetectors:
+    """Pre-fork factory: detectors with shared weights, finished by ``load`` in each worker"""
+    return FrameDetectors(**kwargs).preload()
@@ -0,0 +1,219 @@
+import asyncio
+import json
+import os
+import random
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import httpx
+
+from metrics import EVENTS_DELIVERED, STAGE_SECONDS
+
+OVERFLOW_POLICIES = ("memory", "disk")
+
+
+class EventDelivery:
+    """Ships proctoring events to the Node.js backend in the background.
+
+    ``submit`` never awaits the network: events are appended to a per-interview
+    buffer and a single background task flushes the buffers every
+    ``flush_interval`` seconds (or as soon as ``max_batch`` events are waiting),
+    sending each interview's events as one ``/api/events/{id}/bulk`` POST over
+    a long-lived, connection-pooled ``httpx.AsyncClient``.
+
+    Failed deliveries are retried with exponential backoff and jitter up to
+    ``max_retries`` times. When more than ``max_pending`` events are buffered,
+    or a batch exhausts its retries, the ``overflow`` policy applies:
+
+    * ``memory`` - drop the oldest buffered events and count them
+    * ``disk``   - append them to ``spill_path`` (JSON lines) and replay the
+      file once the backend catches up
+    """
+
+    def __init__(self, backend_url: str, max_batch: int = 50, flush_interval: float = 0.2,
+                 max_retries: int = 5, backoff_base: float = 0.5, backoff_max: float = 10.0,
+                 max_pending: int = 10000, overflow: str = "memory",
+                 spill_path: str = "event_spill.jsonl", max_connections: int = 20):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}', expected one of {OVERFLOW_POLICIES}")
+        self.backend_url = backend_url
+        self.max_batch = max(1, max_batch)
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self.spill_path = spill_path
+        self.max_connections = max_connections
+
+        self.client: Optional[httpx.AsyncClient] = None
+        self._buffers: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._pending = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._bulk_supported = True
+
+        self.stats = {"submitted": 0, "delivered": 0, "retries": 0, "dropped": 0, "spilled": 0}
+
+    async def start(self):
+        """Create the pooled client and start the delivery task"""
+        self.client = httpx.AsyncClient(
+            base_url=self.backend_url,
+            timeout=5.0,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+        )
+        self._task = asyncio.create_task(self._run())
+
+    def submit(self, interview_id: str, events: List[Dict]):
+        """Queue events for delivery; returns immediately"""
+        if not events:
+            return
+        self._buffers.setdefault(interview_id, []).extend(events)
+        self._pending += len(events)
+        self.stats["submitted"] += len(events)
+
+        if self._pending > self.max_pending:
+            self._shed(self._pending - self.max_pending)
+        if self._pending >= self.max_batch:
+            self._wakeup.set()
+
+    def pending(self) -> int:
+        """Number of events buffered and not yet delivered"""
+        return self._pending
+
+    async def close(self, timeout: float = 5.0):
+        """Flush what is buffered (bounded by timeout) and close the client"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await asyncio.wait_for(self._flush(), timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️ Event delivery shutdown timed out with {self._pending} events pending")
+            self._shed(self._pending)
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self._flush()
+                if not self._pending and self.overflow == "disk":
+                    self._replay_spill()
+            except Exception as e:
+                print(f"❌ Error in event delivery loop: {e}")
+
+    async def _flush(self):
+        """Send every buffered interview batch concurrently"""
+        batches = []
+        while self._buffers:
+            interview_id, events = self._buffers.popitem(last=False)
+            self._pending -= len(events)
+            for start in range(0, len(events), self.max_batch):
+                batches.append((interview_id, events[start:start + self.max_batch]))
+        if batches:
+            await asyncio.gather(*(self._deliver(iid, batch) for iid, batch in batches))
+
+    async def _deliver(self, interview_id: str, events: List[Dict]):
+        """POST one batch with bounded retries; apply the overflow policy on failure"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                with STAGE_SECONDS.time(stage="backend_delivery"):
+                    delivered = await self._post(interview_id, events)
+                if delivered:
+                    self.stats["delivered"] += len(events)
+                    EVENTS_DELIVERED.inc(len(events), outcome="delivered")
+                    return
+            except httpx.HTTPStatusError:
+                # The backend rejected the payload; retrying or spilling will not help
+                self.stats["dropped"] += len(events)
+                EVENTS_DELIVERED.inc(len(events), outcome="rejected")
+                return
+            except httpx.HTTPError as e:
+                print(f"❌ Error sending events to backend: {e}")
+
+            if attempt < self.max_retries:
+                self.stats["retries"] += 1
+                EVENTS_DELIVERED.inc(outcome="retried")
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+        print(f"❌ Giving up on {len(events)} events for interview {interview_id}")
+        self._overflow(interview_id, events)
+
+    async def _post(self, interview_id: str, events: List[Dict]) -> bool:
+        if self._bulk_supported:
+            response = await self.client.post(f"/api/events/{interview_id}/bulk", json={"events": events})
+            if response.status_code != 404:
+                return self._accepted(response)
+            # Older backend without the bulk route: fall back to one POST per event
+            print("⚠️ Backend has no bulk events endpoint, falling back to single event POSTs")
+            self._bulk_supported = False
+
+        for index, event in enumerate(events):
+            response = await self.client.post(f"/api/events/{interview_id}", json=event)
+            if not self._accepted(response):
+                # Keep only the undelivered tail for the retry
+                del events[:index]
+                return False
+        return True
+
+    @staticmethod
+    def _accepted(response: httpx.Response) -> bool:
+        if response.status_code == 200:
+            return True
+        print(f"❌ Failed to send events: {response.status_code} - {response.text}")
+        if 400 <= response.status_code < 500 and response.status_code != 429:
+            raise httpx.HTTPStatusError("Backend rejected events", request=response.request, response=response)
+        return False
+
+    def _shed(self, count: int):
+        """Remove the oldest ``count`` buffered events under the overflow policy"""
+        while count > 0 and self._buffers:
+            interview_id, events = next(iter(self._buffers.items()))
+            taken = events[:count]
+            del events[:count]
+            if not events:
+                del self._buffers[interview_id]
+            self._pending -= len(taken)
+            count -= len(taken)
+            self._overflow(interview_id, taken)
+
+    def _overflow(self, interview_id: str, events: List[Dict]):
+        if self.overflow == "disk":
+            try:
+                with open(self.spill_path, "a") as f:
+                    f.write(json.dumps({"interview_id": interview_id, "events": events}) + "\n")
+                self.stats["spilled"] += len(events)
+                EVENTS_DELIVERED.inc(len(events), outcome="spilled")
+                return
+            except OSError as e:
+                print(f"❌ Could not spill events to {self.spill_path}: {e}")
+        self.stats["dropped"] += len(events)
+        EVENTS_DELIVERED.inc(len(events), outcome="dropped")
+
+    def _replay_spill(self):
+        """Move spilled events back into the buffers once the queue is empty"""
+        if not os.path.exists(self.spill_path):
+            return
+        replay_path = self.spill_path + ".replay"
+        os.replace(self.spill_path, replay_path)
+        with open(replay_path) as f:
+            for line in f:
+                record = json.loads(line)
+                self._buffers.setdefault(record["interview_id"], []).extend(record["events"])
+                self._pending += len(record["events"])
+        os.remove(replay_path)
+        if self._pending > self.max_pending:
+            self._shed(self._pending - self.max_pending)
@@ -0,0 +1,158 @@
+import threading
+import time
+from typing import Callable, Dict
+
+
+class FaceMeshPool:
+    """Bounded pool of MediaPipe FaceMesh graphs leased to interview sessions.
+
+    FaceMesh runs with ``static_image_mode=False``, so each graph carries
+    tracking state from one frame to the next. A session keeps the same graph
+    for as long as it is active (``checkout`` returns its existing lease), and
+    hands it back on ``release``. Returned graphs are reset and reused by the
+    next session; graphs that sit unused in the pool for ``idle_timeout``
+    seconds are closed, as are leases whose session stopped sending frames.
+
+    Graphs are run through ``process``, which marks the lease in use until
+    the graph returns; an in-use graph is never reclaimed or reset, so two
+    sessions never drive one graph at once. When all ``max_size`` graphs are
+    leased, a new session waits up to ``checkout_timeout`` for one to come
+    back and then reclaims the idle lease unused for the longest, so memory
+    never grows past the bound. Size the pool for the sessions a process
+    admits so that this stays the exception.
+
+    The pool is thread-safe; in thread mode it is shared by every inference
+    thread of the process, in process mode each worker process has its own.
+    """
+
+    def __init__(self, factory: Callable, max_size: int = 16, idle_timeout: float = 60.0,
+                 checkout_timeout: float = 0.5):
+        self.factory = factory
+        self.max_size = max(1, max_size)
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+
+        self._leases: Dict[str, Dict] = {}  # session_id -> {"graph", "last_used", "busy", "released"}
+        self._free = []  # [(graph, returned_at)]
+        self._created = 0
+        self._reclaimed = 0
+        self._cond = threading.Condition()
+        self._last_sweep = time.monotonic()
+
+    def process(self, session_id: str, image):
+        """Run the session's graph (leasing one if needed) on an RGB image"""
+        lease = self._checkout(session_id)
+        try:
+            # Outside the lock: other sessions' graphs run in parallel
+            return lease["graph"].process(image)
+        finally:
+            with self._cond:
+                lease["busy"] = False
+                lease["last_used"] = time.monotonic()
+                if lease["released"]:
+                    # The session ended while its graph was running
+                    self._return_locked(lease["graph"])
+                self._cond.notify_all()
+
+    def _checkout(self, session_id: str) -> Dict:
+        """The session's lease, marked in use"""
+        with self._cond:
+            now = time.monotonic()
+            if now - self._last_sweep > self.idle_timeout / 2:
+                self._evict_idle_locked(now)
+
+            lease = self._leases.get(session_id)
+            while lease is not None and lease["busy"]:
+                # One session's frames are analysed in order; wait out a straggler just in case
+                self._cond.wait()
+                lease = self._leases.get(session_id)
+            if lease is None:
+                lease = {"graph": self._acquire_locked(), "busy": False, "released": False}
+                self._leases[session_id] = lease
+            lease["busy"] = True
+            lease["last_used"] = now
+            return lease
+
+    def release(self, session_id: str):
+        """Return a session's graph to the pool (once it is no longer running)"""
+        with self._cond:
+            lease = self._leases.pop(session_id, None)
+            if lease is None:
+                return
+            if lease["busy"]:
+                lease["released"] = True
+                return
+            self._return_locked(lease["graph"])
+            self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "leased": len(self._leases),
+                "free": len(self._free),
+                "max_size": self.max_size,
+                "created": self._created,
+                "reclaimed": self._reclaimed,
+            }
+
+    def close(self):
+        """Close every graph, leased or free"""
+        with self._cond:
+            for lease in self._leases.values():
+                lease["graph"].close()
+            for graph, _ in self._free:
+                graph.close()
+            self._leases.clear()
+            self._free.clear()
+
+    def _acquire_locked(self):
+        if self._free:
+            return self._free.pop()[0]
+        if self._total_locked() < self.max_size:
+            self._created += 1
+            return self.factory()
+
+        # Pool exhausted: wait for a release, then fall back to reclaiming an idle lease
+        self._cond.wait_for(lambda: self._free, timeout=self.checkout_timeout)
+        if self._free:
+            return self._free.pop()[0]
+        self._cond.wait_for(lambda: self._free or any(not lease["busy"] for lease in self._leases.values()))
+        if self._free:
+            return self._free.pop()[0]
+
+        stalest = min((sid for sid, lease in self._leases.items() if not lease["busy"]),
+                      key=lambda sid: self._leases[sid]["last_used"])
+        print(f"⚠️ Face mesh pool exhausted, reclaiming graph from session {stalest}")
+        self._reclaimed += 1
+        graph = self._leases.pop(stalest)["graph"]
+        self._reset(graph)
+        return graph
+
+    def _return_locked(self, graph):
+        self._reset(graph)
+        self._free.append((graph, time.monotonic()))
+
+    def _evict_idle_locked(self, now: float):
+        self._last_sweep = now
+        for session_id in [sid for sid, lease in self._leases.items()
+                           if not lease["busy"] and now - lease["last_used"] > self.idle_timeout]:
+            self._return_locked(self._leases.pop(session_id)["graph"])
+            self._reclaimed += 1
+
+        keep = []
+        for graph, returned_at in self._free:
+            if now - returned_at > self.idle_timeout:
+                graph.close()
+            else:
+                keep.append((graph, returned_at))
+        self._free = keep
+        self._cond.notify_all()
+
+    def _total_locked(self) -> int:
+        return len(self._leases) + len(self._free)
+
+    @staticmethod
+    def _reset(graph):
+        # Drop the previous face's tracking state before the graph is reused
+        if hasattr(graph, "reset"):
+            graph.reset()
@@ -0,0 +1,74 @@
+import cv2
+import numpy as np
+from typing import Dict, Tuple
+
+
+class FrameGate:
+    """Skips full analysis of frames that barely differ from the last analysed one.
+
+    Each frame is reduced to a tiny grayscale thumbnail (area-averaged, so
+    sensor noise mostly cancels out) and compared with the thumbnail of the
+    last frame that went through the detectors. If the mean absolute
+    difference, as a fraction of full scale, is below ``threshold`` the frame
+    is gated out and the caller reuses the previous detector state. A frame is
+    always analysed once ``max_skip_seconds`` have passed since the last full
+    analysis, so slow changes such as eyes closing are not missed indefinitely.
+    Thumbnails are written into two small per-session buffers that swap roles
+    (reference / scratch), so gating a frame allocates nothing.
+    """
+
+    def __init__(self, threshold: float = 0.02, max_skip_seconds: float = 1.0,
+                 thumbnail_size: Tuple[int, int] = (32, 24)):
+        self.threshold = threshold
+        self.max_skip_seconds = max_skip_seconds
+        self.thumbnail_size = thumbnail_size
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def new_session(self) -> Dict:
+        width, height = self.thumbnail_size
+        return {"reference": None, "last_full_time": 0.0, "passed": 0, "skipped": 0, "last_score": None,
+                "small": np.empty((height, width, 3), dtype=np.uint8),
+                "scratch": np.empty((height, width), dtype=np.uint8)}
+
+    def thumbnail(self, frame: np.ndarray, state: Dict) -> np.ndarray:
+        """Downsample first, then convert to gray: both steps run on the small image, into the session's buffers"""
+        small = cv2.resize(frame, self.thumbnail_size, dst=state["small"], interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=state["scratch"])
+
+    def should_analyze(self, state: Dict, frame: np.ndarray, now: float) -> bool:
+        """Return True if the frame must go through the detectors"""
+        if not self.enabled:
+            state["passed"] += 1
+            return True
+
+        thumb = self.thumbnail(frame, state)
+        reference = state["reference"]
+        if reference is None:
+            score = 1.0
+        else:
+            score = float(cv2.absdiff(thumb, reference).mean()) / 255.0
+        state["last_score"] = score
+
+        if score < self.threshold and now - state["last_full_time"] < self.max_skip_seconds:
+            state["skipped"] += 1
+            return False
+
+        # The old reference becomes the next frame's scratch buffer
+        state["scratch"] = reference if reference is not None else np.empty_like(thumb)
+        state["reference"] = thumb
+        state["last_full_time"] = now
+        state["passed"] += 1
+        return True
+
+    @staticmethod
+    def stats(state: Dict) -> Dict:
+        total = state["passed"] + state["skipped"]
+        return {
+            "frames_analyzed": state["passed"],
+            "frames_skipped": state["skipped"],
+            "skip_rate": state["skipped"] / total if total else 0.0,
+            "last_change_score": state["last_score"],
+        }
@@ -0,0 +1,107 @@
+import base64
+import struct
+from typing import Dict, Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from metrics import STAGE_SECONDS
+
+# Binary /stream frame layout (network byte order), followed by the encoded image:
+#
+#   magic    2s   b"PF"
+#   version  B    1
+#   format   B    1 = JPEG, 2 = WebP
+#   seq      I    client frame sequence number
+#   captured d    capture timestamp, milliseconds since the epoch
+#
+# Clients opt in by sending {"type": "hello", "protocol": "binary", "version": 1}
+# as their first text message; anything else keeps the JSON/base64 protocol.
+FRAME_MAGIC = b"PF"
+FRAME_VERSION = 1
+FRAME_HEADER = struct.Struct(">2sBBId")
+FRAME_FORMATS = {1: "jpeg", 2: "webp"}
+
+# Bulk uploads (POST /analyze_frames) concatenate binary frames, each preceded
+# by its length in bytes:  length I | frame (header + image) | length I | ...
+FRAME_LENGTH = struct.Struct(">I")
+
+
+class FrameProtocolError(ValueError):
+    """Raised for malformed binary frames"""
+
+
+def decode_image(data) -> Optional[np.ndarray]:
+    """Decode JPEG/WebP/PNG bytes straight into a BGR ndarray (None if undecodable)"""
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    if buffer.size == 0:
+        return None
+    return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+
+
+def decode_base64_frame(image_b64: str) -> Optional[np.ndarray]:
+    """Legacy JSON path: base64 string to BGR ndarray"""
+    with STAGE_SECONDS.time(stage="base64_decode"):
+        image_bytes = base64.b64decode(image_b64)
+    with STAGE_SECONDS.time(stage="image_decode"):
+        return decode_image(image_bytes)
+
+
+def parse_frame_header(message: bytes) -> Dict:
+    """Validated header fields of a binary frame, without decoding its image"""
+    if len(message) < FRAME_HEADER.size:
+        raise FrameProtocolError(f"Frame too short ({len(message)} bytes)")
+
+    magic, version, image_format, seq, captured = FRAME_HEADER.unpack_from(message)
+    if magic != FRAME_MAGIC:
+        raise FrameProtocolError("Bad frame magic")
+    if version != FRAME_VERSION:
+        raise FrameProtocolError(f"Unsupported frame version {version}")
+    if image_format not in FRAME_FORMATS:
+        raise FrameProtocolError(f"Unsupported image format {image_format}")
+
+    return {
+        "seq": seq,
+        "capture_timestamp": captured,
+        "format": FRAME_FORMATS[image_format],
+    }
+
+
+def frame_payload(message: bytes) -> memoryview:
+    """The encoded image of a binary frame (memoryview: no copy before imdecode or hashing)"""
+    return memoryview(message)[FRAME_HEADER.size:]
+
+
+def parse_binary_frame(message: bytes) -> Tuple[Dict, Optional[np.ndarray]]:
+    """Split a binary frame into its header fields and the decoded BGR image"""
+    header = parse_frame_header(message)
+    return header, decode_image(frame_payload(message))
+
+
+def peek_frame_seq(message: bytes) -> Optional[int]:
+    """Sequence number of a binary frame without decoding it (None if malformed)"""
+    if len(message) < FRAME_HEADER.size or message[:2] != FRAME_MAGIC:
+        return None
+    return FRAME_HEADER.unpack_from(message)[3]
+
+
+def iter_length_prefixed(body: bytes, max_frame_bytes: int) -> Iterator[memoryview]:
+    """Split a bulk upload into its binary frames without copying them"""
+    view = memoryview(body)
+    offset = 0
+    while offset < len(view):
+        if len(view) - offset < FRAME_LENGTH.size:
+            raise FrameProtocolError("Truncated frame length at end of upload")
+        (length,) = FRAME_LENGTH.unpack_from(view, offset)
+        offset += FRAME_LENGTH.size
+        if length > max_frame_bytes:
+            raise FrameProtocolError(f"Frame of {length} bytes exceeds the {max_frame_bytes} byte limit")
+        if len(view) - offset < length:
+            raise FrameProtocolError("Truncated frame at end of upload")
+        yield view[offset:offset + length]
+        offset += length
+
+
+def encode_binary_frame(image_bytes: bytes, seq: int, capture_timestamp: float, image_format: int = 1) -> bytes:
+    """Build a binary frame (used by the benchmark load generators)"""
+    return FRAME_HEADER.pack(FRAME_MAGIC, FRAME_VERSION, image_format, seq, capture_timestamp) + image_bytes
@@ -0,0 +1,118 @@
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from multiprocessing import shared_memory
+from typing import Dict, NamedTuple, Tuple
+
+import numpy as np
+
+
+class FrameHandle(NamedTuple):
+    """What crosses the process boundary instead of the pixels: where a frame lives in the ring"""
+    ring: str
+    slot: int
+    shape: Tuple[int, ...]
+
+
+class FrameRing:
+    """Fixed ring of frame slots in one shared-memory segment.
+
+    The service process copies each frame into a free slot and hands
+    inference processes a ``FrameHandle``; workers map the same segment and
+    read the frame as a NumPy view, so frames are never pickled. Memory is
+    ``slots * slot_bytes`` no matter how many sessions are connected.
+
+    Slots are recycled explicitly: ``acquire`` takes a slot (waiting while
+    all of them are in use, which is the backpressure on the frame
+    producers) and ``release`` returns it once every detector call that got
+    its handle has finished. ``slot(frame)`` does both around a block.
+    """
+
+    def __init__(self, slots: int = 16, max_width: int = 1280, max_height: int = 720, channels: int = 3):
+        self.slots = max(1, slots)
+        self.slot_bytes = max_width * max_height * channels
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slots * self.slot_bytes)
+        self.name = self._shm.name
+        self._free = deque(range(self.slots))
+        self._available = asyncio.Condition()
+
+        # Counters
+        self.frames = 0
+        self.waits = 0
+        self.oversized = 0
+
+    def fits(self, frame: np.ndarray) -> bool:
+        return frame.dtype == np.uint8 and frame.nbytes <= self.slot_bytes
+
+    def view(self, slot: int, shape: Tuple[int, ...]) -> np.ndarray:
+        return slot_view(self._shm, self.slot_bytes, slot, shape)
+
+    async def acquire(self) -> int:
+        """Take a free slot, waiting until one is released when the ring is full"""
+        async with self._available:
+            if not self._free:
+                self.waits += 1
+            await self._available.wait_for(lambda: self._free)
+            return self._free.popleft()
+
+    async def release(self, slot: int):
+        async with self._available:
+            self._free.append(slot)
+            self._available.notify()
+
+    @asynccontextmanager
+    async def slot(self, frame: np.ndarray):
+        """Copy ``frame`` into a slot and yield its handle; the slot is recycled on exit.
+
+        Frames that do not fit a slot are yielded as they are (and get pickled).
+        """
+        if not self.fits(frame):
+            self.oversized += 1
+            yield frame
+            return
+        slot = await self.acquire()
+        try:
+            np.copyto(self.view(slot, frame.shape), frame)
+            self.frames += 1
+            yield FrameHandle(self.name, slot, frame.shape)
+        finally:
+            await self.release(slot)
+
+    def stats(self) -> Dict:
+        return {
+            "slots": self.slots,
+            "slot_bytes": self.slot_bytes,
+            "in_use": self.slots - len(self._free),
+            "frames": self.frames,
+            "waits": self.waits,
+            "oversized": self.oversized,
+        }
+
+    def close(self):
+        """Release and remove the segment (owner process only)"""
+        self._shm.close()
+        self._shm.unlink()
+
+
+def slot_view(shm: shared_memory.SharedMemory, slot_bytes: int, slot: int, shape: Tuple[int, ...]) -> np.ndarray:
+    """NumPy view of the frame stored in ``slot``"""
+    return np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+
+
+# Segments mapped by this (worker) process, by name
+_attached: Dict[str, Tuple[shared_memory.SharedMemory, int]] = {}
+
+
+def attach_ring(name: str, slot_bytes: int):
+    """Map a ring created by the service process (called once per worker)"""
+    if name not in _attached:
+        _attached[name] = (shared_memory.SharedMemory(name=name), slot_bytes)
+
+
+def resolve_frame(frame):
+    """Worker side: a ``FrameHandle`` becomes a view of its slot, anything else is returned as is"""
+    if isinstance(frame, FrameHandle):
+        shm, slot_bytes = _attached[frame.ring]
+        return slot_view(shm, slot_bytes, frame.slot, frame.shape)
+    return frame
+
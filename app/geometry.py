@@ -0,0 +1,111 @@
+import cv2
+import numpy as np
+from typing import Optional, Tuple
+
+# MediaPipe face mesh landmark indices
+NOSE_TIP = 1
+CHIN = 152
+# Eye corners and the middle top/bottom eyelid points used for the EAR
+LEFT_EYE = {"corner_a": 33, "corner_b": 133, "top": 158, "bottom": 145}
+RIGHT_EYE = {"corner_a": 362, "corner_b": 263, "top": 387, "bottom": 374}
+
+_EAR_CORNER_A = np.array([LEFT_EYE["corner_a"], RIGHT_EYE["corner_a"]])
+_EAR_CORNER_B = np.array([LEFT_EYE["corner_b"], RIGHT_EYE["corner_b"]])
+_EAR_TOP = np.array([LEFT_EYE["top"], RIGHT_EYE["top"]])
+_EAR_BOTTOM = np.array([LEFT_EYE["bottom"], RIGHT_EYE["bottom"]])
+
+# Head pose: image points (nose, chin, image-left eye corner, image-right eye
+# corner, image-left mouth corner, image-right mouth corner) and a generic 3D
+# face in camera-aligned axes (x right, y down, z away from the camera), so a
+# face looking straight at the camera gives yaw = pitch = roll = 0.
+POSE_LANDMARKS = np.array([NOSE_TIP, CHIN, 33, 263, 61, 291])
+POSE_MODEL_POINTS = np.array([
+    (0.0, 0.0, 0.0),
+    (0.0, 330.0, 65.0),
+    (-225.0, -170.0, 135.0),
+    (225.0, -170.0, 135.0),
+    (-150.0, 150.0, 125.0),
+    (150.0, 150.0, 125.0),
+], dtype=np.float64)
+
+DEFAULT_EAR = 0.3
+
+
+def landmarks_to_array(face_landmarks) -> np.ndarray:
+    """NormalizedLandmarkList -> (N, 3) float32 array of x, y, z (done once per frame)"""
+    return np.array([(p.x, p.y, p.z) for p in face_landmarks.landmark], dtype=np.float32)
+
+
+def eye_aspect_ratios(landmarks: np.ndarray) -> np.ndarray:
+    """Vertical/horizontal eyelid ratio for (left, right) eyes.
+
+    ``landmarks`` is (N, 3) for one face or (B, N, 3) for a batch; the result
+    is (2,) or (B, 2). Eyes with zero width get ``DEFAULT_EAR``.
+    """
+    horizontal = np.abs(landmarks[..., _EAR_CORNER_A, 0] - landmarks[..., _EAR_CORNER_B, 0])
+    vertical = np.abs(landmarks[..., _EAR_TOP, 1] - landmarks[..., _EAR_BOTTOM, 1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(horizontal > 0, vertical / horizontal, DEFAULT_EAR)
+
+
+def nose_deviation(landmarks: np.ndarray) -> np.ndarray:
+    """Horizontal and vertical distance of the nose tip from the frame centre, (..., 2)"""
+    return np.abs(landmarks[..., NOSE_TIP, :2] - 0.5)
+
+
+def head_pose(landmarks: np.ndarray, frame_width: int, frame_height: int) -> Tuple[float, float, float]:
+    """Yaw, pitch and roll in degrees from cv2.solvePnP on six face landmarks"""
+    image_points = (landmarks[POSE_LANDMARKS, :2] * (frame_width, frame_height)).astype(np.float64)
+    focal = float(frame_width)
+    camera = np.array([[focal, 0, frame_width / 2], [0, focal, frame_height / 2], [0, 0, 1]], dtype=np.float64)
+    ok, rotation_vector, _ = cv2.solvePnP(POSE_MODEL_POINTS, image_points, camera, None,
+                                          flags=cv2.SOLVEPNP_ITERATIVE)
+    if not ok:
+        return 0.0, 0.0, 0.0
+    rotation, _ = cv2.Rodrigues(rotation_vector)
+    (pitch, yaw, roll), *_ = cv2.RQDecomp3x3(rotation)
+    return float(yaw), float(pitch), float(roll)
+
+
+def head_poses(landmarks: np.ndarray, frame_width: int, frame_height: int) -> np.ndarray:
+    """Head pose for a (B, N, 3) batch of faces, returned as (B, 3) yaw/pitch/roll"""
+    return np.array([head_pose(face, frame_width, frame_height) for face in landmarks], dtype=np.float32)
+
+
+def face_metrics(landmarks: np.ndarray, frame_width: int, frame_height: int) -> dict:
+    """EAR, nose deviation and head pose for a (B, N, 3) stack of faces in one call"""
+    return {
+        "ear": eye_aspect_ratios(landmarks),
+        "nose_deviation": nose_deviation(landmarks),
+        "head_pose": head_poses(landmarks, frame_width, frame_height),
+    }
+
+
+def landmark_box(landmarks: np.ndarray, frame_width: int, frame_height: int) -> Tuple[float, float, float, float]:
+    """Pixel bounding box (x0, y0, x1, y1) of one face's normalized landmarks"""
+    x0, y0 = landmarks[:, :2].min(axis=0)
+    x1, y1 = landmarks[:, :2].max(axis=0)
+    return x0 * frame_width, y0 * frame_height, x1 * frame_width, y1 * frame_height
+
+
+def padded_roi(box, frame_width: int, frame_height: int, padding: float = 0.3) -> Optional[Tuple[int, int, int, int]]:
+    """Square crop around a pixel box, grown by ``padding`` of its size per side and clipped to the frame"""
+    x0, y0, x1, y1 = box
+    side = max(x1 - x0, y1 - y0) * (1 + 2 * padding)
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    roi = (max(0, int(cx - side / 2)), max(0, int(cy - side / 2)),
+           min(frame_width, int(cx + side / 2)), min(frame_height, int(cy + side / 2)))
+    if roi[2] - roi[0] < 16 or roi[3] - roi[1] < 16:
+        return None
+    return roi
+
+
+def crop_to_frame(landmarks: np.ndarray, roi, frame_width: int, frame_height: int) -> np.ndarray:
+    """Map landmarks normalized to a crop back to full-frame normalized coordinates (in place)"""
+    x0, y0, x1, y1 = roi
+    crop_width = x1 - x0
+    landmarks[:, 0] = (landmarks[:, 0] * crop_width + x0) / frame_width
+    landmarks[:, 1] = (landmarks[:, 1] * (y1 - y0) + y0) / frame_height
+    # z shares the x scale in MediaPipe's normalized landmarks
+    landmarks[:, 2] *= crop_width / frame_width
+    return landmarks
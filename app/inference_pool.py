@@ -0,0 +1,212 @@
+import asyncio
+import gc
+import multiprocessing
+import os
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from frame_ring import FrameRing, attach_ring, resolve_frame
+
+INFERENCE_MODES = ("inline", "thread", "process", "prefork")
+
+# Worker-local state. In thread mode every executor thread gets its own
+# detectors through ``threading.local``; in process mode each child process
+# has its own copy of these module globals.
+_worker_local = threading.local()
+_worker_factory: Optional[Callable] = None
+# Prefork mode: detectors partly loaded by the parent, inherited by every forked worker
+_preloaded = None
+
+
+def pin_native_threads(num_threads: int):
+    """Limit the intra-op thread pools of torch and OpenCV for this worker"""
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(num_threads)
+
+    import cv2
+    cv2.setNumThreads(num_threads)
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
+
+
+def _init_worker(factory: Callable, num_threads: int, eager: bool, ring: Optional[Tuple[str, int]] = None):
+    """Executor initializer: pin native threads, map the frame ring and optionally build detectors"""
+    global _worker_factory
+    _worker_factory = factory
+    pin_native_threads(num_threads)
+    if ring is not None:
+        attach_ring(*ring)
+    if eager:
+        _local_detectors()
+
+
+def _local_detectors():
+    detectors = getattr(_worker_local, "detectors", None)
+    if detectors is None:
+        detectors = _preloaded.load() if _preloaded is not None else _worker_factory()
+        _worker_local.detectors = detectors
+    return detectors
+
+
+def _call_detectors(method: str, *args):
+    """Entry point executed inside a worker"""
+    # Frames shipped through the shared-memory ring arrive as handles (single or batched)
+    args = [[resolve_frame(item) for item in arg] if isinstance(arg, list) else resolve_frame(arg)
+            for arg in args]
+    return getattr(_local_detectors(), method)(*args)
+
+
+def _call_detectors_once(barrier: threading.Barrier, method: str, *args):
+    """Thread-mode broadcast: hold the thread until every worker has taken one call"""
+    try:
+        return _call_detectors(method, *args)
+    finally:
+        barrier.wait()
+
+
+class InferencePool:
+    """Runs CPU-bound detector calls off the asyncio event loop.
+
+    ``mode`` selects how:
+
+    * ``inline``  - call the detectors on the event loop (legacy behaviour)
+    * ``thread``  - a thread pool; each thread owns a detector instance
+    * ``process`` - one single-process executor per worker, so calls for the
+      same ``key`` (an interview id) always land on the same process
+    * ``prefork`` - like ``process``, but ``preload`` runs once in this
+      process, the heap is frozen (``gc.freeze``) and the workers are forked
+      from it, so they share the model weights copy-on-write
+
+    ``threads_per_worker`` pins torch/OpenCV thread counts inside every worker
+    so that N workers share the cores instead of oversubscribing them.
+
+    In process mode, frames travel through a shared-memory ``FrameRing`` of
+    ``frame_slots`` slots (up to ``frame_max_size`` pixels) instead of being
+    pickled; ``frame_slots=0`` pickles them as before.
+    """
+
+    def __init__(self, factory: Callable, mode: str = "thread", workers: int = 1,
+                 threads_per_worker: int = 1, frame_slots: int = 0,
+                 frame_max_size: Tuple[int, int] = (1280, 720), preload: Optional[Callable] = None):
+        if mode not in INFERENCE_MODES:
+            raise ValueError(f"Unknown inference mode '{mode}', expected one of {INFERENCE_MODES}")
+        if mode == "prefork" and preload is None:
+            raise ValueError("prefork mode needs a preload factory")
+        self.factory = factory
+        self.preload = preload
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.threads_per_worker = max(1, threads_per_worker)
+        self._inline = None
+        self._thread_executor = None
+        self._process_executors = []
+        self._next_worker = 0
+        self.frame_slots = frame_slots
+        self.frame_max_size = frame_max_size
+        self.frame_ring: Optional[FrameRing] = None
+
+    def start(self):
+        """Create the executors and load the detectors in every worker"""
+        if self.mode == "inline":
+            self._inline = self.factory()
+        elif self.mode == "thread":
+            # torch's intra-op pool is process wide, so pin it once here
+            pin_native_threads(self.threads_per_worker)
+            self._thread_executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="inference",
+                initializer=_init_worker,
+                initargs=(self.factory, self.threads_per_worker, False),
+            )
+        else:
+            ring = None
+            if self.frame_slots > 0:
+                self.frame_ring = FrameRing(self.frame_slots, *self.frame_max_size)
+                ring = (self.frame_ring.name, self.frame_ring.slot_bytes)
+            context = self._prefork() if self.mode == "prefork" else None
+            for _ in range(self.workers):
+                executor = ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(self.factory, self.threads_per_worker, True, ring),
+                )
+                # Force the child to start (and load models) before traffic arrives
+                executor.submit(int).result()
+                self._process_executors.append(executor)
+        print(f"Inference pool started: mode={self.mode}, workers={self.workers}, "
+              f"threads/worker={self.threads_per_worker}")
+        if self.frame_ring is not None:
+            print(f"🧱 Shared-memory frame ring: {self.frame_ring.slots} slots x "
+                  f"{self.frame_ring.slot_bytes / 1e6:.1f} MB")
+
+    def _prefork(self):
+        """Load the shareable model state once, here, and freeze it before the workers fork"""
+        global _preloaded
+        # Set before anything creates a thread pool; the forked workers inherit it
+        pin_native_threads(self.threads_per_worker)
+        _preloaded = self.preload()
+        gc.collect()
+        # Objects allocated so far leave the collector's generations: a collection in a
+        # worker would otherwise write to their headers and un-share every page it visits
+        gc.freeze()
+        print(f"🧊 Preloaded models and froze {gc.get_freeze_count()} objects before forking workers")
+        return multiprocessing.get_context("fork")
+
+    def worker_pids(self) -> List[int]:
+        """PIDs of the worker processes (empty in inline and thread mode)"""
+        return [executor.submit(os.getpid).result() for executor in self._process_executors]
+
+    def worker_for(self, key: Optional[str] = None) -> int:
+        """Pick the worker index for a key (stable) or round-robin when key is None"""
+        if key is None:
+            index = self._next_worker
+            self._next_worker = (self._next_worker + 1) % self.workers
+            return index
+        return zlib.crc32(key.encode()) % self.workers
+
+    async def run(self, method: str, *args, key: Optional[str] = None):
+        """Call ``detectors.<method>(*args)`` in a worker and await the result"""
+        if self.mode == "inline":
+            return getattr(self._inline, method)(*args)
+
+        loop = asyncio.get_running_loop()
+        if self.mode == "thread":
+            return await loop.run_in_executor(self._thread_executor, _call_detectors, method, *args)
+
+        executor = self._process_executors[self.worker_for(key)]
+        return await loop.run_in_executor(executor, _call_detectors, method, *args)
+
+    def broadcast(self, method: str, *args, timeout: Optional[float] = None) -> List:
+        """Call ``detectors.<method>(*args)`` once in every worker (blocking); one result per worker"""
+        if self.mode == "inline":
+            return [getattr(self._inline, method)(*args)]
+        if self.mode == "thread":
+            # Each call blocks its thread on the barrier, so no thread can take two
+            barrier = threading.Barrier(self.workers, timeout=timeout)
+            futures = [self._thread_executor.submit(_call_detectors_once, barrier, method, *args)
+                       for _ in range(self.workers)]
+        else:
+            futures = [executor.submit(_call_detectors, method, *args) for executor in self._process_executors]
+        return [future.result(timeout) for future in futures]
+
+    def shutdown(self):
+        """Stop the executors and release the inline detectors"""
+        if self._inline is not None:
+            self._inline.close()
+            self._inline = None
+        if self._thread_executor is not None:
+            self._thread_executor.shutdown(wait=True, cancel_futures=True)
+            self._thread_executor = None
+        for executor in self._process_executors:
+            executor.shutdown(wait=True, cancel_futures=True)
+        self._process_executors = []
+        if self.frame_ring is not None:
+            # After the workers are gone, so nothing maps the segment any more
+            self.frame_ring.close()
+            self.frame_ring = None
@@ -1,24 +1,48 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-import cv2
-import numpy as np
-import base64
+from fastapi.responses import JSONResponse, PlainTextResponse, RedirectResponse, StreamingResponse
 import json
+import logging
 import time
 import asyncio
-import httpx
-from typing import Dict, List
-import mediapipe as mp
-import torch
-from PIL import Image
-import io
+from functools import partial
+from typing import Dict, List, Optional
 import os
 from dotenv import load_dotenv
 
+from admission import LatestFrameQueue
+from bulk_analysis import (
+    binary_items,
+    clip_items,
+    copy_upload,
+    image_items,
+    remove_files,
+    save_upload,
+    stream_results,
+)
+from event_delivery import EventDelivery
+from frame_protocol import (
+    FRAME_VERSION,
+    FrameProtocolError,
+    decode_base64_frame,
+    decode_image,
+    frame_payload,
+    parse_frame_header,
+    peek_frame_seq,
+)
+import metrics
+from memory_usage import memory_report
+from metrics import FRAMES_DROPPED, STAGE_SECONDS
 from proctoring_service import ProctoringService
+from stream_capture import StreamCapture
+from video_analysis import analyze_video
+from worker_router import WorkerRouter
 
 load_dotenv()
 
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+logger = logging.getLogger(__name__)
+
 app = FastAPI(title="Proctoring ML Service", version="1.0.0")
 
 # CORS middleware
@@ -43,116 +67,503 @@ proctoring_service = ProctoringService()
 # Store active WebSocket connections
 active_connections: Dict[str, WebSocket] = {}
 
+# Frames buffered per stream while one is being analysed (oldest dropped beyond this)
+FRAME_QUEUE_SIZE = int(os.getenv("FRAME_QUEUE_SIZE", "1"))
+
+# Interview ownership across workers/nodes (see worker_router); unset WORKER_NODES = one node
+router = WorkerRouter(
+    os.getenv("WORKER_NODES", "").split(","),
+    os.getenv("WORKER_SELF"),
+    health_interval=float(os.getenv("WORKER_HEALTH_INTERVAL", "2")),
+)
+
+# Record inbound /stream frames and the events they produced, for benchmarks.replay (unset = off)
+STREAM_CAPTURE_DIR = os.getenv("STREAM_CAPTURE_DIR", "")
+stream_capture = StreamCapture(STREAM_CAPTURE_DIR) if STREAM_CAPTURE_DIR else None
+
+# Close code telling /stream clients to reconnect to the interview's owner (sent with a redirect message)
+REDIRECT_CLOSE_CODE = 4307
+
+def owner_redirect(request: Request, interview_id: Optional[str]) -> Optional[RedirectResponse]:
+    """307 to the node that owns the interview, None when it is this one"""
+    if interview_id is None or router.is_local(interview_id):
+        return None
+    url = router.owner(interview_id) + request.url.path
+    if request.url.query:
+        url += "?" + request.url.query
+    return RedirectResponse(url, status_code=307)
+
 # Node.js backend URL
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:3001")
 
+# Background, batched event delivery to the Node.js backend
+event_delivery = EventDelivery(
+    BACKEND_URL,
+    max_batch=int(os.getenv("EVENT_BATCH_SIZE", "50")),
+    flush_interval=float(os.getenv("EVENT_FLUSH_INTERVAL_MS", "200")) / 1000.0,
+    max_retries=int(os.getenv("EVENT_MAX_RETRIES", "5")),
+    max_pending=int(os.getenv("EVENT_MAX_PENDING", "10000")),
+    overflow=os.getenv("EVENT_OVERFLOW", "memory"),
+    spill_path=os.getenv("EVENT_SPILL_PATH", "event_spill.jsonl"),
+)
+
 @app.get("/")
 async def root():
     return {"message": "Proctoring ML Service is running"}
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "timestamp": time.time()}
+    """
+    Liveness plus spare capacity, so a load balancer can route new interviews
+    """
+    health = {
+        "status": "healthy",
+        "timestamp": time.time(),
+        "capacity": proctoring_service.admission.headroom(len(active_connections)),
+        "result_cache": proctoring_service.result_cache.stats()
+    }
+    if router.enabled:
+        health["cluster"] = router.status()
+    return health
+
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness: 200 once models are loaded and warmed up, 503 until then
+    """
+    readiness = proctoring_service.readiness()
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """
+    Stage latency histograms, session and queue gauges in Prometheus text format
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/memory")
+async def memory_usage():
+    """
+    Unique vs. shared resident memory of this process and its inference workers,
+    with each worker's face mesh graph pool
+    """
+    if proctoring_service.pool is None:
+        raise HTTPException(status_code=503, detail="Models are still loading")
+    loop = asyncio.get_running_loop()
+    pids = await loop.run_in_executor(None, proctoring_service.pool.worker_pids)
+    mesh_pools = await loop.run_in_executor(
+        None, partial(proctoring_service.pool.broadcast, "mesh_pool_stats", timeout=10.0)
+    )
+    return dict(memory_report(pids), inference_mode=proctoring_service.inference_mode,
+                face_mesh_pools=mesh_pools)
+
+@app.get("/sessions/{interview_id}/stats")
+async def session_stats(interview_id: str, request: Request):
+    """
+    Per-session detector statistics (detector runs/skips, change-gate skip rate)
+    """
+    redirect = owner_redirect(request, interview_id)
+    if redirect:
+        return redirect
+    stats = proctoring_service.get_session_stats(interview_id)
+    if not stats:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return stats
 
 @app.post("/analyze_frame")
-async def analyze_frame(frame_data: dict):
+async def analyze_frame(frame_data: dict, request: Request):
     """
     Analyze a single frame for proctoring events
     """
+    redirect = owner_redirect(request, frame_data.get("interview_id"))
+    if redirect:
+        return redirect
+    if not proctoring_service.is_ready():
+        raise HTTPException(status_code=503, detail="Models are still loading")
     try:
-        # Decode base64 image
-        image_data = base64.b64decode(frame_data["image"])
-        image = Image.open(io.BytesIO(image_data))
-        frame = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-        
-        # Analyze frame
-        events = await proctoring_service.analyze_frame(frame)
+        received = time.perf_counter()
+        # A retried request with the same image reuses its detector outputs
+        cache_key = proctoring_service.result_cache.key(frame_data["image"])
+        events = await proctoring_service.analyze_cached(cache_key, frame_data.get("interview_id"))
+        if events is None:
+            # Decode base64 image
+            frame = decode_base64_frame(frame_data["image"])
+            if frame is None:
+                raise HTTPException(status_code=400, detail="Could not decode image")
+            
+            # Analyze frame (frames without an interview_id share the "default" session)
+            events = await proctoring_service.analyze_frame(frame, frame_data.get("interview_id"),
+                                                            cache_key=cache_key)
+        proctoring_service.admission.record_frame(time.perf_counter() - received)
         
         return {
             "success": True,
             "events": events,
             "timestamp": time.time()
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Bulk uploads: frames decoded per batch, largest accepted binary frame / clip
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "8"))
+BULK_MAX_FRAME_BYTES = int(os.getenv("BULK_MAX_FRAME_BYTES", str(5 * 1024 * 1024)))
+BULK_MAX_CLIP_BYTES = int(os.getenv("BULK_MAX_CLIP_MB", "100")) * 1024 * 1024
+
+@app.post("/analyze_frames/{interview_id}")
+async def analyze_frames_bulk(interview_id: str, request: Request, clock: str = "capture",
+                              start_time: Optional[float] = None, sample_fps: float = 5.0,
+                              deliver: bool = False):
+    """
+    Analyze many frames (or a short clip) for one interview and stream NDJSON results.
+
+    The body is length-prefixed binary frames (application/octet-stream), a
+    clip (video/*), or multipart/form-data with image and/or clip parts plus an
+    optional "timestamps" JSON list. With clock=capture frames keep their own
+    times (binary header, timestamps field, start_time + clip time, or
+    start_time + index / sample_fps for images without timestamps);
+    clock=server analyzes them at arrival time.
+    """
+    redirect = owner_redirect(request, interview_id)
+    if redirect:
+        return redirect
+    if not proctoring_service.is_ready():
+        raise HTTPException(status_code=503, detail="Models are still loading")
+    if clock not in ("capture", "server"):
+        raise HTTPException(status_code=400, detail="clock must be 'capture' or 'server'")
+    use_capture_clock = clock == "capture"
+    if use_capture_clock and start_time is None:
+        start_time = time.time()
+    
+    session = proctoring_service.sessions.get(interview_id)
+    if use_capture_clock and session is not None and session["wall_clock"]:
+        # Past capture times would rewind the live session's face/focus timers and cooldowns
+        raise HTTPException(status_code=409, detail="Interview has a live session on the server clock; "
+                                                    "upload with clock=server")
+    
+    # A session this request creates is closed again unless a /stream socket took it over
+    new_session = session is None
+    if new_session:
+        admitted, reason = proctoring_service.admission.try_admit(len(active_connections))
+        if not admitted:
+            raise HTTPException(status_code=503, detail=reason)
+    
+    content_type = request.headers.get("content-type", "")
+    temp_paths = []
+    try:
+        if content_type.startswith("multipart/form-data"):
+            form = await request.form()
+            timestamps = json.loads(form["timestamps"]) if use_capture_clock and "timestamps" in form else None
+            parts = [part for part in form.getlist("frames") if hasattr(part, "read")]
+            images = [await part.read() for part in parts if not (part.content_type or "").startswith("video/")]
+            clips = [part for part in parts if (part.content_type or "").startswith("video/")]
+            if clips and images:
+                raise HTTPException(status_code=400, detail="Send either image parts or one clip")
+            if use_capture_clock and images:
+                # Every image needs a capture time: a missing one would fall back to the server clock
+                if timestamps is not None and (not isinstance(timestamps, list) or len(timestamps) != len(images)):
+                    raise HTTPException(status_code=400, detail=f"timestamps must be a list of {len(images)} "
+                                                                f"times, one per image")
+                if timestamps is None and sample_fps <= 0:
+                    raise HTTPException(status_code=400, detail="sample_fps must be positive to time images "
+                                                                "sent without timestamps")
+            if clips:
+                path = await asyncio.get_running_loop().run_in_executor(
+                    None, copy_upload, clips[0].file, os.path.splitext(clips[0].filename or "")[1]
+                )
+                temp_paths.append(path)
+                items = clip_items(path, start_time if use_capture_clock else None, sample_fps or None)
+            else:
+                items = image_items(images, timestamps, start_time if use_capture_clock else None, sample_fps)
+            await form.close()
+        elif content_type.startswith("video/"):
+            path = await save_upload(request.stream(), "." + content_type.split("/")[1].split(";")[0],
+                                     BULK_MAX_CLIP_BYTES)
+            temp_paths.append(path)
+            items = clip_items(path, start_time if use_capture_clock else None, sample_fps or None)
+        elif content_type.startswith("application/octet-stream"):
+            # Read fully before responding: the response streams while frames are analysed
+            items = binary_items(await request.body(), BULK_MAX_FRAME_BYTES, use_capture_clock)
+        else:
+            raise HTTPException(status_code=415, detail="Expected application/octet-stream, video/* or multipart/form-data")
+    except ValueError as e:
+        remove_files(temp_paths)
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        remove_files(temp_paths)
+        raise
+    
+    return StreamingResponse(
+        stream_results(
+            proctoring_service,
+            interview_id,
+            items,
+            batch_size=BULK_BATCH_SIZE,
+            end_session=(lambda: interview_id not in active_connections) if new_session else None,
+            deliver=send_events_to_backend if deliver else None,
+            cleanup=partial(remove_files, temp_paths),
+        ),
+        media_type="application/x-ndjson",
+    )
+
 @app.websocket("/stream/{interview_id}")
 async def websocket_endpoint(websocket: WebSocket, interview_id: str):
     """
     WebSocket endpoint for real-time video stream analysis
     """
     await websocket.accept()
+    if not router.is_local(interview_id):
+        # Another node owns this interview (and its live session): send the client there
+        owner = router.owner(interview_id)
+        await websocket.send_text(json.dumps({
+            "type": "redirect",
+            "url": f"{owner.replace('http', 'ws', 1)}/stream/{interview_id}"
+        }))
+        await websocket.close(code=REDIRECT_CLOSE_CODE)
+        return
+    if not proctoring_service.is_ready():
+        # 1013: try again later, once /ready reports this replica warm
+        await websocket.close(code=1013)
+        return
+    admitted, reason = proctoring_service.admission.try_admit(len(active_connections))
+    if not admitted and interview_id not in active_connections:
+        await websocket.send_text(json.dumps({"type": "error", "message": f"Session rejected: {reason}"}))
+        await websocket.close(code=1013, reason=reason)
+        return
     active_connections[interview_id] = websocket
     
+    # Frames wait here undecoded; when analysis falls behind the oldest are dropped
+    inbound = LatestFrameQueue(FRAME_QUEUE_SIZE)
+    # Per-connection flow control: latency, drops and the last capture recommendation
+    control = proctoring_service.stream_control.new_stream()
+    receiver = asyncio.create_task(receive_frames(websocket, interview_id, inbound, control))
+    
     try:
-        # Initialize proctoring session
-        await proctoring_service.start_session(interview_id)
+        # Initialize proctoring session (a socket replacing an open one continues its session,
+        # but not one a capture-clock bulk upload left on the video's clock)
+        session = proctoring_service.sessions.get(interview_id)
+        if session is None or not session["wall_clock"]:
+            await proctoring_service.start_session(interview_id)
         
         while True:
-            # Receive frame data
-            data = await websocket.receive_text()
-            frame_data = json.loads(data)
+            message = await inbound.get()
+            if message is None:
+                print(f"WebSocket disconnected for interview {interview_id}")
+                break
+            received = time.perf_counter()
             
-            if "image" in frame_data:
-                # Decode base64 image
-                image_data = base64.b64decode(frame_data["image"])
-                image = Image.open(io.BytesIO(image_data))
-                frame = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-                
-                # Analyze frame
-                events = await proctoring_service.analyze_frame(frame)
-                
-                # Send events back to client (always send, even if empty)
+            # A re-sent frame (same image bytes) reuses its detector outputs and skips decoding
+            frame = None
+            if message.get("bytes") is not None:
+                try:
+                    frame_info = parse_frame_header(message["bytes"])
+                    cache_key = proctoring_service.result_cache.key(frame_payload(message["bytes"]))
+                    events = await proctoring_service.analyze_cached(cache_key, interview_id)
+                    if events is None:
+                        with STAGE_SECONDS.time(stage="image_decode"):
+                            frame = decode_image(frame_payload(message["bytes"]))
+                except FrameProtocolError as e:
+                    FRAMES_DROPPED.inc(interview_id=interview_id, reason="protocol_error")
+                    await websocket.send_text(json.dumps({"type": "error", "message": str(e)}))
+                    continue
+            else:
+                frame_data = message["json"]
+                frame_info = {
+                    "seq": frame_data.get("seq"),
+                    "capture_timestamp": frame_data.get("timestamp")
+                }
+                cache_key = proctoring_service.result_cache.key(frame_data["image"])
+                events = await proctoring_service.analyze_cached(cache_key, interview_id)
+                if events is None:
+                    frame = decode_base64_frame(frame_data["image"])
+            
+            if events is None and frame is None:
+                FRAMES_DROPPED.inc(interview_id=interview_id, reason="decode_error")
+                await websocket.send_text(json.dumps({
+                    "type": "error",
+                    "message": "Could not decode image",
+                    "ack": frame_info["seq"]
+                }))
+                continue
+            
+            # Analyze frame
+            if events is None:
+                events = await proctoring_service.analyze_frame(frame, interview_id, cache_key=cache_key)
+            seconds = time.perf_counter() - received
+            proctoring_service.admission.record_frame(seconds)
+            proctoring_service.stream_control.on_processed(control, seconds)
+            
+            # Send events back to client (always send, even if empty)
+            with STAGE_SECONDS.time(stage="websocket_send"):
                 await websocket.send_text(json.dumps({
                     "type": "events",
                     "events": events,
                     "timestamp": time.time(),
-                    "frame_processed": True
+                    "frame_processed": True,
+                    "seq": frame_info["seq"],
+                    "capture_timestamp": frame_info["capture_timestamp"],
+                    # Returns the frame's flow-control credit to the client
+                    "ack": frame_info["seq"]
                 }))
-                print(f"📤 Sent events to client: {events}")
-                # Send events to Node.js backend only if there are events
-                if events:
-                    await send_events_to_backend(interview_id, events)
-                print(f"📤 Sent events to backend: {events}")
+            logger.debug("📤 Sent events to client: %s", events)
+            if stream_capture:
+                stream_capture.record_events(interview_id, message.get("capture_frame"), events)
+            await send_control(websocket, control)
+            # Queue events for the Node.js backend; delivery happens in the background
+            if events:
+                send_events_to_backend(interview_id, events)
     except WebSocketDisconnect:
         print(f"WebSocket disconnected for interview {interview_id}")
     except Exception as e:
         print(f"Error in WebSocket connection: {e}")
     finally:
         # Clean up
-        if interview_id in active_connections:
+        receiver.cancel()
+        if active_connections.get(interview_id) is websocket:
+            # A newer socket for the same interview keeps the live session
             del active_connections[interview_id]
-        await proctoring_service.end_session(interview_id)
+            if stream_capture:
+                stream_capture.close_interview(interview_id)
+            await proctoring_service.end_session(interview_id)
+
+async def send_control(websocket: WebSocket, control: Dict, force: bool = False):
+    """
+    Push recommended capture fps, resolution, JPEG quality and credits when they changed
+    """
+    message = proctoring_service.stream_control.control_message(
+        control, proctoring_service.admission, len(active_connections), force=force
+    )
+    if message:
+        await websocket.send_text(json.dumps(message))
 
-async def send_events_to_backend(interview_id: str, events: List[dict]):
+async def receive_frames(websocket: WebSocket, interview_id: str, inbound: LatestFrameQueue, control: Dict):
     """
-    Send events to Node.js backend
+    Read the socket as fast as the client sends: answer control messages right
+    away and queue frames (binary, or JSON/base64 text) for the analysis loop
     """
     try:
-        print(f"📤 Sending {len(events)} events to backend for interview {interview_id}")
-        async with httpx.AsyncClient() as client:
-            for event in events:
-                print(f"📤 Sending event: {event['eventType']} - {event['message']}")
-                response = await client.post(
-                    f"{BACKEND_URL}/api/events/{interview_id}",
-                    json=event,
-                    timeout=5.0
-                )
-                if response.status_code == 200:
-                    print(f"✅ Event sent successfully: {event['eventType']}")
-                else:
-                    print(f"❌ Failed to send event: {response.status_code} - {response.text}")
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            if message.get("bytes") is not None:
+                queued = {"bytes": message["bytes"]}
+            else:
+                frame_data = json.loads(message["text"])
+                
+                if frame_data.get("type") == "hello":
+                    # Protocol negotiation: accept binary frames if the client asks for them
+                    protocol = "binary" if frame_data.get("protocol") == "binary" else "json"
+                    await websocket.send_text(json.dumps({
+                        "type": "hello_ack",
+                        "protocol": protocol,
+                        "version": FRAME_VERSION
+                    }))
+                    await send_control(websocket, control, force=True)
+                    continue
+                
+                if "image" not in frame_data:
+                    continue
+                queued = {"json": frame_data}
+            
+            if stream_capture:
+                # Recorded as it arrived, including frames dropped below when analysis falls behind
+                queued["capture_frame"] = stream_capture.record(interview_id, queued, time.time())
+            stale = inbound.put(queued)
+            if stale is not None:
+                FRAMES_DROPPED.inc(interview_id=interview_id, reason="stale")
+                proctoring_service.stream_control.on_dropped(control)
+                seq = peek_frame_seq(stale["bytes"]) if "bytes" in stale else stale["json"].get("seq")
+                # Dropped frames give their credit back too
+                await websocket.send_text(json.dumps({"type": "ack", "ack": seq, "dropped": True}))
     except Exception as e:
-        print(f"❌ Error sending events to backend: {e}")
+        logger.debug("Receiver for interview %s stopped: %s", interview_id, e)
+    finally:
+        inbound.close()
+
+def send_events_to_backend(interview_id: str, events: List[dict]):
+    """
+    Queue events for the Node.js backend (batched, retried, non-blocking)
+    """
+    logger.debug("📤 Queued %d events for backend delivery (interview %s)", len(events), interview_id)
+    event_delivery.submit(interview_id, events)
+
+# Recorded videos that /analyze_video may read (the Node recording service's temp dir)
+RECORDINGS_DIR = os.path.realpath(os.getenv("RECORDINGS_DIR", "../server/temp"))
+VIDEO_ANALYSIS_WORKERS = int(os.getenv("VIDEO_ANALYSIS_WORKERS", "2"))
+
+@app.post("/analyze_video")
+async def analyze_recorded_video(request: dict):
+    """
+    Analyze a recorded interview video offline and return its event timeline
+    """
+    interview_id = request.get("interview_id")
+    if not interview_id or "path" not in request:
+        raise HTTPException(status_code=400, detail="interview_id and path are required")
+    path = os.path.realpath(os.path.join(RECORDINGS_DIR, request["path"]))
+    if not path.startswith(RECORDINGS_DIR + os.sep):
+        raise HTTPException(status_code=400, detail="path must be inside the recordings directory")
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Recording not found")
+    
+    try:
+        # Chunks run in their own processes; this thread only waits for them
+        result = await asyncio.get_running_loop().run_in_executor(None, partial(
+            analyze_video,
+            path,
+            interview_id,
+            workers=int(request.get("workers", VIDEO_ANALYSIS_WORKERS)),
+            chunk_seconds=float(request.get("chunk_seconds", 60)),
+            sample_fps=float(request.get("sample_fps", 5)) or None,
+            start_time=float(request.get("start_time", 0)),
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if request.get("deliver") and result["events"]:
+        send_events_to_backend(interview_id, result["events"])
+    return result
+
+async def send_timer_events(interview_id: str, events: List[dict]):
+    """
+    Deliver timeout events raised between frames (session timers) to the client and backend
+    """
+    websocket = active_connections.get(interview_id)
+    if websocket is not None:
+        try:
+            await websocket.send_text(json.dumps({
+                "type": "events",
+                "events": events,
+                "timestamp": time.time(),
+                "frame_processed": False
+            }))
+        except Exception as e:
+            logger.debug("Could not push timer events to interview %s: %s", interview_id, e)
+    send_events_to_backend(interview_id, events)
 
 @app.on_event("startup")
 async def startup_event():
     """
     Initialize models on startup
     """
+    # Models load and warm up in the background: /health answers right away,
+    # /ready (and frame traffic) waits until the models can meet latency targets
     print("Initializing proctoring service...")
-    await proctoring_service.initialize()
-    print("Proctoring service initialized successfully!")
+    app.state.initialization = asyncio.create_task(proctoring_service.initialize())
+    await event_delivery.start()
+    await router.start()
+    proctoring_service.start_timers(send_timer_events)
+    
+    # Gauges read live state at scrape time
+    metrics.ACTIVE_SESSIONS.set_function(lambda: len(proctoring_service.sessions))
+    metrics.OBJECT_BATCH_PENDING.set_function(
+        lambda: proctoring_service.object_batcher.pending() if proctoring_service.object_batcher else 0
+    )
+    metrics.EVENT_DELIVERY_PENDING.set_function(event_delivery.pending)
+    metrics.DEGRADATION_LEVEL.set_function(lambda: proctoring_service.admission.level)
+    print("Proctoring service startup scheduled; see /ready")
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -160,7 +571,14 @@ async def shutdown_event():
     Cleanup on shutdown
     """
     print("Shutting down proctoring service...")
+    initialization = getattr(app.state, "initialization", None)
+    if initialization and not initialization.done():
+        initialization.cancel()
     await proctoring_service.cleanup()
+    await event_delivery.close()
+    await router.close()
+    if stream_capture:
+        stream_capture.close()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,56 @@
+import os
+from typing import Dict, List, Optional
+
+# /proc/<pid>/smaps_rollup fields, in kB
+_SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def process_memory(pid: int) -> Optional[Dict[str, float]]:
+    """Resident memory of one process in MB, split into pages it shares and pages only it holds.
+
+    ``unique`` (USS) is what the process would free on exit, ``shared`` is
+    mapped by other processes too (e.g. weights inherited from a pre-fork
+    parent) and ``pss`` charges each shared page in equal parts to every
+    process mapping it. Linux only; None where smaps_rollup is unavailable.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+    values = {}
+    for line in lines:
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].rstrip(":") in _SMAPS_FIELDS:
+            values[parts[0].rstrip(":")] = int(parts[1]) / 1024.0
+    return {
+        "rss": round(values.get("Rss", 0.0), 1),
+        "pss": round(values.get("Pss", 0.0), 1),
+        "unique": round(values.get("Private_Clean", 0.0) + values.get("Private_Dirty", 0.0), 1),
+        "shared": round(values.get("Shared_Clean", 0.0) + values.get("Shared_Dirty", 0.0), 1),
+    }
+
+
+def memory_report(worker_pids: List[int], parent_pid: Optional[int] = None) -> Dict:
+    """Per-process memory of the service process and its inference workers, with totals.
+
+    ``rss_sum`` counts shared pages once per process (what per-process RSS
+    suggests); ``pss_sum`` is the real footprint of the whole group.
+    """
+    parent_pid = parent_pid or os.getpid()
+    parent = process_memory(parent_pid)
+    workers = {pid: process_memory(pid) for pid in worker_pids}
+    measured = [usage for usage in [parent, *workers.values()] if usage]
+    return {
+        "parent": parent,
+        "workers": {str(pid): usage for pid, usage in workers.items()},
+        "totals": {
+            "processes": len(measured),
+            "rss_sum": round(sum(usage["rss"] for usage in measured), 1),
+            "pss_sum": round(sum(usage["pss"] for usage in measured), 1),
+            "unique_sum": round(sum(usage["unique"] for usage in measured), 1),
+            "worker_unique_mean": round(
+                sum(usage["unique"] for usage in workers.values() if usage) / max(1, len(worker_pids)), 1
+            ),
+        },
+    }
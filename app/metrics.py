@@ -0,0 +1,203 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Latency buckets in seconds, from sub-millisecond decodes up to slow backend POSTs
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_registry: List["Metric"] = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metric:
+    """Base class for a labelled metric family rendered in Prometheus text format"""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Dict) -> Tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _format_labels(self, key: Tuple, extra: Optional[Dict] = None) -> str:
+        pairs = list(zip(self.labelnames, key)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+    def remove_matching(self, **labels):
+        """Drop every series whose labels include these values (e.g. when an interview ends)"""
+        positions = [(self.labelnames.index(k), str(v)) for k, v in labels.items()]
+        with self._lock:
+            for key in [k for k in self._series if all(k[i] == v for i, v in positions)]:
+                del self._series[key]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self._render_samples())
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._series: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def _render_samples(self):
+        with self._lock:
+            return [f"{self.name}{self._format_labels(k)} {v}" for k, v in self._series.items()]
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._series: Dict[Tuple, float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._series[self._key(labels)] = value
+
+    def set_function(self, function: Callable[[], float]):
+        """Evaluate ``function`` at scrape time instead of storing a value"""
+        self._function = function
+
+    def _render_samples(self):
+        if self._function is not None:
+            return [f"{self.name} {self._function()}"]
+        with self._lock:
+            return [f"{self.name}{self._format_labels(k)} {v}" for k, v in self._series.items()]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, *args, buckets: Tuple[float, ...] = LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, List] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the ``with`` block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_samples(self):
+        lines = []
+        with self._lock:
+            for key, series in self._series.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{self._format_labels(key, {'le': bound})} {cumulative}")
+                lines.append(f"{self.name}_bucket{self._format_labels(key, {'le': '+Inf'})} {series[-1]}")
+                lines.append(f"{self.name}_sum{self._format_labels(key)} {series[-2]}")
+                lines.append(f"{self.name}_count{self._format_labels(key)} {series[-1]}")
+        return lines
+
+
+def render() -> str:
+    """All registered metrics in Prometheus text exposition format"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# Service metrics
+STAGE_SECONDS = Histogram(
+    "proctoring_stage_seconds",
+    "Time spent in each frame-processing stage",
+    ("stage",),
+)
+FRAMES_PROCESSED = Counter(
+    "proctoring_frames_processed_total",
+    "Frames answered per interview, by outcome (analyzed, gated or cached)",
+    ("interview_id", "outcome"),
+)
+FRAMES_DROPPED = Counter(
+    "proctoring_frames_dropped_total",
+    "Frames received but not analysed, per interview and reason",
+    ("interview_id", "reason"),
+)
+ACTIVE_SESSIONS = Gauge(
+    "proctoring_active_sessions",
+    "Proctoring sessions currently open",
+)
+OBJECT_BATCH_PENDING = Gauge(
+    "proctoring_object_batch_pending",
+    "Frames waiting for the next batched YOLO call",
+)
+EVENT_DELIVERY_PENDING = Gauge(
+    "proctoring_event_delivery_pending",
+    "Events buffered for delivery to the backend",
+)
+EVENTS_DELIVERED = Counter(
+    "proctoring_events_delivery_total",
+    "Backend event delivery outcomes",
+    ("outcome",),
+)
+
+DEGRADATION_LEVEL = Gauge(
+    "proctoring_degradation_level",
+    "Current step on the degradation ladder (0 = normal)",
+)
+STREAMS_STALLED = Counter(
+    "proctoring_streams_stalled_total",
+    "Sessions whose client stopped sending frames",
+)
+SESSIONS_REAPED = Counter(
+    "proctoring_sessions_reaped_total",
+    "Abandoned sessions closed by the session timers",
+)
+SESSION_TIMER_EVENTS = Counter(
+    "proctoring_session_timer_events_total",
+    "Timeout events raised by the session timers rather than by a frame",
+    ("event_type",),
+)
+RESULT_CACHE_LOOKUPS = Counter(
+    "proctoring_result_cache_lookups_total",
+    "Detector-result cache lookups for re-sent frames, by outcome",
+    ("outcome",),
+)
+
+
+def forget_interview(interview_id: str):
+    """Drop per-interview series so label cardinality follows live sessions"""
+    FRAMES_PROCESSED.remove_matching(interview_id=interview_id)
+    FRAMES_DROPPED.remove_matching(interview_id=interview_id)
@@ -0,0 +1,104 @@
+import asyncio
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from inference_pool import InferencePool
+from metrics import STAGE_SECONDS
+
+
+class ObjectBatcher:
+    """Coalesces YOLO requests from all live sessions into batched forward passes.
+
+    Each session awaits ``submit(frame)``. Frames are collected until either
+    ``max_batch_size`` frames are pending or the oldest one has waited
+    ``max_wait`` seconds, then the batch goes to the inference pool as a
+    single ``detect_objects_batch`` call and every caller gets back the boxes
+    for its own frame. Cooldowns stay with the caller, so results are still
+    filtered per interview by ``should_send_event``.
+    """
+
+    def __init__(self, pool: InferencePool, max_batch_size: int = 8, max_wait: float = 0.01):
+        self.pool = pool
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait)
+        self._pending = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight = set()
+
+        # Counters for tuning the window
+        self.batches_run = 0
+        self.frames_batched = 0
+
+    async def submit(self, frame: np.ndarray) -> List[Dict]:
+        """Queue a frame for the next batch and wait for its detections"""
+        if self.max_batch_size == 1:
+            return (await self._detect([frame]))[0]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((frame, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Send up to max_batch_size pending frames to the pool"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch = self._pending[:self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size:]
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+        if self._pending:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+
+    async def _run_batch(self, batch):
+        frames = [frame for frame, _ in batch]
+        try:
+            results = await self._detect(frames)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches_run += 1
+        self.frames_batched += len(batch)
+        for (_, future), objects in zip(batch, results):
+            if not future.done():
+                future.set_result(objects)
+
+    async def _detect(self, frames):
+        results, seconds = await self.pool.run("detect_objects_batch_timed", frames)
+        STAGE_SECONDS.observe(seconds, stage="yolo")
+        return results
+
+    def pending(self) -> int:
+        """Frames waiting for the next batch"""
+        return len(self._pending)
+
+    def stats(self) -> Dict:
+        """Batching counters"""
+        return {
+            "batches_run": self.batches_run,
+            "frames_batched": self.frames_batched,
+            "mean_batch_size": self.frames_batched / self.batches_run if self.batches_run else 0.0,
+            "pending": len(self._pending),
+        }
+
+    async def close(self):
+        """Flush whatever is pending and wait for in-flight batches"""
+        while self._pending:
+            self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
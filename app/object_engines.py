@@ -0,0 +1,249 @@
+import ast
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from preprocessing import Letterboxer
+
+OBJECT_ENGINES = ("torch", "onnxruntime", "openvino")
+
+DEFAULT_MODEL_PATHS = {
+    "torch": "yolov8n.pt",
+    "onnxruntime": "yolov8n.onnx",
+    "openvino": "yolov8n_openvino_model",
+}
+
+# COCO class names, used when an exported model carries no names metadata
+COCO_NAMES = [
+    "person", "bicycle", "car", "motorcycle", "airplane", "bus", "train", "truck", "boat",
+    "traffic light", "fire hydrant", "stop sign", "parking meter", "bench", "bird", "cat", "dog",
+    "horse", "sheep", "cow", "elephant", "bear", "zebra", "giraffe", "backpack", "umbrella",
+    "handbag", "tie", "suitcase", "frisbee", "skis", "snowboard", "sports ball", "kite",
+    "baseball bat", "baseball glove", "skateboard", "surfboard", "tennis racket", "bottle",
+    "wine glass", "cup", "fork", "knife", "spoon", "bowl", "banana", "apple", "sandwich", "orange",
+    "broccoli", "carrot", "hot dog", "pizza", "donut", "cake", "chair", "couch", "potted plant",
+    "bed", "dining table", "toilet", "tv", "laptop", "mouse", "remote", "keyboard", "cell phone",
+    "microwave", "oven", "toaster", "sink", "refrigerator", "book", "clock", "vase", "scissors",
+    "teddy bear", "hair drier", "toothbrush",
+]
+
+
+class ObjectEngine(ABC):
+    """Interface for the object-detection stage.
+
+    ``detect_batch`` takes BGR frames and returns, per frame, a list of
+    ``{"label", "confidence", "bbox"}`` dicts with ``bbox`` in source pixel
+    coordinates, which is what ``ProctoringService.process_detections`` reads.
+    """
+
+    name = "base"
+    # Whether a loaded engine may be inherited by forked workers (no native threads started by load)
+    fork_safe = False
+
+    def __init__(self, model_path: str, confidence: float = 0.3, iou: float = 0.7, imgsz: int = 640):
+        self.model_path = model_path
+        self.confidence = confidence
+        self.iou = iou
+        self.imgsz = imgsz
+        self.names: Dict[int, str] = {}
+
+    @abstractmethod
+    def load(self):
+        """Load the weights; returns the engine"""
+
+    @abstractmethod
+    def detect_batch(self, frames: List[np.ndarray]) -> List[List[Dict]]:
+        """Boxes of every frame, in input order"""
+
+    def freeze(self):
+        """Put the weights in their final, inference-only form before workers fork off them"""
+
+
+class TorchEngine(ObjectEngine):
+    """The ultralytics/PyTorch YOLOv8 baseline"""
+
+    name = "torch"
+    fork_safe = True
+
+    def load(self):
+        from ultralytics import YOLO
+        self.model = YOLO(self.model_path)
+        self.names = dict(self.model.names)
+        return self
+
+    def freeze(self):
+        # Fused once here rather than by every worker's first predict, which
+        # would give each of them private copies of the fused weights
+        self.model.fuse()
+        self.model.model.eval()
+        for parameter in self.model.model.parameters():
+            parameter.requires_grad_(False)
+
+    def detect_batch(self, frames: List[np.ndarray]) -> List[List[Dict]]:
+        batch_objects = [[] for _ in frames]
+        results = self.model(frames, verbose=False, conf=self.confidence, iou=self.iou, imgsz=self.imgsz)
+        for objects, result in zip(batch_objects, results):
+            boxes = result.boxes
+            if boxes is None:
+                continue
+            for box in boxes:
+                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
+                objects.append({
+                    "label": self.names[int(box.cls[0])],
+                    "confidence": float(box.conf[0]),
+                    "bbox": [int(x1), int(y1), int(x2), int(y2)],
+                })
+        return batch_objects
+
+
+class ExportedYoloEngine(ObjectEngine):
+    """Shared NumPy/OpenCV pre- and post-processing for exported YOLOv8 graphs.
+
+    Frames are letterboxed to ``imgsz`` the same way ultralytics does, into
+    reused buffers (see preprocessing.Letterboxer), and the raw
+    ``(batch, 4 + classes, anchors)`` output is decoded with per-class NMS,
+    so neither torch nor ultralytics needs to be imported at runtime.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.letterboxer = Letterboxer(self.imgsz)
+
+    def preprocess(self, frames: List[np.ndarray]):
+        """Model input batch (reused by the next call) and the letterbox transform of each frame"""
+        return self.letterboxer.batch(frames)
+
+    def postprocess(self, output: np.ndarray, transforms) -> List[List[Dict]]:
+        batch_objects = []
+        for prediction, transform in zip(output, transforms):
+            prediction = prediction.T  # (anchors, 4 + classes)
+            scores = prediction[:, 4:]
+            class_ids = scores.argmax(axis=1)
+            confidences = scores[np.arange(len(class_ids)), class_ids]
+            keep = confidences > self.confidence
+
+            boxes = prediction[keep, :4]
+            class_ids, confidences = class_ids[keep], confidences[keep]
+            objects = []
+            if len(boxes):
+                # cx, cy, w, h in letterbox space -> x, y, w, h for NMS
+                xywh = np.column_stack((boxes[:, 0] - boxes[:, 2] / 2, boxes[:, 1] - boxes[:, 3] / 2,
+                                        boxes[:, 2], boxes[:, 3]))
+                indices = cv2.dnn.NMSBoxesBatched(
+                    xywh.tolist(), confidences.tolist(), class_ids.tolist(), self.confidence, self.iou
+                )
+                for index in np.array(indices).reshape(-1):
+                    x, y, w, h = xywh[index]
+                    objects.append({
+                        "label": self.names.get(int(class_ids[index]), str(class_ids[index])),
+                        "confidence": float(confidences[index]),
+                        # Letterbox space -> source-frame pixels
+                        "bbox": transform.to_source(x, y, x + w, y + h),
+                    })
+            batch_objects.append(objects)
+        return batch_objects
+
+    def detect_batch(self, frames: List[np.ndarray]) -> List[List[Dict]]:
+        if not frames:
+            return []
+        batch, transforms = self.preprocess(frames)
+        return self.postprocess(self.infer(batch), transforms)
+
+    @abstractmethod
+    def infer(self, batch: np.ndarray) -> np.ndarray:
+        """Raw model output for a preprocessed NCHW batch"""
+
+    @staticmethod
+    def parse_names(raw: Optional[str]) -> Dict[int, str]:
+        if raw:
+            try:
+                return {int(k): v for k, v in ast.literal_eval(raw).items()}
+            except (ValueError, SyntaxError):
+                pass
+        return dict(enumerate(COCO_NAMES))
+
+
+class OnnxRuntimeEngine(ExportedYoloEngine):
+    """YOLOv8 exported to ONNX (fp32 or INT8-quantized) on ONNX Runtime's CPU provider"""
+
+    name = "onnxruntime"
+    # With intra_op_num_threads=1 the session has no thread pool of its own
+    fork_safe = True
+
+    def __init__(self, *args, intra_op_threads: int = 1, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.intra_op_threads = intra_op_threads
+
+    def load(self):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.intra_op_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(self.model_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.names = self.parse_names(self.session.get_modelmeta().custom_metadata_map.get("names"))
+        return self
+
+    def infer(self, batch: np.ndarray) -> np.ndarray:
+        # Exports with a fixed batch dimension of 1 are run frame by frame
+        if self.session.get_inputs()[0].shape[0] == 1 and len(batch) > 1:
+            return np.concatenate([self.session.run(None, {self.input_name: batch[i:i + 1]})[0]
+                                   for i in range(len(batch))])
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class OpenVinoEngine(ExportedYoloEngine):
+    """YOLOv8 exported to OpenVINO IR (fp32/fp16 or INT8) on the CPU plugin"""
+
+    name = "openvino"
+
+    def __init__(self, *args, num_threads: int = 1, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.num_threads = num_threads
+
+    def load(self):
+        import openvino as ov
+        core = ov.Core()
+        xml_path = self.model_path
+        if os.path.isdir(xml_path):
+            xml_path = next(os.path.join(self.model_path, f) for f in os.listdir(self.model_path) if f.endswith(".xml"))
+        model = core.read_model(xml_path)
+        self.compiled = core.compile_model(model, "CPU", {"INFERENCE_NUM_THREADS": self.num_threads})
+        self.names = self.parse_names(self._read_names(model))
+        return self
+
+    def _read_names(self, model) -> Optional[str]:
+        # ultralytics stores names in the IR runtime info and in metadata.yaml
+        try:
+            return str(model.get_rt_info(["model_info", "names"]).astype(str))
+        except Exception:
+            pass
+        metadata = os.path.join(os.path.dirname(self.model_path) if not os.path.isdir(self.model_path)
+                                else self.model_path, "metadata.yaml")
+        if os.path.exists(metadata):
+            import yaml
+            with open(metadata) as f:
+                return str(yaml.safe_load(f).get("names"))
+        return None
+
+    def infer(self, batch: np.ndarray) -> np.ndarray:
+        request = self.compiled.create_infer_request()
+        if self.compiled.input(0).partial_shape[0].is_static and len(batch) > 1:
+            return np.concatenate([np.array(request.infer({0: batch[i:i + 1]})[0]) for i in range(len(batch))])
+        return np.array(request.infer({0: batch})[0])
+
+
+def create_object_engine(engine: str = "torch", model_path: Optional[str] = None, confidence: float = 0.3,
+                         num_threads: int = 1) -> ObjectEngine:
+    """Build and load the configured object-detection engine"""
+    if engine not in OBJECT_ENGINES:
+        raise ValueError(f"Unknown object engine '{engine}', expected one of {OBJECT_ENGINES}")
+    model_path = model_path or DEFAULT_MODEL_PATHS[engine]
+    if engine == "torch":
+        return TorchEngine(model_path, confidence).load()
+    if engine == "onnxruntime":
+        return OnnxRuntimeEngine(model_path, confidence, intra_op_threads=num_threads).load()
+    return OpenVinoEngine(model_path, confidence, num_threads=num_threads).load()
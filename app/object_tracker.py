@@ -0,0 +1,196 @@
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of (A, 4) and (B, 4) [x1, y1, x2, y2] boxes, shape (A, B)"""
+    if len(boxes_a) == 0 or len(boxes_b) == 0:
+        return np.zeros((len(boxes_a), len(boxes_b)), dtype=np.float32)
+    a = boxes_a[:, None, :]
+    b = boxes_b[None, :, :]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-6)
+
+
+def greedy_match(scores: np.ndarray, threshold: float) -> List[Tuple[int, int]]:
+    """Pairs (row, col) by descending score, each row and column used once, score >= threshold"""
+    pairs = []
+    if scores.size == 0:
+        return pairs
+    scores = scores.copy()
+    while True:
+        row, col = np.unravel_index(np.argmax(scores), scores.shape)
+        if scores[row, col] < threshold:
+            return pairs
+        pairs.append((int(row), int(col)))
+        scores[row, :] = -1
+        scores[:, col] = -1
+
+
+class ObjectTracker:
+    """Keeps identities of detected objects across frames (ByteTrack-style, CPU only).
+
+    Association is by IoU within the same label, in two passes: confident
+    detections first, then low-confidence ones, which only keep existing
+    tracks alive through confidence dips and never start new tracks. Boxes
+    follow a constant-velocity alpha-beta filter (a steady-state Kalman
+    filter), so tracks are propagated on frames where YOLO did not run and
+    still line up with the next, sparser, detection.
+
+    A track is confirmed after ``min_hits`` matched detections and is gone
+    once it has not been matched for ``max_age`` seconds and on at least
+    ``max_misses`` YOLO runs in a row. Tracks only age on frames where YOLO
+    ran: while detection is skipped (scheduler, change gate, degradation)
+    nothing can disappear, however long the gap. ``update`` and
+    ``predict`` return lifecycle transitions: ``appeared`` (confirmed),
+    ``present`` (every ``report_interval`` seconds while confirmed) and
+    ``gone``.
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, min_hits: int = 2, max_age: float = 3.0,
+                 report_interval: float = 30.0, low_confidence: float = 0.1,
+                 alpha: float = 0.6, beta: float = 0.2, max_misses: int = 2):
+        self.iou_threshold = iou_threshold
+        self.min_hits = min_hits
+        self.max_age = max_age
+        self.max_misses = max_misses
+        self.report_interval = report_interval
+        self.low_confidence = low_confidence
+        self.alpha = alpha
+        self.beta = beta
+
+    def new_session(self) -> Dict:
+        return {"tracks": [], "next_id": 1, "last_time": None}
+
+    def predict(self, state: Dict, now: float) -> List[Tuple[str, Dict]]:
+        """Propagate every track to ``now`` without a detection (YOLO skipped); returns lifecycle transitions"""
+        self._advance(state, now)
+        return self._age(state, now, detected=False)
+
+    def update(self, state: Dict, detections: List[Dict], confident, now: float) -> List[Tuple[str, Dict]]:
+        """Associate one frame of detections; ``confident(detection)`` marks ones that may start tracks"""
+        self._advance(state, now)
+        transitions = []
+        high = [d for d in detections if confident(d)]
+        low = [d for d in detections if not confident(d) and d["confidence"] >= self.low_confidence]
+
+        unmatched = state["tracks"]
+        unmatched_high = high
+        for pool in (high, low):
+            pairs = greedy_match(self._scores(unmatched, pool), self.iou_threshold)
+            for row, col in pairs:
+                track = unmatched[row]
+                self._correct(track, pool[col], now)
+                if track["hits"] == self.min_hits:
+                    track["last_report"] = now
+                    transitions.append(("appeared", track))
+            if pool is high:
+                matched_cols = {col for _, col in pairs}
+                unmatched_high = [d for col, d in enumerate(high) if col not in matched_cols]
+            matched_rows = {row for row, _ in pairs}
+            unmatched = [track for row, track in enumerate(unmatched) if row not in matched_rows]
+        for track in unmatched:
+            track["misses"] += 1
+
+        # Only confident detections nobody claimed start new tracks
+        for detection in unmatched_high:
+            track = self._start(state, detection, now)
+            if track["hits"] >= self.min_hits:
+                transitions.append(("appeared", track))
+
+        return transitions + self._age(state, now, detected=True)
+
+    def _advance(self, state: Dict, now: float) -> float:
+        """Move every track along its velocity to ``now``; returns the elapsed seconds"""
+        last_time = state["last_time"]
+        dt = 0.0 if last_time is None else max(0.0, now - last_time)
+        state["last_time"] = now
+        for track in state["tracks"]:
+            track["center"] = track["center"] + track["velocity"] * dt
+        return dt
+
+    def _scores(self, tracks: List[Dict], detections: List[Dict]) -> np.ndarray:
+        if not tracks or not detections:
+            return np.zeros((len(tracks), len(detections)), dtype=np.float32)
+        scores = iou_matrix(np.array([self._box(t) for t in tracks], dtype=np.float32),
+                            np.array([d["bbox"] for d in detections], dtype=np.float32))
+        labels_match = np.array([[t["label"] == d["label"] for d in detections] for t in tracks])
+        return np.where(labels_match, scores, 0.0)
+
+    def _start(self, state: Dict, detection: Dict, now: float) -> Dict:
+        x1, y1, x2, y2 = detection["bbox"]
+        track = {
+            "id": state["next_id"],
+            "label": detection["label"],
+            "confidence": detection["confidence"],
+            "center": np.array([(x1 + x2) / 2, (y1 + y2) / 2], dtype=np.float32),
+            "size": np.array([x2 - x1, y2 - y1], dtype=np.float32),
+            "velocity": np.zeros(2, dtype=np.float32),
+            "first_seen": now,
+            "last_seen": now,
+            "last_report": now,
+            "hits": 1,
+            "misses": 0,  # YOLO runs in a row that did not match this track
+        }
+        state["next_id"] += 1
+        state["tracks"].append(track)
+        return track
+
+    def _correct(self, track: Dict, detection: Dict, now: float):
+        """Alpha-beta update of the predicted box with a matched detection"""
+        x1, y1, x2, y2 = detection["bbox"]
+        measured = np.array([(x1 + x2) / 2, (y1 + y2) / 2], dtype=np.float32)
+        residual = measured - track["center"]
+        # The residual built up over the whole gap since the last detection
+        elapsed = now - track["last_seen"]
+        track["center"] = track["center"] + self.alpha * residual
+        if elapsed > 0:
+            track["velocity"] = track["velocity"] + self.beta * residual / elapsed
+        track["size"] = track["size"] + self.alpha * (np.array([x2 - x1, y2 - y1], dtype=np.float32) - track["size"])
+        track["confidence"] = detection["confidence"]
+        track["last_seen"] = now
+        track["hits"] += 1
+        track["misses"] = 0
+
+    def _age(self, state: Dict, now: float, detected: bool) -> List[Tuple[str, Dict]]:
+        """Drop tracks YOLO has stopped seeing (only judged when it ran) and emit periodic reports"""
+        transitions = []
+        alive = []
+        for track in state["tracks"]:
+            confirmed = track["hits"] >= self.min_hits
+            if detected and track["misses"] >= self.max_misses and now - track["last_seen"] > self.max_age:
+                if confirmed:
+                    transitions.append(("gone", track))
+                continue
+            alive.append(track)
+            if confirmed and now - track["last_report"] >= self.report_interval:
+                track["last_report"] = now
+                transitions.append(("present", track))
+        state["tracks"] = alive
+        return transitions
+
+    @staticmethod
+    def _box(track: Dict) -> List[float]:
+        (cx, cy), (w, h) = track["center"], track["size"]
+        return [cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2]
+
+    @staticmethod
+    def bbox(track: Dict) -> List[float]:
+        """Current (predicted or corrected) box of a track in source pixels"""
+        return [float(v) for v in ObjectTracker._box(track)]
+
+    @staticmethod
+    def dwell_time(track: Dict, now: Optional[float] = None) -> float:
+        """Seconds between the first and the last (or ``now``) sighting"""
+        return (track["last_seen"] if now is None else now) - track["first_seen"]
+
+    @staticmethod
+    def stats(state: Dict) -> Dict:
+        return {
+            "active_tracks": len(state["tracks"]),
+            "tracks_started": state["next_id"] - 1,
+        }
@@ -0,0 +1,103 @@
+from typing import Dict, List, NamedTuple, Tuple
+
+import cv2
+import numpy as np
+
+
+class BufferPool:
+    """Named scratch arrays reused from frame to frame.
+
+    ``get`` returns a C-contiguous array of the requested shape carved from
+    the front of a flat buffer that only ever grows, so once the largest
+    shape has been seen, getting any array of that size or smaller allocates
+    nothing (frame crops change shape every frame and still reuse memory).
+    An array is valid until the next ``get`` of the same name; whoever keeps
+    its contents past that copies them.
+    """
+
+    def __init__(self):
+        self._buffers: Dict[str, np.ndarray] = {}
+
+    def get(self, name: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        dtype = np.dtype(dtype)
+        size = int(np.prod(shape))
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.size < size or buffer.dtype != dtype:
+            buffer = np.empty(size, dtype=dtype)
+            self._buffers[name] = buffer
+        return buffer[:size].reshape(shape)
+
+    def nbytes(self) -> int:
+        return sum(buffer.nbytes for buffer in self._buffers.values())
+
+
+class LetterboxTransform(NamedTuple):
+    """Where a source frame sits inside its letterboxed model input"""
+    scale: float
+    left: int
+    top: int
+    width: int
+    height: int
+
+    def to_source(self, x1: float, y1: float, x2: float, y2: float) -> List[int]:
+        """Box in model-input pixels -> box in source-frame pixels"""
+        return [
+            int(np.clip((x1 - self.left) / self.scale, 0, self.width)),
+            int(np.clip((y1 - self.top) / self.scale, 0, self.height)),
+            int(np.clip((x2 - self.left) / self.scale, 0, self.width)),
+            int(np.clip((y2 - self.top) / self.scale, 0, self.height)),
+        ]
+
+
+class Letterboxer:
+    """Builds YOLO input tensors in place, the way ultralytics letterboxes.
+
+    Each frame is resized once, straight into the middle of a preallocated
+    ``size`` x ``size`` canvas (``cv2.resize`` with ``dst=``); the gray
+    padding is only repainted when a canvas's layout changes. Canvases are
+    then packed into one reusable float32 RGB NCHW batch without
+    intermediate arrays.
+    """
+
+    def __init__(self, size: int = 640, pad_value: int = 114):
+        self.size = size
+        self.pad_value = pad_value
+        self.buffers = BufferPool()
+        self._canvases: List[np.ndarray] = []
+        self._layouts: List[Tuple[int, int, int, int]] = []
+
+    def transform(self, width: int, height: int) -> Tuple[LetterboxTransform, int, int]:
+        """Letterbox placement of a width x height frame, plus its resized width and height"""
+        scale = min(self.size / height, self.size / width)
+        new_w, new_h = int(round(width * scale)), int(round(height * scale))
+        left = int(round((self.size - new_w) / 2 - 0.1))
+        top = int(round((self.size - new_h) / 2 - 0.1))
+        return LetterboxTransform(scale, left, top, width, height), new_w, new_h
+
+    def canvas(self, index: int, frame: np.ndarray) -> Tuple[np.ndarray, LetterboxTransform]:
+        """Letterbox ``frame`` (BGR uint8) into canvas ``index``"""
+        while len(self._canvases) <= index:
+            self._canvases.append(np.full((self.size, self.size, 3), self.pad_value, dtype=np.uint8))
+            self._layouts.append(None)
+        canvas = self._canvases[index]
+        height, width = frame.shape[:2]
+        transform, new_w, new_h = self.transform(width, height)
+        layout = (new_w, new_h, transform.left, transform.top)
+        if self._layouts[index] != layout:
+            canvas.fill(self.pad_value)
+            self._layouts[index] = layout
+        region = canvas[transform.top:transform.top + new_h, transform.left:transform.left + new_w]
+        cv2.resize(frame, (new_w, new_h), dst=region, interpolation=cv2.INTER_LINEAR)
+        return canvas, transform
+
+    def batch(self, frames: List[np.ndarray]) -> Tuple[np.ndarray, List[LetterboxTransform]]:
+        """(N, 3, size, size) float32 RGB in 0..1, valid until the next call, plus one transform per frame"""
+        batch = self.buffers.get("batch", (len(frames), 3, self.size, self.size), np.float32)
+        transforms = []
+        for i, frame in enumerate(frames):
+            canvas, transform = self.canvas(i, frame)
+            # BGR HWC uint8 -> RGB CHW float, written straight into the batch
+            np.multiply(canvas[:, :, ::-1].transpose(2, 0, 1), np.float32(1 / 255.0), out=batch[i],
+                        casting="unsafe")
+            transforms.append(transform)
+        return batch, transforms
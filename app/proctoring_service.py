@@ -1,17 +1,48 @@
 import cv2
+import logging
+import os
 import time
-import torch
-import mediapipe as mp
 import numpy as np
-from typing import List, Dict, Optional
+from contextlib import nullcontext
+from functools import partial
+from typing import Awaitable, Callable, List, Dict, Optional
 import asyncio
-import math
+
+import geometry
+from admission import DEGRADATION_LEVELS, AdmissionController
+from detector_scheduler import DetectorScheduler
+from detectors import create_frame_detectors, preload_frame_detectors
+from frame_gate import FrameGate
+from inference_pool import InferencePool
+from metrics import (
+    FRAMES_PROCESSED,
+    SESSION_TIMER_EVENTS,
+    SESSIONS_REAPED,
+    STAGE_SECONDS,
+    STREAMS_STALLED,
+    forget_interview,
+)
+from object_batcher import ObjectBatcher
+from object_engines import DEFAULT_MODEL_PATHS
+from object_tracker import ObjectTracker
+from preprocessing import BufferPool
+from result_cache import ResultCache, config_version
+from session_store import create_session_store, persisted_state
+from session_timers import TimerHeap
+from stream_control import StreamController
+
+# Per-frame diagnostics go through logging at DEBUG so they cost nothing by default
+logger = logging.getLogger(__name__)
+
+# Timers armed per live session
+SESSION_TIMERS = ("face", "focus", "stream")
+# Detector outputs of a frame the change gate skipped: every stage carries its last state forward
+GATED_DETECTIONS = {"num_faces": None, "face_landmarks": None, "face_detection_ran": False, "objects": None}
 
 class ProctoringService:
-    def __init__(self):
-        self.model = None
-        self.face_detector = None
-        self.face_mesh = None
+    def __init__(self, inference_mode: Optional[str] = None, inference_workers: Optional[int] = None):
+        self.pool = None
+        self.object_batcher = None
         self.sessions = {}
         
         # Configuration
@@ -19,8 +50,10 @@ class ProctoringService:
         self.face_timeout = 8   # seconds (reduced for more responsive detection)
         self.drowsiness_threshold = 0.25
         self.focus_threshold = 0.35  # 15% deviation from center
-        self.ear_frames = 0  # Counter for consecutive low EAR frames
         self.ear_threshold_frames = 3  # Number of frames to confirm drowsiness
+        # Head pose limits in degrees for counting as focused, 0 disables the check
+        self.head_pose_max_yaw = float(os.getenv("HEAD_POSE_MAX_YAW", "30"))
+        self.head_pose_max_pitch = float(os.getenv("HEAD_POSE_MAX_PITCH", "30"))
         
         # YOLOv8 classes that are actually detected - using COCO dataset classes
         self.target_objects = [
@@ -31,219 +64,274 @@ class ProctoringService:
         self.last_events = {}  # Store last event of each type per session
         self.event_cooldown = 3  # Minimum seconds between same event type (reduced for better detection)
         
+        # Inference execution: inline | thread | process | prefork (see inference_pool.InferencePool);
+        # the arguments override the environment for embedded services such as video_analysis chunks
+        self.inference_mode = inference_mode or os.getenv("INFERENCE_MODE", "thread")
+        self.inference_workers = inference_workers or int(os.getenv("INFERENCE_WORKERS", "2"))
+        self.inference_threads_per_worker = int(os.getenv("INFERENCE_THREADS_PER_WORKER", "1"))
+        # Shared-memory frame slots for process mode (see frame_ring.FrameRing), 0 = pickle frames
+        self.frame_ring_slots = int(os.getenv("FRAME_RING_SLOTS", "16"))
+        self.frame_ring_max_size = (int(os.getenv("FRAME_RING_MAX_WIDTH", "1280")),
+                                    int(os.getenv("FRAME_RING_MAX_HEIGHT", "720")))
+        
+        # Per-detector rates in runs per second, 0 = every frame (see detector_scheduler)
+        self.detector_scheduler = DetectorScheduler({
+            "face_mesh": float(os.getenv("FACE_MESH_FPS", "0")),
+            "face_detection": float(os.getenv("FACE_DETECTION_FPS", "1")),
+            "objects": float(os.getenv("OBJECT_DETECTION_FPS", "1")),
+        })
+        
+        # Object tracks between sparse YOLO runs (see object_tracker.ObjectTracker)
+        self.object_tracker = ObjectTracker(
+            iou_threshold=float(os.getenv("OBJECT_TRACK_IOU", "0.3")),
+            min_hits=int(os.getenv("OBJECT_TRACK_MIN_HITS", "2")),
+            max_age=float(os.getenv("OBJECT_TRACK_MAX_AGE", "3")),
+            max_misses=int(os.getenv("OBJECT_TRACK_MAX_MISSES", "2")),
+            report_interval=float(os.getenv("OBJECT_TRACK_REPORT_INTERVAL", "30")),
+        )
+        
+        # Change gating: skip detectors on frames that barely changed (see frame_gate.FrameGate)
+        self.frame_gate = FrameGate(
+            threshold=float(os.getenv("FRAME_GATE_THRESHOLD", "0.02")),
+            max_skip_seconds=float(os.getenv("FRAME_GATE_MAX_SKIP_SECONDS", "1.0")),
+        )
+        
+        # Per-session FaceMesh graphs (see face_graph_pool.FaceMeshPool)
+        self.face_mesh_pool_size = int(os.getenv("FACE_MESH_POOL_SIZE", "32"))
+        self.face_mesh_idle_timeout = float(os.getenv("FACE_MESH_IDLE_TIMEOUT", "60"))
+        # Padding around the tracked face, as a fraction of its size, for the mesh crop
+        self.face_roi_padding = float(os.getenv("FACE_ROI_PADDING", "0.3"))
+        # Width the full-frame face detector sees (it works at 128x128 internally); 0 = full frames
+        self.face_detection_width = int(os.getenv("FACE_DETECTION_WIDTH", "320"))
+        
+        # Object-detection backend: torch | onnxruntime | openvino (see object_engines)
+        self.object_engine = os.getenv("OBJECT_ENGINE", "torch")
+        self.object_model_path = os.getenv("OBJECT_MODEL_PATH") or None
+        # Pre-baked model directory (e.g. populated at image build time)
+        self.model_cache_dir = os.getenv("MODEL_CACHE_DIR") or None
+        if self.object_model_path is None and self.model_cache_dir and self.object_engine in DEFAULT_MODEL_PATHS:
+            self.object_model_path = os.path.join(self.model_cache_dir, DEFAULT_MODEL_PATHS[self.object_engine])
+        
+        # Cross-session YOLO micro-batching (see object_batcher.ObjectBatcher)
+        self.object_batch_size = int(os.getenv("OBJECT_BATCH_SIZE", "8"))
+        self.object_batch_wait = float(os.getenv("OBJECT_BATCH_WAIT_MS", "10")) / 1000.0
+        
+        # Node admission control and degradation ladder (see admission.AdmissionController)
+        self.admission = AdmissionController(
+            max_sessions=int(os.getenv("MAX_SESSIONS", "32")),
+            max_fps=float(os.getenv("NODE_MAX_FPS", "60")),
+            latency_target=float(os.getenv("ANALYSIS_LATENCY_TARGET_MS", "250")) / 1000.0,
+        )
+        self.degraded_width = int(os.getenv("DEGRADED_ANALYSIS_WIDTH", "480"))
+        if self.face_mesh_pool_size < self.admission.max_sessions:
+            # Fewer graphs than admitted sessions would make sessions take each other's graphs every frame
+            print(f"⚠️ FACE_MESH_POOL_SIZE={self.face_mesh_pool_size} is below MAX_SESSIONS="
+                  f"{self.admission.max_sessions}; using {self.admission.max_sessions}")
+            self.face_mesh_pool_size = self.admission.max_sessions
+        
+        # Detector outputs of recently seen images, for clients that resend a frame (see result_cache)
+        self.result_cache = ResultCache(
+            max_entries=int(os.getenv("RESULT_CACHE_SIZE", "256")),
+            ttl=float(os.getenv("RESULT_CACHE_TTL", "30")),
+            version=config_version(
+                self.object_engine, self.face_detection_width, self.face_roi_padding, self.degraded_width,
+                model_path=self.object_model_path,
+            ),
+        )
+        # Capture settings and frame credits pushed to /stream clients (see stream_control)
+        self.stream_control = StreamController(
+            min_fps=float(os.getenv("CLIENT_MIN_FPS", "0.5")),
+            max_fps=float(os.getenv("CLIENT_MAX_FPS", "5")),
+            credits=int(os.getenv("CLIENT_FRAME_CREDITS", "2")),
+        )
+        
+        # Wall-clock session timers (see session_timers.TimerHeap): face/focus timeouts
+        # without frames, stalled streams and reaping of abandoned sessions
+        self.stream_stall_timeout = float(os.getenv("SESSION_STALL_SECONDS", "10"))
+        self.session_idle_timeout = float(os.getenv("SESSION_IDLE_TIMEOUT", "300"))
+        self.timers = TimerHeap()
+        self.timer_task = None
+        self.timer_event_handler = None
+        
+        # Timing and cooldown state of live sessions, shared with other workers/nodes so a
+        # reconnect elsewhere continues where it left off (see session_store)
+        self.session_store = create_session_store(os.getenv("SESSION_STORE", "memory"))
+        self.session_store_sync = float(os.getenv("SESSION_STORE_SYNC_SECONDS", "1"))
+        self.session_store_ttl = float(os.getenv("SESSION_STORE_TTL", str(self.session_idle_timeout)))
+        
+        # Warm-up inference on synthetic frames before traffic is accepted (see readiness)
+        self.warmup_iterations = int(os.getenv("WARMUP_ITERATIONS", "2"))
+        self.models_loaded = False
+        self.warmup = None
+        
     async def initialize(self):
         """Initialize ML models"""
         try:
-            # Load YOLOv8 model (better object detection)
-            from ultralytics import YOLO
-            self.model = YOLO('yolov8n.pt')  # nano version for faster inference
-            print("YOLOv8 model loaded successfully")
-            
-            # Initialize MediaPipe face detection and face mesh
-            self.mp_face = mp.solutions.face_detection
-            self.mp_face_mesh = mp.solutions.face_mesh
-            self.face_detector = self.mp_face.FaceDetection(
-                model_selection=0,
-                min_detection_confidence=0.6
+            # YOLOv8 + MediaPipe face detector / face mesh are loaded per inference worker
+            # (in prefork mode the YOLO weights once, shared by every worker)
+            detector_options = dict(
+                object_engine=self.object_engine,
+                object_model_path=self.object_model_path,
+                object_confidence=0.3,
+                engine_threads=self.inference_threads_per_worker,
+                mesh_pool_size=self.face_mesh_pool_size,
+                mesh_idle_timeout=self.face_mesh_idle_timeout,
+                roi_padding=self.face_roi_padding,
+                face_detection_width=self.face_detection_width,
             )
-            self.face_mesh = self.mp_face_mesh.FaceMesh(
-                static_image_mode=False,
-                max_num_faces=1,
-                refine_landmarks=True,
-                min_detection_confidence=0.6,
-                min_tracking_confidence=0.6
+            self.pool = InferencePool(
+                partial(create_frame_detectors, **detector_options),
+                mode=self.inference_mode,
+                workers=self.inference_workers,
+                threads_per_worker=self.inference_threads_per_worker,
+                frame_slots=self.frame_ring_slots,
+                frame_max_size=self.frame_ring_max_size,
+                preload=partial(preload_frame_detectors, **detector_options),
             )
-            print("MediaPipe face detector and face mesh initialized")
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.pool.start)
+            self.object_batcher = ObjectBatcher(self.pool, self.object_batch_size, self.object_batch_wait)
+            self.models_loaded = True
+            print("YOLOv8 model and MediaPipe face detector / face mesh initialized")
+            
+            if self.warmup_iterations > 0:
+                start = time.perf_counter()
+                worker_timings = await loop.run_in_executor(None, partial(
+                    self.pool.broadcast, "warm_up", 640, 480, self.warmup_iterations, self.object_batch_size
+                ))
+                self.warmup = {"seconds": time.perf_counter() - start, "workers": worker_timings}
+                print(f"🔥 Models warmed up on {len(worker_timings)} worker(s) in {self.warmup['seconds']:.1f}s")
             
         except Exception as e:
             print(f"Error initializing models: {e}")
             raise e
     
-    def euclidean_distance(self, point1, point2):
-        """Calculate Euclidean distance between two points"""
-        return math.sqrt((point1.x - point2.x)**2 + (point1.y - point2.y)**2)
-    
-    def calculate_eye_aspect_ratio(self, eye_landmarks):
-        """Calculate Eye Aspect Ratio for drowsiness detection"""
-        try:
-            # Use proper eye landmark points for MediaPipe face mesh
-            # Eye landmarks are passed as a list of landmark objects
-            if len(eye_landmarks) < 6:
-                return 0.3
-                
-            # Calculate vertical distances
-            vertical_1 = self.euclidean_distance(eye_landmarks[1], eye_landmarks[5])
-            vertical_2 = self.euclidean_distance(eye_landmarks[2], eye_landmarks[4])
-            
-            # Calculate horizontal distance
-            horizontal = self.euclidean_distance(eye_landmarks[0], eye_landmarks[3])
-            
-            # Calculate EAR
-            if horizontal > 0:
-                ear = (vertical_1 + vertical_2) / (2.0 * horizontal)
-                return ear
-            return 0.3  # Default EAR
-        except Exception as e:
-            print(f"Error calculating EAR: {e}")
-            return 0.3  # Default EAR
-    
-    def is_drowsy(self, face_landmarks):
-        """Check if the person is drowsy based on eye closure"""
+    def is_drowsy(self, ears, session: Dict):
+        """Check if the person is drowsy based on eye closure (updates the session's EAR counter)"""
         try:
-            # Corrected MediaPipe face mesh landmark indices for better EAR calculation
-            # Left eye landmarks (more accurate)
-            left_eye_points = [
-                face_landmarks[33],   # Left corner
-                face_landmarks[159], face_landmarks[158], face_landmarks[157], # Top points
-                face_landmarks[133],  # Right corner  
-                face_landmarks[153], face_landmarks[145], face_landmarks[144]  # Bottom points
-            ]
-            
-            # Right eye landmarks (more accurate) 
-            right_eye_points = [
-                face_landmarks[362],  # Left corner
-                face_landmarks[386], face_landmarks[387], face_landmarks[388], # Top points
-                face_landmarks[263],  # Right corner
-                face_landmarks[373], face_landmarks[374], face_landmarks[380]  # Bottom points
-            ]
-            
-            # Simplified EAR calculation using just vertical/horizontal ratio
-            def simple_ear(eye_points):
-                # Get corner points
-                left_corner = eye_points[0]
-                right_corner = eye_points[4] 
-                
-                # Get top and bottom points (use middle ones)
-                top_point = eye_points[2]
-                bottom_point = eye_points[6]
-                
-                # Calculate distances
-                horizontal = abs(left_corner.x - right_corner.x)
-                vertical = abs(top_point.y - bottom_point.y)
-                
-                if horizontal > 0:
-                    return vertical / horizontal
-                return 0.3
-            
-            # Calculate EAR for both eyes using simplified method
-            left_ear = simple_ear(left_eye_points)
-            right_ear = simple_ear(right_eye_points)
-            
-            
-            # Calculate EAR for both eyes using simplified method
-            left_ear = simple_ear(left_eye_points)
-            right_ear = simple_ear(right_eye_points)
-            
-            # Average EAR
+            left_ear, right_ear = float(ears[0]), float(ears[1])
             avg_ear = (left_ear + right_ear) / 2
             
-            print(f"👁️ EAR Values - Left: {left_ear:.3f}, Right: {right_ear:.3f}, Avg: {avg_ear:.3f}")
+            logger.debug("👁️ EAR Values - Left: %.3f, Right: %.3f, Avg: %.3f", left_ear, right_ear, avg_ear)
             
             # LOWERED threshold for better detection
             drowsiness_threshold = 0.18  # Increased to catch your range
             
             # Check if EAR is below threshold
             if avg_ear < drowsiness_threshold:
-                self.ear_frames += 1
-                print(f"🔍 Low EAR detected! Frame {self.ear_frames}/2")
+                session["ear_frames"] += 1
+                logger.debug("🔍 Low EAR detected! Frame %d/2", session["ear_frames"])
             else:
-                if self.ear_frames > 0:
-                    print(f"🔄 EAR reset - was {self.ear_frames} frames")
-                self.ear_frames = 0
+                if session["ear_frames"] > 0:
+                    logger.debug("🔄 EAR reset - was %d frames", session["ear_frames"])
+                session["ear_frames"] = 0
             
             # Return True if eyes have been closed for enough consecutive frames
-            is_drowsy = self.ear_frames >= 2  # Reduced to just 2 frames!
+            is_drowsy = session["ear_frames"] >= 2  # Reduced to just 2 frames!
             
             if is_drowsy:
-                print(f"😴 DROWSINESS DETECTED - EAR: {avg_ear:.3f}, Frames: {self.ear_frames}")
+                logger.debug("Eyes closed - EAR: %.3f, frames: %d", avg_ear, session["ear_frames"])
             
             return is_drowsy
             
         except Exception as e:
-            print(f"Error in drowsiness detection: {e}")
-            self.ear_frames = 0
+            logger.warning("Error in drowsiness detection: %s", e)
+            session["ear_frames"] = 0
             return False
     
-    def is_looking_at_screen_advanced(self, face_landmarks, frame_width, frame_height):
-        """Advanced screen focus detection using nose and eye positions"""
-        try:
-            # Get nose tip (landmark 1) and chin (landmark 18)
-            nose_tip = face_landmarks[1]
-            chin = face_landmarks[18]
-            
-            # Get left and right eye centers
-            left_eye_center = face_landmarks[468]  # Left eye center
-            right_eye_center = face_landmarks[473]  # Right eye center
-            
-            # Calculate face center using nose tip
-            face_center_x = nose_tip.x
-            face_center_y = nose_tip.y
-            
-            # Screen center in normalized coordinates
-            screen_center_x = 0.5
-            screen_center_y = 0.5
-            
-            # Calculate horizontal deviation
-            horizontal_deviation = abs(face_center_x - screen_center_x)
-            
-            # Calculate vertical deviation (for head tilt detection)
-            vertical_deviation = abs(face_center_y - screen_center_y)
-            
-            # Check if looking at screen (within threshold)
-            is_focused_horizontal = horizontal_deviation < self.focus_threshold
-            is_focused_vertical = vertical_deviation < 0.2  # Allow more vertical movement
-            
-            is_focused = is_focused_horizontal and is_focused_vertical
-            
-            print(f"🎯 Focus Analysis - H_dev: {horizontal_deviation:.3f}, V_dev: {vertical_deviation:.3f}, Focused: {is_focused}")
-            
-            return is_focused
-            
-        except Exception as e:
-            print(f"Error in advanced focus detection: {e}")
-            # Fallback to simple detection
-            return self.is_looking_at_screen_simple(face_landmarks, frame_width, frame_height)
-    
-    def is_looking_at_screen_simple(self, face_landmarks, frame_width, frame_height):
-        """Simple fallback focus detection"""
-        try:
-            # Use nose tip for simple detection
-            nose_tip = face_landmarks[1]
-            face_center_x = nose_tip.x
-            
-            # Check if face is roughly centered
-            screen_center_x = 0.5
-            deviation = abs(face_center_x - screen_center_x)
-            
-            return deviation < self.focus_threshold
-            
-        except Exception as e:
-            print(f"Error in simple focus detection: {e}")
-            return True  # Default to focused if detection fails
+    def is_looking_at_screen(self, nose_deviation, head_pose):
+        """Screen focus from the nose position and, when enabled, the estimated head pose"""
+        horizontal_deviation, vertical_deviation = float(nose_deviation[0]), float(nose_deviation[1])
+        yaw, pitch, roll = (float(angle) for angle in head_pose)
+        
+        # Check if looking at screen (within threshold)
+        is_focused_horizontal = horizontal_deviation < self.focus_threshold
+        is_focused_vertical = vertical_deviation < 0.2  # Allow more vertical movement
+        is_facing_screen = ((not self.head_pose_max_yaw or abs(yaw) < self.head_pose_max_yaw) and
+                            (not self.head_pose_max_pitch or abs(pitch) < self.head_pose_max_pitch))
+        
+        is_focused = is_focused_horizontal and is_focused_vertical and is_facing_screen
+        
+        logger.debug("🎯 Focus Analysis - H_dev: %.3f, V_dev: %.3f, Yaw: %.1f, Pitch: %.1f, Roll: %.1f, Focused: %s",
+                     horizontal_deviation, vertical_deviation, yaw, pitch, roll, is_focused)
+        
+        return is_focused
     
-    async def start_session(self, interview_id: str):
-        """Start a new proctoring session"""
+    async def start_session(self, interview_id: str, start_time: Optional[float] = None):
+        """Start a new proctoring session (``start_time`` defaults to now)"""
+        wall_clock = start_time is None
+        start_time = time.time() if wall_clock else start_time
         self.sessions[interview_id] = {
-            "last_focus_time": time.time(),
-            "last_face_time": time.time(),
-            "start_time": time.time(),
+            "last_focus_time": start_time,
+            "last_face_time": start_time,
+            "start_time": start_time,
             "events": [],
             "last_event_times": {},  # Track last event times for deduplication
             "focus_lost_start": None,  # Track when focus was first lost
-            "is_currently_focused": True
+            "is_currently_focused": True,
+            "ear_frames": 0,  # Consecutive low EAR frames (drowsiness)
+            "last_num_faces": 0,  # Face count carried over frames where face stages are skipped
+            "face_roi": None,  # Pixel crop the face mesh follows between frames (None = re-acquire)
+            "analysis_width": None,  # Width frames are analysed at (smaller when degraded)
+            "schedule": self.detector_scheduler.new_session(interview_id, start_time),
+            "gate": self.frame_gate.new_session(),
+            "object_tracks": self.object_tracker.new_session(),
+            "buffers": BufferPool(),  # Per-session scratch frames (e.g. the degraded-resolution copy)
+            "last_frame_time": start_time,
+            "stalled": False,  # Client stopped sending frames (see session timers)
+            "wall_clock": wall_clock,
+            "last_synced": 0.0  # Monotonic time of the last save to the session store
         }
+        if wall_clock:
+            # Continue a live interview that was running on another worker (or before a reconnect)
+            state = await self._load_session_state(interview_id)
+            if state:
+                self.sessions[interview_id].update(state)
+                print(f"♻️ Restored timing and cooldown state for interview {interview_id}")
+            # Timeouts are also checked between frames; recorded videos run on their own clock
+            self.timers.arm((interview_id, "face"), self.sessions[interview_id]["last_face_time"] + self.face_timeout)
+            self.timers.arm((interview_id, "focus"), start_time + self.focus_timeout)
+            self.timers.arm((interview_id, "stream"), start_time + self.stream_stall_timeout)
         self.last_events[interview_id] = {}
-        self.ear_frames = 0  # Reset drowsiness counter
         print(f"✅ Started proctoring session for interview {interview_id}")
     
     async def end_session(self, interview_id: str):
         """End a proctoring session"""
+        # Kept in the store until it expires, for a reconnect to pick up
+        await self.sync_session(interview_id, force=True)
+        if self.pool and interview_id in self.sessions:
+            # Return the session's face mesh graph to its worker's pool
+            await self.pool.run("release_session", interview_id, key=interview_id)
         if interview_id in self.sessions:
             del self.sessions[interview_id]
         if interview_id in self.last_events:
             del self.last_events[interview_id]
+        for kind in SESSION_TIMERS:
+            self.timers.cancel((interview_id, kind))
+        forget_interview(interview_id)
         print(f"❌ Ended proctoring session for interview {interview_id}")
     
+    async def _load_session_state(self, interview_id: str) -> Optional[Dict]:
+        try:
+            return await self.session_store.load(interview_id)
+        except Exception as e:
+            print(f"⚠️ Could not load session state for interview {interview_id}: {e}")
+            return None
+    
+    async def sync_session(self, interview_id: str, force: bool = False):
+        """Save a live session's timing and cooldown state, at most every session_store_sync seconds"""
+        session = self.sessions.get(interview_id)
+        if session is None or not session["wall_clock"]:
+            return
+        now = time.monotonic()
+        if not force and now - session["last_synced"] < self.session_store_sync:
+            return
+        session["last_synced"] = now
+        try:
+            await self.session_store.save(interview_id, persisted_state(session), self.session_store_ttl)
+        except Exception as e:
+            print(f"⚠️ Could not save session state for interview {interview_id}: {e}")
+    
     def should_send_event(self, interview_id: str, event_type: str, current_time: float) -> bool:
         """Check if event should be sent (deduplication logic)"""
         if interview_id not in self.sessions:
@@ -261,34 +349,211 @@ class ProctoringService:
         if interview_id in self.sessions:
             self.sessions[interview_id]["last_event_times"][event_type] = current_time
     
-    async def analyze_frame(self, frame: np.ndarray, interview_id: str = None) -> List[Dict]:
-        """Analyze a single frame for proctoring events"""
-        events = []
-        current_time = time.time()
+    async def _frame_session(self, interview_id: Optional[str], timestamp: Optional[float]):
+        """Session a frame belongs to, started on its first frame; returns (interview_id, now)"""
+        # Frames without an interview share one anonymous session
+        if interview_id is None:
+            interview_id = "default"
         
-        # Convert frame to RGB for MediaPipe
-        img_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        now = time.time() if timestamp is None else timestamp
+        if interview_id not in self.sessions:
+            await self.start_session(interview_id, timestamp)
+        
+        session = self.sessions[interview_id]
+        session["last_frame_time"] = now
+        if session["stalled"]:
+            session["stalled"] = False
+            print(f"▶️ Stream resumed for interview {interview_id}")
+        return interview_id, now
+    
+    async def analyze_cached(self, cache_key: Optional[bytes], interview_id: str = None,
+                             timestamp: Optional[float] = None) -> Optional[List[Dict]]:
+        """Events for a re-sent frame from its cached detector outputs; None on a cache miss.
+
+        Only inference is skipped: the outputs go through ``process_detections``
+        like fresh ones, so cooldowns and session timers still apply.
+        """
+        cached = self.result_cache.get(cache_key)
+        if cached is None:
+            return None
+        detections, w, h = cached
+        interview_id, now = await self._frame_session(interview_id, timestamp)
+        events = self.process_detections(detections, interview_id, w, h, now, outcome="cached")
+        await self.sync_session(interview_id, force=bool(events))
+        return events
+    
+    async def analyze_frame(self, frame: np.ndarray, interview_id: str = None,
+                            timestamp: Optional[float] = None, cache_key: Optional[bytes] = None) -> List[Dict]:
+        """Analyze a single frame for proctoring events.
+
+        ``timestamp`` is the frame's time in seconds (defaults to now); recorded
+        videos pass their own clock so cooldowns and timeouts follow the video.
+        With a ``cache_key`` (``result_cache.key`` of the encoded image) the
+        detector outputs are kept for ``analyze_cached``.
+        """
         h, w, _ = frame.shape
+        interview_id, now = await self._frame_session(interview_id, timestamp)
+        session = self.sessions[interview_id]
         
-        # Get or create session
-        if interview_id is None:
-            interview_id = list(self.sessions.keys())[0] if self.sessions else "default"
+        plan = self._plan_frame(session, frame, now)
+        if plan is None:
+            return await self._finish_frame(interview_id, dict(GATED_DETECTIONS), w, h, now, outcome="gated")
         
-        if interview_id not in self.sessions:
-            await self.start_session(interview_id)
+        # CPU-bound model inference runs in the inference pool, off the event loop.
+        # Faces are per session; YOLO goes through the cross-session batcher.
+        # In process mode the frame is copied once into a shared-memory slot and
+        # only its handle goes to the workers; the slot is held until both are done.
+        frame = plan["frame"]
+        ring = self.pool.frame_ring if (plan["run_objects"] or plan["run_mesh"] or plan["run_face_detection"]) else None
+        async with ring.slot(frame) if ring else nullcontext(frame) as shared_frame:
+            objects_task = asyncio.ensure_future(self.object_batcher.submit(shared_frame)) if plan["run_objects"] else None
+            try:
+                detections = await self._detect_faces(interview_id, session, plan, shared_frame)
+            finally:
+                if objects_task:
+                    await asyncio.wait([objects_task])
+        detections["objects"] = objects_task.result() if objects_task else None
+        return await self._finish_frame(interview_id, detections, plan["w"], plan["h"], now, cache_key)
+    
+    async def analyze_frames(self, frames: List[np.ndarray], interview_id: str = None,
+                             timestamps: Optional[List[Optional[float]]] = None) -> List[List[Dict]]:
+        """Analyze consecutive frames of one session; returns the events of each frame, in order.
+
+        The YOLO runs of all frames are submitted together, so they form one
+        batch in the object batcher, while the face stages go frame by frame
+        (the mesh ROI follows the face from one frame to the next). Events are
+        then derived in frame order. Frames go to the workers as they are, not
+        through the shared-memory ring: pinning a slot per frame of several
+        concurrent batches could exhaust it.
+        """
+        timestamps = timestamps or [None] * len(frames)
+        planned = []
+        for frame, timestamp in zip(frames, timestamps):
+            h, w, _ = frame.shape
+            interview_id, now = await self._frame_session(interview_id, timestamp)
+            session = self.sessions[interview_id]
+            # Frames of one batch are alive together: no shared per-session resize buffer
+            planned.append((now, w, h, self._plan_frame(session, frame, now, reuse_buffers=False)))
+        
+        objects_tasks = [
+            asyncio.ensure_future(self.object_batcher.submit(plan["frame"])) if plan and plan["run_objects"] else None
+            for _, _, _, plan in planned
+        ]
+        face_detections = []
+        try:
+            for _, _, _, plan in planned:
+                face_detections.append(
+                    await self._detect_faces(interview_id, session, plan, plan["frame"]) if plan else None
+                )
+        finally:
+            pending = [task for task in objects_tasks if task]
+            if pending:
+                await asyncio.wait(pending)
+        
+        results = []
+        for (now, w, h, plan), detections, objects_task in zip(planned, face_detections, objects_tasks):
+            if plan is None:
+                results.append(await self._finish_frame(interview_id, dict(GATED_DETECTIONS), w, h, now, outcome="gated"))
+                continue
+            detections["objects"] = objects_task.result() if objects_task else None
+            results.append(await self._finish_frame(interview_id, detections, plan["w"], plan["h"], now))
+        return results
+    
+    def _plan_frame(self, session: Dict, frame: np.ndarray, now: float,
+                    reuse_buffers: bool = True) -> Optional[Dict]:
+        """Detectors due on a frame and the frame they run on; None when the change gate skips it"""
+        # Frames that barely changed since the last analysed one only advance timers
+        if not self.frame_gate.should_analyze(session["gate"], frame, now):
+            return None
+        
+        # Degradation ladder under node pressure (see admission.AdmissionController)
+        h, w = frame.shape[:2]
+        level = self.admission.level
+        if level >= DEGRADATION_LEVELS.index("reduced_resolution") and w > self.degraded_width:
+            size = (self.degraded_width, round(h * self.degraded_width / w))
+            # Reused by the session's next degraded frame, once this one is done with
+            dst = session["buffers"].get("degraded", (size[1], size[0], 3)) if reuse_buffers else None
+            frame = cv2.resize(frame, size, dst=dst, interpolation=cv2.INTER_AREA)
+            h, w = frame.shape[:2]
+        if session["analysis_width"] != w:
+            # The mesh ROI is in pixels of the analysed frame
+            session["analysis_width"] = w
+            session["face_roi"] = None
         
+        # Pick the detectors due on this frame for this session
+        schedule = session["schedule"]
+        return {
+            "frame": frame,
+            "w": w,
+            "h": h,
+            "run_mesh": self.detector_scheduler.due(schedule, "face_mesh", now),
+            "run_face_detection": self.detector_scheduler.due(schedule, "face_detection", now),
+            # Skipped YOLO stays due, so it runs as soon as the node recovers
+            "run_objects": (level < DEGRADATION_LEVELS.index("skip_objects") and
+                            self.detector_scheduler.due(schedule, "objects", now)),
+        }
+    
+    async def _detect_faces(self, interview_id: str, session: Dict, plan: Dict, shared_frame) -> Dict:
+        """Run the face stages a plan asks for and move the session's mesh ROI along"""
+        if not (plan["run_mesh"] or plan["run_face_detection"]):
+            return {"num_faces": None, "face_landmarks": None, "face_detection_ran": False}
+        detections = await self.pool.run(
+            "detect_faces", shared_frame, interview_id, plan["run_face_detection"], plan["run_mesh"],
+            session["face_roi"], key=interview_id
+        )
+        session["face_roi"] = detections.pop("roi")
+        if detections["face_detection_ran"] and not plan["run_face_detection"]:
+            # The detector ran to (re-)acquire the face for the mesh ROI
+            self.detector_scheduler.force(session["schedule"], "face_detection")
+        return detections
+    
+    async def _finish_frame(self, interview_id: str, detections: Dict, w: int, h: int, now: float,
+                            cache_key: Optional[bytes] = None, outcome: str = "analyzed") -> List[Dict]:
+        """Turn a frame's detector outputs into events and save the session state they moved"""
+        for stage, seconds in detections.pop("timings", {}).items():
+            STAGE_SECONDS.observe(seconds, stage=stage)
+        # Stored before events are derived: a re-sent copy must pass through the cooldowns again
+        self.result_cache.put(cache_key, (detections, w, h))
+        
+        events = self.process_detections(detections, interview_id, w, h, now, outcome=outcome)
+        # New events moved cooldowns: save them right away
+        await self.sync_session(interview_id, force=bool(events))
+        return events
+    
+    def process_detections(self, detections: Dict, interview_id: str, w: int, h: int,
+                           current_time: Optional[float] = None, outcome: str = "analyzed") -> List[Dict]:
+        """Turn raw detector outputs into proctoring events for a session.
+
+        ``outcome`` labels the frame in FRAMES_PROCESSED: "analyzed" when
+        detectors ran, "gated" when the frame gate skipped them, "cached"
+        for result-cache hits.
+        """
+        if current_time is None:
+            current_time = time.time()
+        with STAGE_SECONDS.time(stage="postprocess"):
+            events = self._process_detections(detections, interview_id, w, h, current_time)
+        FRAMES_PROCESSED.inc(interview_id=interview_id, outcome=outcome)
+        return events
+    
+    def _process_detections(self, detections: Dict, interview_id: str, w: int, h: int,
+                            current_time: float) -> List[Dict]:
+        events = []
+        
+        if interview_id not in self.sessions:
+            return events
         session = self.sessions[interview_id]
         
-        # Face detection
-        face_results = self.face_detector.process(img_rgb)
-        face_mesh_results = self.face_mesh.process(img_rgb)
-        num_faces = 0
-        face_detected = False
+        num_faces = detections["num_faces"]
+        if num_faces is None:
+            # No full-frame count on this frame: carry the last one forward
+            # (at least the faces the mesh tracked in its ROI)
+            num_faces = max(session["last_num_faces"], len(detections["face_landmarks"] or []))
+            session["last_num_faces"] = num_faces
+        else:
+            session["last_num_faces"] = num_faces
+        face_detected = num_faces > 0
         
-        if face_results.detections:
-            num_faces = len(face_results.detections)
-            face_detected = True
-            
+        if face_detected:
             # Check for multiple faces
             if num_faces > 1 and self.should_send_event(interview_id, "multiple_faces", current_time):
                 events.append({
@@ -298,151 +563,255 @@ class ProctoringService:
                     "metadata": {"face_count": num_faces}
                 })
                 self.record_event_time(interview_id, "multiple_faces", current_time)
-                print(f"🚨 Multiple faces detected: {num_faces}")
+                logger.info("Multiple faces detected for interview %s: %d", interview_id, num_faces)
             
             # Face mesh analysis for focus and drowsiness
-            if face_mesh_results.multi_face_landmarks:
-                for face_landmarks in face_mesh_results.multi_face_landmarks:
+            if detections["face_landmarks"]:
+                # All faces of the frame in one vectorized pass (see geometry.face_metrics)
+                face_metrics = geometry.face_metrics(np.stack(detections["face_landmarks"]), w, h)
+                for face_index in range(len(detections["face_landmarks"])):
                     try:
-                        landmarks_list = face_landmarks.landmark
-                        
-                        # Enhanced focus detection
-                        is_focused = self.is_looking_at_screen_advanced(landmarks_list, w, h)
+                        is_focused = self.is_looking_at_screen(face_metrics["nose_deviation"][face_index],
+                                                               face_metrics["head_pose"][face_index])
                         
                         # Focus tracking logic
                         if is_focused:
                             if not session["is_currently_focused"]:
-                                print("🎯 Focus regained!")
+                                logger.debug("🎯 Focus regained!")
                                 session["is_currently_focused"] = True
                                 session["focus_lost_start"] = None
                             session["last_focus_time"] = current_time
                         else:
                             if session["is_currently_focused"]:
                                 # Just lost focus
-                                print("⚠️ Focus lost - starting timer")
+                                logger.debug("⚠️ Focus lost - starting timer")
                                 session["is_currently_focused"] = False
                                 session["focus_lost_start"] = current_time
-                            elif session["focus_lost_start"]:
-                                # Check if focus has been lost for too long
-                                focus_lost_duration = current_time - session["focus_lost_start"]
-                                if focus_lost_duration > self.focus_timeout and self.should_send_event(interview_id, "focus_lost", current_time):
-                                    print(f"🚨 FOCUS LOST EVENT - Duration: {focus_lost_duration:.1f}s")
-                                    events.append({
-                                        "eventType": "focus_lost",
-                                        "message": f"Not looking at screen for {focus_lost_duration:.1f}s",
-                                        "severity": "medium",
-                                        "metadata": {"duration": focus_lost_duration}
-                                    })
-                                    self.record_event_time(interview_id, "focus_lost", current_time)
+                            else:
+                                self.check_focus_timeout(session, interview_id, current_time, events)
                         
                         # Drowsiness detection
-                        is_drowsy = self.is_drowsy(landmarks_list)
+                        is_drowsy = self.is_drowsy(face_metrics["ear"][face_index], session)
                         
                         if is_drowsy and self.should_send_event(interview_id, "drowsiness", current_time):
-                            print(f"🚨 DROWSINESS EVENT TRIGGERED")
+                            logger.info("Drowsiness event for interview %s", interview_id)
                             events.append({
                                 "eventType": "drowsiness",
                                 "message": "Candidate appears drowsy (eyes closed)",
                                 "severity": "medium",
                                 "metadata": {
                                     "detection_type": "eye_closure",
-                                    "consecutive_frames": self.ear_frames
+                                    "consecutive_frames": session["ear_frames"]
                                 }
                             })
                             self.record_event_time(interview_id, "drowsiness", current_time)
                     
                     except Exception as e:
-                        print(f"Error processing face landmarks: {e}")
+                        logger.warning("Error processing face landmarks: %s", e)
                         # Reset to safe defaults
                         session["last_focus_time"] = current_time
                         session["is_currently_focused"] = True
                         session["focus_lost_start"] = None
             
+            elif detections["face_landmarks"] is None:
+                # Mesh skipped on this frame: keep the focus timer running on the last known state
+                self.check_focus_timeout(session, interview_id, current_time, events)
+            
             session["last_face_time"] = current_time
         
         # No face detected
         if not face_detected:
-            face_missing_duration = current_time - session["last_face_time"]
-            if face_missing_duration > self.face_timeout and self.should_send_event(interview_id, "face_missing", current_time):
-                print(f"🚨 FACE MISSING EVENT - Duration: {face_missing_duration:.1f}s")
-                events.append({
-                    "eventType": "face_missing",
-                    "message": f"No face detected for {face_missing_duration:.1f}s",
-                    "severity": "high",
-                    "metadata": {"duration": face_missing_duration}
-                })
-                self.record_event_time(interview_id, "face_missing", current_time)
+            self.check_face_timeout(session, interview_id, current_time, events)
             
             # Reset focus state when no face is detected
             session["is_currently_focused"] = True
             session["focus_lost_start"] = None
-            self.ear_frames = 0  # Reset drowsiness counter
+            session["ear_frames"] = 0  # Reset drowsiness counter
         
-        # Object detection using YOLOv8
-        if self.model:
-            try:
-                results = self.model(frame, verbose=False, conf=0.3)
-                
-                for result in results:
-                    boxes = result.boxes
-                    if boxes is not None:
-                        for box in boxes:
-                            class_id = int(box.cls[0])
-                            confidence = float(box.conf[0])
-                            label = self.model.names[class_id]
-                            
-                            # Reduced confidence thresholds for better detection
-                            if label == "cell phone" and confidence > 0.25:
-                                threshold_met = True
-                            elif label == "book" and confidence > 0.15:  # Lower threshold for books
-                                threshold_met = True
-                            elif label == "laptop" and confidence > 0.2:
-                                threshold_met = True
-                            elif label in self.target_objects and confidence > 0.25:
-                                threshold_met = True
-                            else:
-                                threshold_met = False
-                            
-                            if threshold_met:
-                                event_key = f"suspicious_object_{label}"
-                                
-                                if self.should_send_event(interview_id, event_key, current_time):
-                                    x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                                    x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
-                                    
-                                    # Object name mapping
-                                    object_names = {
-                                        "cell phone": "Mobile Phone",
-                                        "book": "Book/Notes",
-                                        "laptop": "Laptop/Computer",
-                                        "mouse": "Computer Mouse",
-                                        "keyboard": "Keyboard"
-                                    }
-                                    object_name = object_names.get(label, label.replace('_', ' ').title())
-                                    
-                                    events.append({
-                                        "eventType": "suspicious_object",
-                                        "message": f"⚠️ {object_name} detected!",
-                                        "severity": "high",
-                                        "metadata": {
-                                            "object": label,
-                                            "confidence": confidence,
-                                            "bbox": [x1, y1, x2, y2],
-                                            "object_name": object_name
-                                        }
-                                    })
-                                    self.record_event_time(interview_id, event_key, current_time)
-                                    print(f"🚨 Detected {object_name} with confidence {confidence:.2f}")
-                                    
-            except Exception as e:
-                print(f"Error in object detection: {e}")
-        
-        # Add timestamps to all events
+        # Suspicious objects are tracked across frames; events follow each track's lifecycle
+        tracks = session["object_tracks"]
+        if detections["objects"] is None:
+            # YOLO skipped on this frame: propagate the tracks
+            transitions = self.object_tracker.predict(tracks, current_time)
+        else:
+            transitions = self.object_tracker.update(
+                tracks,
+                [detected for detected in detections["objects"] if detected["label"] in self.target_objects],
+                lambda detected: self.object_threshold_met(detected["label"], detected["confidence"]),
+                current_time,
+            )
+        for lifecycle, track in transitions:
+            events.append(self.object_track_event(lifecycle, track, current_time))
+        
+        self.stamp_events(events, interview_id, current_time)
+        return events
+    
+    def stamp_events(self, events: List[Dict], interview_id: str, current_time: float):
+        """Add timestamps to all events"""
         for event in events:
             event["timestamp"] = current_time
             event["interview_id"] = interview_id
+    
+    def object_threshold_met(self, label: str, confidence: float) -> bool:
+        """Per-class confidence thresholds for suspicious objects"""
+        # Reduced confidence thresholds for better detection
+        if label == "cell phone" and confidence > 0.25:
+            return True
+        elif label == "book" and confidence > 0.15:  # Lower threshold for books
+            return True
+        elif label == "laptop" and confidence > 0.2:
+            return True
+        elif label in self.target_objects and confidence > 0.25:
+            return True
+        return False
+    
+    def object_track_event(self, lifecycle: str, track: Dict, current_time: float) -> Dict:
+        """Event for an object track that appeared, is still present or is gone"""
+        # Object name mapping
+        object_names = {
+            "cell phone": "Mobile Phone",
+            "book": "Book/Notes",
+            "laptop": "Laptop/Computer",
+            "mouse": "Computer Mouse",
+            "keyboard": "Keyboard"
+        }
+        label = track["label"]
+        object_name = object_names.get(label, label.replace('_', ' ').title())
+        dwell_time = ObjectTracker.dwell_time(track, current_time)
         
-        return events
+        if lifecycle == "appeared":
+            event = {"eventType": "suspicious_object", "message": f"⚠️ {object_name} detected!", "severity": "high"}
+            logger.info("Detected %s with confidence %.2f (track %s)", object_name, track["confidence"], track["id"])
+        elif lifecycle == "present":
+            event = {"eventType": "suspicious_object", "severity": "high",
+                     "message": f"⚠️ {object_name} still in view ({dwell_time:.0f}s)"}
+        else:
+            event = {"eventType": "suspicious_object_gone", "severity": "low",
+                     "message": f"{object_name} no longer in view after {dwell_time:.0f}s"}
+            logger.info("%s gone (track %s, %.1fs)", object_name, track["id"], dwell_time)
+        
+        event["metadata"] = {
+            "object": label,
+            "confidence": float(track["confidence"]),
+            "bbox": ObjectTracker.bbox(track),
+            "object_name": object_name,
+            "track_id": track["id"],
+            "lifecycle": lifecycle,
+            "dwell_time": dwell_time,
+        }
+        return event
+    
+    def check_face_timeout(self, session: Dict, interview_id: str, current_time: float, events: List[Dict]):
+        """Emit face_missing once no face has been seen for longer than face_timeout"""
+        face_missing_duration = current_time - session["last_face_time"]
+        if face_missing_duration > self.face_timeout and self.should_send_event(interview_id, "face_missing", current_time):
+            logger.info("Face missing for interview %s: %.1fs", interview_id, face_missing_duration)
+            events.append({
+                "eventType": "face_missing",
+                "message": f"No face detected for {face_missing_duration:.1f}s",
+                "severity": "high",
+                "metadata": {"duration": face_missing_duration, "stream_stalled": session["stalled"]}
+            })
+            self.record_event_time(interview_id, "face_missing", current_time)
+    
+    def check_focus_timeout(self, session: Dict, interview_id: str, current_time: float, events: List[Dict]):
+        """Emit focus_lost once focus has been lost for longer than focus_timeout"""
+        if session["is_currently_focused"] or not session["focus_lost_start"]:
+            return
+        focus_lost_duration = current_time - session["focus_lost_start"]
+        if focus_lost_duration > self.focus_timeout and self.should_send_event(interview_id, "focus_lost", current_time):
+            logger.info("Focus lost for interview %s: %.1fs", interview_id, focus_lost_duration)
+            events.append({
+                "eventType": "focus_lost",
+                "message": f"Not looking at screen for {focus_lost_duration:.1f}s",
+                "severity": "medium",
+                "metadata": {"duration": focus_lost_duration}
+            })
+            self.record_event_time(interview_id, "focus_lost", current_time)
+    
+    def is_ready(self) -> bool:
+        """Models are loaded and, unless disabled, warmed up"""
+        return self.models_loaded and (self.warmup is not None or self.warmup_iterations <= 0)
+    
+    def readiness(self) -> Dict:
+        """Which models are loaded and warmed, for the readiness probe"""
+        warmed = self.warmup is not None
+        return {
+            "ready": self.is_ready(),
+            "models": {
+                "object_detection": {"engine": self.object_engine, "loaded": self.models_loaded, "warmed": warmed},
+                "face_detection": {"loaded": self.models_loaded, "warmed": warmed},
+                "face_mesh": {"loaded": self.models_loaded, "warmed": warmed},
+            },
+            "inference_mode": self.inference_mode,
+            "workers": self.inference_workers if self.inference_mode != "inline" else 1,
+            "warmup": self.warmup,
+        }
+    
+    def start_timers(self, event_handler: Optional[Callable[[str, List[Dict]], Awaitable]] = None):
+        """Run the session timers in the background; ``event_handler`` receives timeout events"""
+        self.timer_event_handler = event_handler
+        self.timer_task = asyncio.create_task(self._run_timers())
+    
+    async def _run_timers(self):
+        while True:
+            # Lets the degradation ladder step down on a node that went quiet
+            self.admission.idle()
+            now = time.time()
+            next_deadline = self.timers.next_deadline()
+            if next_deadline is None or next_deadline > now:
+                # Short sleeps pick up timers armed meanwhile for new sessions
+                await asyncio.sleep(1.0 if next_deadline is None else min(next_deadline - now, 1.0))
+                continue
+            for interview_id, kind in self.timers.pop_due(now):
+                try:
+                    await self._on_timer(interview_id, kind, now)
+                except Exception as e:
+                    print(f"Error in {kind} timer for interview {interview_id}: {e}")
+    
+    async def _on_timer(self, interview_id: str, kind: str, now: float):
+        """Check one session timeout at its deadline and re-arm it at the next one"""
+        session = self.sessions.get(interview_id)
+        if session is None:
+            return
+        events = []
+        
+        if kind == "face":
+            deadline = session["last_face_time"] + self.face_timeout
+            if now >= deadline:
+                self.check_face_timeout(session, interview_id, now, events)
+                deadline = now + self.face_timeout
+        elif kind == "focus":
+            deadline = now + self.focus_timeout
+            if not session["is_currently_focused"] and session["focus_lost_start"]:
+                lost_deadline = session["focus_lost_start"] + self.focus_timeout
+                if now >= lost_deadline:
+                    self.check_focus_timeout(session, interview_id, now, events)
+                else:
+                    deadline = lost_deadline
+        else:
+            idle = now - session["last_frame_time"]
+            if idle >= self.session_idle_timeout:
+                print(f"🧹 Reaping abandoned session {interview_id} (no frames for {idle:.0f}s)")
+                SESSIONS_REAPED.inc()
+                await self.end_session(interview_id)
+                return
+            if idle >= self.stream_stall_timeout and not session["stalled"]:
+                session["stalled"] = True
+                STREAMS_STALLED.inc()
+                print(f"⏸️ Stream stalled for interview {interview_id} (no frames for {idle:.0f}s)")
+            deadline = session["last_frame_time"] + (
+                self.session_idle_timeout if session["stalled"] else self.stream_stall_timeout
+            )
+        self.timers.arm((interview_id, kind), deadline)
+        
+        if events:
+            self.stamp_events(events, interview_id, now)
+            await self.sync_session(interview_id, force=True)
+            for event in events:
+                SESSION_TIMER_EVENTS.inc(event_type=event["eventType"])
+            if self.timer_event_handler:
+                await self.timer_event_handler(interview_id, events)
     
     def get_session_stats(self, interview_id: str) -> Dict:
         """Get statistics for a session"""
@@ -457,16 +826,28 @@ class ProctoringService:
             "last_face_seen": current_time - session["last_face_time"],
             "last_focused": current_time - session["last_focus_time"],
             "total_events": len(session["events"]),
-            "currently_focused": session.get("is_currently_focused", True)
+            "currently_focused": session.get("is_currently_focused", True),
+            "detector_runs": dict(session["schedule"]["runs"]),
+            "detector_skips": dict(session["schedule"]["skips"]),
+            "frame_gate": self.frame_gate.stats(session["gate"]),
+            "object_tracks": ObjectTracker.stats(session["object_tracks"])
         }
     
     async def cleanup(self):
         """Cleanup resources"""
         try:
-            if hasattr(self, 'face_detector') and self.face_detector:
-                self.face_detector.close()
-            if hasattr(self, 'face_mesh') and self.face_mesh:
-                self.face_mesh.close()
+            if self.timer_task:
+                self.timer_task.cancel()
+                self.timer_task = None
+            if self.object_batcher:
+                await self.object_batcher.close()
+                self.object_batcher = None
+            if self.pool:
+                self.pool.shutdown()
+                self.pool = None
+            await self.session_store.close()
+            self.models_loaded = False
+            self.warmup = None
             print("✅ Proctoring service cleaned up successfully")
         except Exception as e:
             print(f"Error during cleanup: {e}")
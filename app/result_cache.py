@@ -0,0 +1,91 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from metrics import RESULT_CACHE_LOOKUPS
+
+
+def config_version(*parts, model_path: Optional[str] = None) -> bytes:
+    """Digest of everything that changes detector outputs for the same image.
+
+    ``model_path``'s size and modification time are included, so replacing
+    the weights in place also invalidates cached results.
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16)
+    if model_path and os.path.exists(model_path):
+        stat = os.stat(model_path)
+        digest.update(f"{model_path}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+    return digest.digest()
+
+
+class ResultCache:
+    """Bounded LRU of detector outputs, keyed by the encoded image bytes.
+
+    Clients on flaky networks resend the same JPEG to /analyze_frame and
+    /stream; a hit skips both decoding and inference. Entries hold raw
+    detector outputs (what ``FrameDetectors`` returns), never events, so a
+    replayed result still goes through the session's event logic and
+    cooldowns. Keys are a BLAKE2b digest of ``version`` plus the image
+    payload, so a model or config change never serves stale results.
+    Entries expire ``ttl`` seconds after they were stored; ``max_entries``
+    <= 0 disables the cache.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 30.0, version: bytes = b""):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = version
+        self.entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def key(self, payload) -> Optional[bytes]:
+        """Cache key of an encoded image (bytes, memoryview or base64 str); None when disabled"""
+        if not self.enabled:
+            return None
+        if isinstance(payload, str):
+            payload = payload.encode("ascii", "ignore")
+        digest = hashlib.blake2b(self.version, digest_size=16)
+        digest.update(payload)
+        return digest.digest()
+
+    def get(self, key: Optional[bytes]) -> Optional[Any]:
+        if key is None:
+            return None
+        entry = self.entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] > self.ttl:
+            del self.entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            RESULT_CACHE_LOOKUPS.inc(outcome="miss")
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        RESULT_CACHE_LOOKUPS.inc(outcome="hit")
+        return entry[1]
+
+    def put(self, key: Optional[bytes], value: Any):
+        if key is None:
+            return
+        self.entries[key] = (time.monotonic(), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
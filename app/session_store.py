@@ -0,0 +1,175 @@
+import asyncio
+import json
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+# Session fields that survive a reconnect to another worker or node: timing
+# and cooldown state. Per-process runtime state (detector schedule, change
+# gate, object tracks, mesh ROI) is rebuilt within a few frames.
+PERSISTED_FIELDS = (
+    "start_time",
+    "last_focus_time",
+    "last_face_time",
+    "last_event_times",
+    "focus_lost_start",
+    "is_currently_focused",
+    "ear_frames",
+    "last_num_faces",
+)
+
+
+def persisted_state(session: Dict) -> Dict:
+    # Copies, so later changes to the live session do not leak into a saved state
+    return {field: dict(session[field]) if isinstance(session[field], dict) else session[field]
+            for field in PERSISTED_FIELDS}
+
+
+class SessionStore(ABC):
+    """Where live sessions keep the state that must follow an interview across processes.
+
+    Entries expire ``ttl`` seconds after their last save, so an interview
+    whose client never comes back does not linger.
+    """
+
+    @abstractmethod
+    async def load(self, interview_id: str) -> Optional[Dict]:
+        """Saved state of an interview, None when there is none or it expired"""
+
+    @abstractmethod
+    async def save(self, interview_id: str, state: Dict, ttl: float):
+        """Replace an interview's state; it expires ``ttl`` seconds from now"""
+
+    @abstractmethod
+    async def delete(self, interview_id: str):
+        """Forget an interview's state"""
+
+    async def close(self):
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    """Process-local store (single worker): survives reconnects to the same process only"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._entries: Dict[str, tuple] = {}
+
+    async def load(self, interview_id: str) -> Optional[Dict]:
+        entry = self._entries.get(interview_id)
+        if entry is None:
+            return None
+        state, expires_at = entry
+        if expires_at < time.time():
+            del self._entries[interview_id]
+            return None
+        return state
+
+    async def save(self, interview_id: str, state: Dict, ttl: float):
+        self._entries[interview_id] = (state, time.time() + ttl)
+
+    async def delete(self, interview_id: str):
+        self._entries.pop(interview_id, None)
+
+
+class SQLiteSessionStore(SessionStore):
+    """One SQLite file (WAL) shared by every worker process on a host"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        # sqlite3 connections are used from one thread; this executor is that thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-store")
+        self._db = None
+
+    def _connect(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions "
+                "(interview_id TEXT PRIMARY KEY, state TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+        return self._db
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _load(self, interview_id: str) -> Optional[Dict]:
+        row = self._connect().execute(
+            "SELECT state FROM sessions WHERE interview_id = ? AND expires_at >= ?", (interview_id, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _save(self, interview_id: str, state: Dict, ttl: float):
+        db = self._connect()
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO sessions (interview_id, state, expires_at) VALUES (?, ?, ?)",
+                (interview_id, json.dumps(state), time.time() + ttl),
+            )
+            # Expired rows go away as a side effect of writes
+            db.execute("DELETE FROM sessions WHERE expires_at < ?", (time.time(),))
+
+    def _delete(self, interview_id: str):
+        db = self._connect()
+        with db:
+            db.execute("DELETE FROM sessions WHERE interview_id = ?", (interview_id,))
+
+    async def load(self, interview_id: str) -> Optional[Dict]:
+        return await self._run(self._load, interview_id)
+
+    async def save(self, interview_id: str, state: Dict, ttl: float):
+        await self._run(self._save, interview_id, state, ttl)
+
+    async def delete(self, interview_id: str):
+        await self._run(self._delete, interview_id)
+
+    async def close(self):
+        if self._db is not None:
+            await self._run(self._db.close)
+            self._db = None
+        self._executor.shutdown(wait=False)
+
+
+class RedisSessionStore(SessionStore):
+    """Redis (or any Redis-compatible server) shared across hosts; entries expire via EX"""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "proctoring:session:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise ImportError("SESSION_STORE=redis://... needs the redis package (pip install redis)") from e
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+
+    async def load(self, interview_id: str) -> Optional[Dict]:
+        raw = await self.client.get(self.prefix + interview_id)
+        return json.loads(raw) if raw else None
+
+    async def save(self, interview_id: str, state: Dict, ttl: float):
+        await self.client.set(self.prefix + interview_id, json.dumps(state), ex=max(1, int(ttl)))
+
+    async def delete(self, interview_id: str):
+        await self.client.delete(self.prefix + interview_id)
+
+    async def close(self):
+        await self.client.aclose()
+
+
+def create_session_store(url: str) -> SessionStore:
+    """``memory``, ``sqlite:///path/to/sessions.db`` or ``redis://host:6379/0``"""
+    if not url or url == "memory":
+        return MemorySessionStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisSessionStore(url)
+    raise ValueError(f"Unknown session store '{url}', expected memory, sqlite:///<path> or redis://<host>")
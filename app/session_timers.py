@@ -0,0 +1,61 @@
+import heapq
+import itertools
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+class TimerHeap:
+    """Deadline per key on a binary heap, O(log n) to arm and to fire.
+
+    Each key has at most one live deadline. Re-arming a key pushes a new heap
+    entry and leaves the old one behind as stale; stale entries are skipped
+    when they reach the top, so neither re-arming nor cancelling ever has to
+    search the heap. Callers re-arm rarely (once per fired or re-checked
+    timer, never per frame), which keeps the number of stale entries bounded.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._deadlines: Dict[Hashable, float] = {}
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def arm(self, key: Hashable, deadline: float):
+        """Set (or move) the deadline of ``key``"""
+        if self._deadlines.get(key) == deadline:
+            return
+        self._deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._counter), key))
+        # Stale entries pile up only if keys move far more often than they fire
+        if len(self._heap) > 4 * len(self._deadlines) + 64:
+            self._compact()
+
+    def cancel(self, key: Hashable):
+        self._deadlines.pop(key, None)
+
+    def deadline(self, key: Hashable) -> Optional[float]:
+        return self._deadlines.get(key)
+
+    def next_deadline(self) -> Optional[float]:
+        """Earliest live deadline, None when nothing is armed"""
+        while self._heap:
+            deadline, _, key = self._heap[0]
+            if self._deadlines.get(key) == deadline:
+                return deadline
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now: float) -> List[Hashable]:
+        """Disarm and return every key whose deadline is <= ``now``, earliest first"""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _, key = heapq.heappop(self._heap)
+            if self._deadlines.get(key) == deadline:
+                del self._deadlines[key]
+                due.append(key)
+        return due
+
+    def _compact(self):
+        self._heap = [(deadline, next(self._counter), key) for key, deadline in self._deadlines.items()]
+        heapq.heapify(self._heap)
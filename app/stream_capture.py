@@ -0,0 +1,167 @@
+"""
+Recording of inbound /stream traffic for offline replay (benchmarks.replay).
+
+A capture directory holds:
+
+    frames.bin                   encoded images back to back, append-only
+    <interview>.idx              one INDEX_RECORD per frame the interview sent
+    <interview>.events.ndjson    event types the service answered each frame with
+
+Index records are fixed-size, so a frame's number is its position in the
+index; the events file refers to frames by that number. Images are written
+before their index record, so readers (which memory-map frames.bin) can
+follow a capture that is still being recorded.
+"""
+import base64
+import binascii
+import json
+import mmap
+import os
+import struct
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote, unquote
+
+from frame_protocol import FRAME_FORMATS, FrameProtocolError, frame_payload, parse_frame_header
+
+# Per-frame index record (network byte order):
+#
+#   arrival  d  seconds since the epoch the frame reached the service
+#   offset   Q  position of the encoded image in frames.bin
+#   length   I  encoded image bytes
+#   format   B  frame_protocol image format (1 = JPEG, 2 = WebP)
+INDEX_RECORD = struct.Struct(">dQIB")
+FRAMES_FILE = "frames.bin"
+
+_FORMAT_CODES = {name: code for code, name in FRAME_FORMATS.items()}
+
+
+def _interview_file(directory: str, interview_id: str, suffix: str) -> str:
+    # Interview ids come from URLs: quoted so they are always one safe file name
+    return os.path.join(directory, quote(interview_id, safe="") + suffix)
+
+
+def _image_format(image: bytes) -> int:
+    """Frame format code of an encoded image, from its magic bytes"""
+    if image[:4] == b"RIFF" and image[8:12] == b"WEBP":
+        return _FORMAT_CODES["webp"]
+    return _FORMAT_CODES["jpeg"]
+
+
+class StreamCapture:
+    """Appends the frames /stream clients send, and the events they get back, to a capture directory"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.frames = None
+        self.offset = 0
+        self.indexes: Dict[str, object] = {}
+        self.counts: Dict[str, int] = {}
+        self.event_logs: Dict[str, object] = {}
+
+    def _open(self, interview_id: str):
+        if self.frames is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self.frames = open(os.path.join(self.directory, FRAMES_FILE), "ab")
+            self.offset = self.frames.seek(0, os.SEEK_END)
+            print(f"🎞️ Capturing /stream frames to {self.directory}")
+        if interview_id not in self.indexes:
+            # A reconnecting interview continues its index where it left off
+            index = open(_interview_file(self.directory, interview_id, ".idx"), "ab")
+            self.indexes[interview_id] = index
+            self.counts[interview_id] = index.seek(0, os.SEEK_END) // INDEX_RECORD.size
+            self.event_logs[interview_id] = open(_interview_file(self.directory, interview_id, ".events.ndjson"), "a")
+
+    def record(self, interview_id: str, message: Dict, arrival: float) -> Optional[int]:
+        """Append one queued /stream message (``bytes`` or ``json``); returns its frame number.
+
+        None when the message carries no readable image, which the analysis
+        loop will reject anyway.
+        """
+        try:
+            if message.get("bytes") is not None:
+                image = frame_payload(message["bytes"])
+                image_format = _FORMAT_CODES[parse_frame_header(message["bytes"])["format"]]
+            else:
+                image = base64.b64decode(message["json"]["image"])
+                image_format = _image_format(image)
+        except (FrameProtocolError, binascii.Error, TypeError, ValueError):
+            return None
+        if not len(image):
+            return None
+
+        self._open(interview_id)
+        self.frames.write(image)
+        self.frames.flush()
+        index = self.indexes[interview_id]
+        index.write(INDEX_RECORD.pack(arrival, self.offset, len(image), image_format))
+        index.flush()
+        self.offset += len(image)
+        number = self.counts[interview_id]
+        self.counts[interview_id] = number + 1
+        return number
+
+    def record_events(self, interview_id: str, frame: Optional[int], events: List[Dict]):
+        """Events the service answered frame number ``frame`` with"""
+        if frame is None:
+            return
+        # Reopened if an overlapping connection of the same interview closed it meanwhile
+        self._open(interview_id)
+        log = self.event_logs[interview_id]
+        log.write(json.dumps({"frame": frame, "events": [event["eventType"] for event in events]}) + "\n")
+        log.flush()
+
+    def close_interview(self, interview_id: str):
+        for files in (self.indexes, self.event_logs):
+            handle = files.pop(interview_id, None)
+            if handle:
+                handle.close()
+        self.counts.pop(interview_id, None)
+
+    def close(self):
+        for interview_id in list(self.indexes):
+            self.close_interview(interview_id)
+        if self.frames:
+            self.frames.close()
+            self.frames = None
+
+
+class CaptureReader:
+    """Read side of a capture directory; images are zero-copy views into the memory-mapped frames file"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.mmap = None
+        with open(os.path.join(directory, FRAMES_FILE), "rb") as f:
+            if os.fstat(f.fileno()).st_size:
+                self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.data = memoryview(self.mmap if self.mmap is not None else b"")
+
+    def interviews(self) -> List[str]:
+        return sorted(unquote(name[:-len(".idx")]) for name in os.listdir(self.directory) if name.endswith(".idx"))
+
+    def frames(self, interview_id: str) -> Iterator[Tuple[float, memoryview, int]]:
+        """(arrival time, encoded image, format) of every frame the interview sent, in order"""
+        with open(_interview_file(self.directory, interview_id, ".idx"), "rb") as f:
+            records = f.read()
+        # A record cut short by a crash while recording is ignored
+        records = records[:len(records) - len(records) % INDEX_RECORD.size]
+        for arrival, offset, length, image_format in INDEX_RECORD.iter_unpack(records):
+            if offset + length <= len(self.data):
+                yield arrival, self.data[offset:offset + length], image_format
+
+    def events(self, interview_id: str) -> Dict[int, List[str]]:
+        """Frame number -> event types the service answered it with (frames it dropped are absent)"""
+        path = _interview_file(self.directory, interview_id, ".events.ndjson")
+        recorded = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        recorded[entry["frame"]] = entry["events"]
+        return recorded
+
+    def close(self):
+        self.data.release()
+        if self.mmap is not None:
+            self.mmap.close()
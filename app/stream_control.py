@@ -0,0 +1,77 @@
+import time
+from typing import Dict, Optional
+
+# Capture sizes offered to clients, largest first (4:3, the client's default shape)
+CAPTURE_SIZES = ((640, 480), (480, 360), (320, 240))
+
+
+class StreamController:
+    """Closed-loop capture settings for /stream clients.
+
+    For every connection it keeps a smoothed per-frame processing latency and
+    counts frames dropped from the inbound queue. From those, the node's
+    per-session share of its frame budget and the degradation level, it
+    recommends a capture rate, resolution and JPEG quality. ``credits`` is the
+    number of frames a client may have in flight (sent but not yet
+    acknowledged); clients stop capturing when they run out, so the inbound
+    queue stays short no matter how slow the node is.
+    """
+
+    def __init__(self, min_fps: float = 0.5, max_fps: float = 5.0, base_quality: float = 0.7,
+                 credits: int = 2, resend_interval: float = 5.0):
+        self.min_fps = min_fps
+        self.max_fps = max_fps
+        self.base_quality = base_quality
+        self.credits = credits
+        self.resend_interval = resend_interval
+
+    def new_stream(self) -> Dict:
+        return {"latency": None, "processed": 0, "dropped": 0, "recent_drops": 0,
+                "last_control": None, "last_control_time": 0.0}
+
+    def on_processed(self, state: Dict, seconds: float):
+        latency = state["latency"]
+        state["latency"] = seconds if latency is None else 0.8 * latency + 0.2 * seconds
+        state["processed"] += 1
+
+    def on_dropped(self, state: Dict):
+        state["dropped"] += 1
+        state["recent_drops"] += 1
+
+    def recommend(self, state: Dict, admission, active_sessions: int) -> Dict:
+        """Capture settings for this stream given its latency and the node's load"""
+        fps = self.max_fps
+        if admission.max_fps > 0:
+            # Fair share of the node's frame budget
+            fps = min(fps, admission.max_fps / max(1, active_sessions))
+        if state["latency"]:
+            # Frames of one stream are analysed one at a time
+            fps = min(fps, 0.8 / state["latency"])
+        if state["recent_drops"]:
+            # The queue overflowed since the last recommendation: back off harder
+            fps *= 0.5
+        fps = round(max(self.min_fps, fps), 2)
+
+        level = admission.level
+        width, height = CAPTURE_SIZES[min(level, len(CAPTURE_SIZES) - 1)]
+        quality = round(self.base_quality - 0.1 * min(level, 2), 2)
+        return {"fps": fps, "width": width, "height": height, "quality": quality, "credits": self.credits}
+
+    def control_message(self, state: Dict, admission, active_sessions: int,
+                        now: Optional[float] = None, force: bool = False) -> Optional[Dict]:
+        """A ``control`` message when the recommendation changed noticeably or is due again, else None"""
+        now = time.monotonic() if now is None else now
+        recommendation = self.recommend(state, admission, active_sessions)
+        last = state["last_control"]
+        changed = (
+            last is None
+            or abs(recommendation["fps"] - last["fps"]) > 0.2 * last["fps"]
+            or recommendation["width"] != last["width"]
+            or recommendation["quality"] != last["quality"]
+        )
+        if not (changed or force) and now - state["last_control_time"] < self.resend_interval:
+            return None
+        state["last_control"] = recommendation
+        state["last_control_time"] = now
+        state["recent_drops"] = 0
+        return dict(recommendation, type="control")
@@ -0,0 +1,40 @@
+from object_tracker import ObjectTracker
+
+
+def confident(detection):
+    return detection["confidence"] >= 0.5
+
+
+def run(tracker, boxes, interval=0.5):
+    """One YOLO run per box; returns the tracker state and every transition as (kind, track id)"""
+    state = tracker.new_session()
+    transitions = []
+    for run_index, bbox in enumerate(boxes):
+        detections = [{"label": "cell phone", "confidence": 0.9, "bbox": bbox}]
+        transitions.extend((kind, track["id"])
+                           for kind, track in tracker.update(state, detections, confident, run_index * interval))
+    return state, transitions
+
+
+def test_still_object_keeps_one_track():
+    state, transitions = run(ObjectTracker(min_hits=2), [[100, 100, 150, 200]] * 10)
+    assert [track["id"] for track in state["tracks"]] == [1]
+    assert transitions == [("appeared", 1)]
+
+
+def test_moving_object_keeps_one_track():
+    boxes = [[100 + 10 * i, 100, 150 + 10 * i, 200] for i in range(10)]
+    state, transitions = run(ObjectTracker(min_hits=2), boxes)
+    assert [track["id"] for track in state["tracks"]] == [1]
+    assert transitions == [("appeared", 1)]
+
+
+def test_track_survives_skipped_runs_and_goes_after_misses():
+    tracker = ObjectTracker(min_hits=2, max_age=1.0, max_misses=2, report_interval=600.0)
+    state, _ = run(tracker, [[100, 100, 150, 200]] * 2)
+    # However long YOLO is skipped, nothing disappears
+    assert tracker.predict(state, 60.0) == []
+    assert len(state["tracks"]) == 1
+    assert tracker.update(state, [], confident, 60.5) == []
+    assert [(kind, track["id"]) for kind, track in tracker.update(state, [], confident, 61.0)] == [("gone", 1)]
+    assert state["tracks"] == []
@@ -0,0 +1,105 @@
+"""
+Check that an alternative object-detection engine matches the torch baseline.
+
+Runs the ultralytics/PyTorch baseline and a candidate engine over a reference
+image set and compares what ``ProctoringService`` would act on: detections of
+``target_objects`` that pass ``object_threshold_met``. For every image, the
+set of suspicious-object labels must be identical. Matched boxes (same label,
+IoU >= --iou) must agree in confidence within --conf-tolerance.
+
+    python -m tools.engine_parity --images reference_frames/ \\
+        --engine onnxruntime --model yolov8n-int8-dynamic.onnx
+
+Writes a JSON report to stdout and exits non-zero when parity fails.
+"""
+import argparse
+import json
+import sys
+
+import cv2
+
+from object_engines import OBJECT_ENGINES, create_object_engine
+from proctoring_service import ProctoringService
+from tools.export_detector import list_images
+
+
+def iou(a, b):
+    """Intersection over union of two [x1, y1, x2, y2] boxes"""
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def suspicious(service, objects):
+    """The detections analyze_frame would turn into suspicious_object events"""
+    return [o for o in objects if service.object_threshold_met(o["label"], o["confidence"])]
+
+
+def compare(baseline, candidate, iou_threshold):
+    """Greedy same-label IoU matching; returns (pairs, missed, extra)"""
+    unmatched = list(candidate)
+    pairs, missed = [], []
+    for expected in sorted(baseline, key=lambda o: -o["confidence"]):
+        best, best_iou = None, iou_threshold
+        for found in unmatched:
+            overlap = iou(expected["bbox"], found["bbox"])
+            if found["label"] == expected["label"] and overlap >= best_iou:
+                best, best_iou = found, overlap
+        if best is None:
+            missed.append(expected)
+        else:
+            unmatched.remove(best)
+            pairs.append((expected, best))
+    return pairs, missed, unmatched
+
+
+def main(args):
+    service = ProctoringService()
+    baseline_engine = create_object_engine("torch", args.baseline_model, args.confidence)
+    candidate_engine = create_object_engine(args.engine, args.model, args.confidence)
+
+    paths = list_images(args.images)
+    if not paths:
+        raise SystemExit(f"No images found in {args.images}")
+
+    report = {"engine": args.engine, "model": args.model, "images": 0, "label_mismatches": [],
+              "matched": 0, "missed": 0, "extra": 0, "max_confidence_delta": 0.0}
+    for path in paths:
+        frame = cv2.imread(path)
+        if frame is None:
+            continue
+        report["images"] += 1
+        baseline = suspicious(service, baseline_engine.detect_batch([frame])[0])
+        candidate = suspicious(service, candidate_engine.detect_batch([frame])[0])
+
+        pairs, missed, extra = compare(baseline, candidate, args.iou)
+        report["matched"] += len(pairs)
+        report["missed"] += len(missed)
+        report["extra"] += len(extra)
+        for expected, found in pairs:
+            delta = abs(expected["confidence"] - found["confidence"])
+            report["max_confidence_delta"] = max(report["max_confidence_delta"], delta)
+
+        expected_labels = sorted({o["label"] for o in baseline})
+        found_labels = sorted({o["label"] for o in candidate})
+        if expected_labels != found_labels:
+            report["label_mismatches"].append({"image": path, "baseline": expected_labels, "candidate": found_labels})
+
+    report["passed"] = (not report["label_mismatches"]
+                        and report["max_confidence_delta"] <= args.conf_tolerance)
+    print(json.dumps(report, indent=2))
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", required=True, help="Directory of reference frames")
+    parser.add_argument("--engine", choices=OBJECT_ENGINES, required=True)
+    parser.add_argument("--model", help="Candidate model path (default: the engine's default)")
+    parser.add_argument("--baseline-model", default="yolov8n.pt")
+    parser.add_argument("--confidence", type=float, default=0.3, help="Model confidence, as in analyze_frame")
+    parser.add_argument("--iou", type=float, default=0.5)
+    parser.add_argument("--conf-tolerance", type=float, default=0.05)
+    sys.exit(main(parser.parse_args()))
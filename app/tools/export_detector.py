@@ -0,0 +1,111 @@
+"""
+Export the YOLOv8 object detector for the non-torch CPU engines.
+
+    # ONNX (fp32, dynamic batch) for OBJECT_ENGINE=onnxruntime
+    python -m tools.export_detector --format onnx
+
+    # ONNX with INT8 weights, dynamic quantization (no calibration data needed)
+    python -m tools.export_detector --format onnx --int8 dynamic
+
+    # ONNX with static INT8 (QDQ) quantization calibrated on sample frames
+    python -m tools.export_detector --format onnx --int8 static --calibration-dir frames/
+
+    # OpenVINO IR, optionally INT8 via ultralytics/NNCF calibration
+    python -m tools.export_detector --format openvino [--int8 static --calibration-data coco8.yaml]
+
+Point OBJECT_MODEL_PATH at the printed path and set OBJECT_ENGINE to match,
+then check the result with ``python -m tools.engine_parity``.
+"""
+import argparse
+import glob
+import os
+
+import cv2
+
+from object_engines import OnnxRuntimeEngine
+
+IMAGE_EXTENSIONS = ("*.jpg", "*.jpeg", "*.png", "*.webp")
+
+
+def list_images(directory):
+    """All images in a directory (recursively), sorted for reproducibility"""
+    paths = []
+    for pattern in IMAGE_EXTENSIONS:
+        paths.extend(glob.glob(os.path.join(directory, "**", pattern), recursive=True))
+    return sorted(paths)
+
+
+def copy_metadata(source_path, target_path):
+    """Keep ultralytics' names/stride metadata on a quantized ONNX model"""
+    import onnx
+    source = onnx.load(source_path)
+    target = onnx.load(target_path)
+    del target.metadata_props[:]
+    target.metadata_props.extend(source.metadata_props)
+    onnx.save(target, target_path)
+
+
+class FrameCalibrationReader:
+    """onnxruntime CalibrationDataReader over a directory of frames"""
+
+    def __init__(self, model_path, image_dir, imgsz, limit):
+        import onnxruntime as ort
+        self.input_name = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+        self.preprocessor = OnnxRuntimeEngine(model_path, imgsz=imgsz)
+        self.paths = iter(list_images(image_dir)[:limit])
+
+    def get_next(self):
+        for path in self.paths:
+            frame = cv2.imread(path)
+            if frame is not None:
+                batch, _ = self.preprocessor.preprocess([frame])
+                # The engine reuses its batch buffer on the next call
+                return {self.input_name: batch.copy()}
+        return None
+
+
+def export_onnx(args):
+    from ultralytics import YOLO
+    fp32_path = YOLO(args.weights).export(format="onnx", imgsz=args.imgsz, dynamic=True, simplify=True)
+    if not args.int8:
+        return fp32_path
+
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_dynamic, quantize_static
+    int8_path = fp32_path.replace(".onnx", f"-int8-{args.int8}.onnx")
+    if args.int8 == "dynamic":
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QUInt8)
+    else:
+        if not args.calibration_dir:
+            raise SystemExit("--int8 static needs --calibration-dir")
+        reader = FrameCalibrationReader(fp32_path, args.calibration_dir, args.imgsz, args.calibration_limit)
+        quantize_static(fp32_path, int8_path, reader, quant_format=QuantFormat.QDQ,
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+    copy_metadata(fp32_path, int8_path)
+    return int8_path
+
+
+def export_openvino(args):
+    from ultralytics import YOLO
+    options = {"format": "openvino", "imgsz": args.imgsz, "dynamic": True}
+    if args.int8:
+        # ultralytics runs NNCF post-training (static) quantization on a dataset yaml
+        options.update(int8=True, data=args.calibration_data)
+    return YOLO(args.weights).export(**options)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weights", default="yolov8n.pt")
+    parser.add_argument("--format", choices=("onnx", "openvino"), required=True)
+    parser.add_argument("--int8", choices=("dynamic", "static"))
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--calibration-dir", help="Frames for ONNX static quantization")
+    parser.add_argument("--calibration-limit", type=int, default=200)
+    parser.add_argument("--calibration-data", default="coco8.yaml", help="Dataset yaml for OpenVINO INT8")
+    args = parser.parse_args()
+
+    if args.format == "openvino" and args.int8 == "dynamic":
+        parser.error("OpenVINO INT8 export only supports static quantization")
+
+    path = export_onnx(args) if args.format == "onnx" else export_openvino(args)
+    print(f"Exported detector: {path}")
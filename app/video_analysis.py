@@ -0,0 +1,225 @@
+"""
+Offline analysis of recorded interview videos, faster than real time.
+
+Frames are decoded lazily from the file (only the sampled ones are
+retrieved), long videos are split into time chunks analysed in parallel
+worker processes, and the per-chunk events are merged into one ordered
+timeline. All session timing runs on the video clock, so cooldowns and
+face/focus timeouts behave as they would have live.
+
+    cd app
+    python -m video_analysis ../server/temp/abc123_recording.webm --workers 4 --fps 5
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def iter_video_frames(path: str, start: float = 0.0, end: Optional[float] = None,
+                      sample_fps: Optional[float] = None) -> Iterator[Tuple[float, np.ndarray]]:
+    """Yield (seconds, BGR frame) from ``start`` to ``end``, at most ``sample_fps`` frames per second"""
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError(f"Could not open video {path}")
+    interval = 1.0 / sample_fps if sample_fps else 0.0
+    next_sample = start
+    try:
+        if start > 0:
+            capture.set(cv2.CAP_PROP_POS_MSEC, start * 1000.0)
+        # grab() only demuxes; frames are decoded by retrieve() when sampled
+        while capture.grab():
+            seconds = capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            if end is not None and seconds >= end:
+                break
+            if seconds < next_sample:
+                continue
+            ok, frame = capture.retrieve()
+            if not ok:
+                break
+            next_sample = max(next_sample + interval, seconds)
+            yield seconds, frame
+    finally:
+        capture.release()
+
+
+def video_duration(path: str) -> Optional[float]:
+    """Duration of the video in seconds, None if it cannot be read at all.
+
+    MediaRecorder webm files carry no duration in their metadata, so after
+    the container header this asks ffprobe for the last packet's timestamp,
+    and without ffprobe reads the video through to its last frame.
+    """
+    capture = cv2.VideoCapture(path)
+    try:
+        frames = capture.get(cv2.CAP_PROP_FRAME_COUNT)
+        fps = capture.get(cv2.CAP_PROP_FPS)
+    finally:
+        capture.release()
+    if frames > 0 and fps > 0:
+        return frames / fps
+    return _probe_duration(path) or _scan_duration(path)
+
+
+def _probe_duration(path: str) -> Optional[float]:
+    """Timestamp of the last video packet according to ffprobe (None without ffprobe)"""
+    if shutil.which("ffprobe") is None:
+        return None
+    try:
+        output = subprocess.run(
+            ["ffprobe", "-v", "error", "-select_streams", "v:0", "-show_entries", "packet=pts_time",
+             "-of", "csv=p=0", path],
+            capture_output=True, text=True, check=True, timeout=120,
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    times = [float(line.strip(",")) for line in output.splitlines() if line.strip(",") not in ("", "N/A")]
+    return max(times) if times else None
+
+
+def _scan_duration(path: str) -> Optional[float]:
+    """Position of the last frame, found by reading the whole video"""
+    capture = cv2.VideoCapture(path)
+    last = None
+    try:
+        while capture.grab():
+            last = capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+    finally:
+        capture.release()
+    return last
+
+
+def plan_chunks(duration: Optional[float], chunk_seconds: float) -> List[Tuple[float, Optional[float]]]:
+    """(start, end) windows covering the video; a single open window when the duration is unknown"""
+    if not duration or chunk_seconds <= 0 or duration <= chunk_seconds:
+        return [(0.0, None)]
+    chunks = []
+    start = 0.0
+    while start < duration:
+        end = start + chunk_seconds
+        chunks.append((start, end if end < duration else None))
+        start = end
+    return chunks
+
+
+def analyze_chunk(path: str, interview_id: str, start: float, end: Optional[float],
+                  sample_fps: Optional[float], warmup: float, start_time: float) -> Dict:
+    """Run one time window through a private ProctoringService (executed in a worker process).
+
+    Analysis begins ``warmup`` seconds before ``start`` so timers that span the
+    chunk boundary are already running; events from the warm-up are dropped.
+    """
+    return asyncio.run(_analyze_chunk(path, interview_id, start, end, sample_fps, warmup, start_time))
+
+
+async def _analyze_chunk(path, interview_id, start, end, sample_fps, warmup, start_time):
+    from proctoring_service import ProctoringService
+
+    # One inline pipeline per chunk process; parallelism comes from the chunks
+    service = ProctoringService(inference_mode="inline", inference_workers=1)
+    await service.initialize()
+    events, frames = [], 0
+    try:
+        for seconds, frame in iter_video_frames(path, max(0.0, start - warmup), end, sample_fps):
+            frame_events = await service.analyze_frame(frame, interview_id, timestamp=start_time + seconds)
+            frames += 1
+            if seconds >= start:
+                events.extend(frame_events)
+        await service.end_session(interview_id)
+    finally:
+        await service.cleanup()
+    return {"start": start, "end": end, "frames": frames, "events": events}
+
+
+def event_key(event: Dict) -> str:
+    """Key under which duplicate events across chunk boundaries are collapsed"""
+    if event["eventType"].startswith("suspicious_object"):
+        # One key per object and track lifecycle step (appeared / present / gone)
+        return f"{event['eventType']}_{event['metadata'].get('object')}_{event['metadata'].get('lifecycle')}"
+    return event["eventType"]
+
+
+def merge_timeline(chunk_results: List[Dict], cooldown: float, start_time: float = 0.0) -> List[Dict]:
+    """Order events from every chunk by time and re-apply the cooldown across chunk boundaries"""
+    events = sorted((event for result in chunk_results for event in result["events"]),
+                    key=lambda event: event["timestamp"])
+    timeline, last_sent = [], {}
+    for event in events:
+        key = event_key(event)
+        if event["timestamp"] - last_sent.get(key, float("-inf")) < cooldown:
+            continue
+        last_sent[key] = event["timestamp"]
+        timeline.append(dict(event, video_time=event["timestamp"] - start_time))
+    return timeline
+
+
+def analyze_video(path: str, interview_id: str = "recording", workers: Optional[int] = None,
+                  chunk_seconds: float = 60.0, sample_fps: Optional[float] = 5.0,
+                  warmup: Optional[float] = None, start_time: float = 0.0) -> Dict:
+    """Analyse a recorded video and return its merged event timeline.
+
+    Event timestamps are ``start_time`` plus the video time in seconds; pass
+    the recording's start as a Unix time to get wall-clock timestamps.
+    """
+    from proctoring_service import ProctoringService
+
+    # Only read for its timing settings; no models are loaded in this process
+    defaults = ProctoringService(inference_mode="inline", inference_workers=1)
+    if warmup is None:
+        # Long enough for face/focus timeouts to be armed when a chunk starts
+        warmup = max(defaults.face_timeout, defaults.focus_timeout) + defaults.event_cooldown
+
+    duration = video_duration(path)
+    chunks = plan_chunks(duration, chunk_seconds)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(chunks)))
+    began = time.perf_counter()
+    args = [(path, interview_id, start, end, sample_fps, warmup, start_time) for start, end in chunks]
+    # Always in spawned processes, even for one chunk: the caller may be the API server,
+    # which must not load a second model set; spawn never forks a process holding model threads
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        results = list(executor.map(analyze_chunk, *zip(*args)))
+    elapsed = time.perf_counter() - began
+
+    return {
+        "interview_id": interview_id,
+        "duration": duration,
+        "chunks": len(chunks),
+        "workers": workers,
+        "frames_analyzed": sum(result["frames"] for result in results),
+        "elapsed": elapsed,
+        "speedup": duration / elapsed if duration and elapsed > 0 else None,
+        "events": merge_timeline(results, defaults.event_cooldown, start_time),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video", help="Recorded video file (webm, mp4, ...)")
+    parser.add_argument("--interview-id", default="recording")
+    parser.add_argument("--workers", type=int, help="Parallel chunk processes (default: CPU count)")
+    parser.add_argument("--chunk-seconds", type=float, default=60.0)
+    parser.add_argument("--fps", type=float, default=5.0, help="Frames analysed per second of video, 0 = all")
+    parser.add_argument("--start-time", type=float, default=0.0, help="Unix time of the first video frame")
+    parser.add_argument("--output", help="Write the JSON result here as well as to stdout")
+    args = parser.parse_args()
+
+    result = analyze_video(args.video, args.interview_id, args.workers, args.chunk_seconds,
+                           args.fps or None, start_time=args.start_time)
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import asyncio
+import hashlib
+from typing import Dict, List, Optional
+
+import httpx
+
+
+def rendezvous_owner(key: str, nodes: List[str]) -> str:
+    """Highest-random-weight owner of ``key``: removing a node only moves that node's keys"""
+    return max(nodes, key=lambda node: hashlib.blake2b(f"{node}|{key}".encode(), digest_size=8).digest())
+
+
+class WorkerRouter:
+    """Consistent ownership of interviews across worker processes or nodes.
+
+    ``nodes`` are the base URLs of every worker (as clients reach them) and
+    ``self_url`` is this worker's entry. An interview belongs to the live
+    node that wins rendezvous hashing on its id; the others redirect its
+    stream and REST calls there. Peers are probed on ``/ready``; after
+    ``failure_threshold`` failed probes in a row a peer is skipped, so its
+    interviews fail over to their next-ranked node, which picks up their
+    timing and cooldown state from the shared session store.
+    """
+
+    def __init__(self, nodes: List[str], self_url: Optional[str] = None, health_interval: float = 2.0,
+                 failure_threshold: int = 2):
+        self.nodes = [node.rstrip("/") for node in nodes if node.strip()]
+        self.self_url = (self_url or "").rstrip("/")
+        if self.nodes and self.self_url not in self.nodes:
+            raise ValueError(f"WORKER_SELF '{self_url}' is not one of WORKER_NODES {self.nodes}")
+        self.health_interval = health_interval
+        self.failure_threshold = failure_threshold
+        self.failures: Dict[str, int] = {node: 0 for node in self.nodes}
+        self.client: Optional[httpx.AsyncClient] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return len(self.nodes) > 1
+
+    def live_nodes(self) -> List[str]:
+        return [node for node in self.nodes
+                if node == self.self_url or self.failures[node] < self.failure_threshold]
+
+    def owner(self, interview_id: str) -> str:
+        if not self.enabled:
+            return self.self_url
+        return rendezvous_owner(interview_id, self.live_nodes())
+
+    def is_local(self, interview_id: str) -> bool:
+        return not self.enabled or self.owner(interview_id) == self.self_url
+
+    async def start(self):
+        if not self.enabled:
+            return
+        self.client = httpx.AsyncClient(timeout=httpx.Timeout(self.health_interval))
+        self.task = asyncio.create_task(self._probe_peers())
+        print(f"🧭 Routing interviews across {len(self.nodes)} nodes (this one: {self.self_url})")
+
+    async def _probe_peers(self):
+        peers = [node for node in self.nodes if node != self.self_url]
+        while True:
+            results = await asyncio.gather(*(self._probe(peer) for peer in peers))
+            for peer, healthy in zip(peers, results):
+                was_live = self.failures[peer] < self.failure_threshold
+                self.failures[peer] = 0 if healthy else self.failures[peer] + 1
+                is_live = self.failures[peer] < self.failure_threshold
+                if was_live != is_live:
+                    print(f"🧭 Node {peer} is {'back' if is_live else 'down'}; its interviews "
+                          f"{'return to it' if is_live else 'fail over'}")
+            await asyncio.sleep(self.health_interval)
+
+    async def _probe(self, peer: str) -> bool:
+        try:
+            # Ready, not just alive: a node still loading models cannot take streams
+            response = await self.client.get(f"{peer}/ready")
+            return response.status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    def status(self) -> Dict:
+        return {
+            "self": self.self_url,
+            "nodes": {node: node in self.live_nodes() for node in self.nodes},
+        }
+
+    async def close(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+        if self.client:
+            await self.client.aclose()
+            self.client = None
@@ -36,6 +36,8 @@ const EventLog = ({ events = [] }) => {
         return <Users {...iconProps} className="w-4 h-4 text-red-600 dark:text-red-400" />;
       case 'suspicious_object':
         return <Smartphone {...iconProps} className="w-4 h-4 text-red-600 dark:text-red-400" />;
+      case 'suspicious_object_gone':
+        return <Smartphone {...iconProps} className="w-4 h-4 text-green-600 dark:text-green-400" />;
       case 'eye_closure':
         return <Eye {...iconProps} className="w-4 h-4 text-orange-600 dark:text-orange-400" />;
       case 'drowsiness':
@@ -182,6 +184,7 @@ const EventLog = ({ events = [] }) => {
             <option value="face_missing">Face Missing</option>
             <option value="multiple_faces">Multiple Faces</option>
             <option value="suspicious_object">Suspicious Objects</option>
+            <option value="suspicious_object_gone">Objects Removed</option>
             <option value="eye_closure">Eye Closure</option>
             <option value="audio_detected">Audio Detected</option>
           </select>
@@ -1,10 +1,20 @@
 import React, { useState, useRef, useEffect } from 'react';
 import { BACKEND_URL } from '../utils/config';
+import { helloMessage, encodeBinaryFrame, canvasToBlob } from '../utils/frameProtocol';
 const VideoStream = ({ interviewId, pythonServiceUrl, onError, onEvent, isActive }) => {
   const videoRef = useRef(null);
   const canvasRef = useRef(null);
   const wsRef = useRef(null);
   const intervalRef = useRef(null);
+  const binaryProtocolRef = useRef(false);
+  const frameSeqRef = useRef(0);
+  const frameTimerRef = useRef(null);
+  // Capture settings pushed by the ML service ("control" messages); credits=null means no flow control
+  const captureSettingsRef = useRef({ fps: 1, width: 640, height: 480, quality: 0.7, credits: null });
+  const inFlightRef = useRef([]);
+  const lastAckRef = useRef(0);
+  // Stream URL of the ML node that owns this interview, when the service redirected us
+  const redirectUrlRef = useRef(null);
   const [stream, setStream] = useState(null);
   const [error, setError] = useState(null);
 
@@ -106,16 +116,21 @@ const VideoStream = ({ interviewId, pythonServiceUrl, onError, onEvent, isActive
     }
 
     try {
-      const wsUrl = `${pythonServiceUrl.replace('http', 'ws')}/stream/${interviewId}`;
+      const wsUrl = redirectUrlRef.current || `${pythonServiceUrl.replace('http', 'ws')}/stream/${interviewId}`;
       console.log('🔌 Connecting to Python ML service:', wsUrl);
       console.log('🔍 Interview ID:', interviewId);
       console.log('🔍 Python Service URL:', pythonServiceUrl);
       
       const ws = new WebSocket(wsUrl);
+      ws.binaryType = 'arraybuffer';
       wsRef.current = ws;
+      binaryProtocolRef.current = false;
+      inFlightRef.current = [];
 
       ws.onopen = () => {
         console.log('✅ Connected to Python ML service');
+        // Ask for the binary frame protocol; JSON/base64 stays in use until acknowledged
+        ws.send(helloMessage());
         console.log('🔍 WebSocket URL:', wsUrl);
         console.log('🔍 WebSocket readyState:', ws.readyState);
         startStreaming();
@@ -125,6 +140,30 @@ const VideoStream = ({ interviewId, pythonServiceUrl, onError, onEvent, isActive
         try {
           const data = JSON.parse(event.data);
           console.log('📨 Received from ML service:', data);
+          if (data.type === 'redirect') {
+            console.log('🧭 Interview is served by another ML node:', data.url);
+            redirectUrlRef.current = data.url;
+            return;
+          }
+          if (data.type === 'hello_ack') {
+            binaryProtocolRef.current = data.protocol === 'binary';
+            return;
+          }
+          if (data.type === 'control') {
+            captureSettingsRef.current = {
+              fps: data.fps,
+              width: data.width,
+              height: data.height,
+              quality: data.quality,
+              credits: data.credits
+            };
+            return;
+          }
+          if (data.ack !== undefined && data.ack !== null) {
+            // Every frame up to the acknowledged one was processed or dropped
+            inFlightRef.current = inFlightRef.current.filter(seq => seq > data.ack);
+            lastAckRef.current = Date.now();
+          }
           if (data.type === 'events' && data.events) {
             console.log('🎯 ML Events:', data.events);
             // Forward events to parent component
@@ -151,6 +190,17 @@ const VideoStream = ({ interviewId, pythonServiceUrl, onError, onEvent, isActive
 
       ws.onclose = (event) => {
         console.log('🔌 WebSocket connection closed:', event.code, event.reason);
+        if (event.code === 4307 && redirectUrlRef.current) {
+          // Redirected to the owning node: reconnect there right away
+          if (frameTimerRef.current) {
+            clearTimeout(frameTimerRef.current);
+            frameTimerRef.current = null;
+          }
+          connectToPythonService();
+          return;
+        }
+        // Anything else: go back through the entry URL, which routes to a live node
+        redirectUrlRef.current = null;
         // Attempt to reconnect after 3 seconds
         if (event.code !== 1000) { // Not a normal closure
           console.log('🔄 Attempting to reconnect in 3 seconds...');
@@ -219,10 +269,32 @@ const VideoStream = ({ interviewId, pythonServiceUrl, onError, onEvent, isActive
     }
 
     console.log('🎥 Starting video streaming...');
-    // Simple, stable streaming - send frames every 1 second
-    intervalRef.current = setInterval(() => {
-      captureAndSendFrame();
-    }, 1000);
+    // Frame rate follows the service's recommendation (1 fps until it sends one)
+    const scheduleNextFrame = () => {
+      const { fps } = captureSettingsRef.current;
+      frameTimerRef.current = setTimeout(() => {
+        captureAndSendFrame();
+        scheduleNextFrame();
+      }, 1000 / Math.max(fps, 0.1));
+    };
+    if (frameTimerRef.current) {
+      clearTimeout(frameTimerRef.current);
+    }
+    scheduleNextFrame();
+  };
+
+  // Whether a frame may be sent now: frames in flight must stay within the granted credits
+  const hasFrameCredit = () => {
+    const { credits } = captureSettingsRef.current;
+    if (!credits || inFlightRef.current.length < credits) {
+      return true;
+    }
+    // Acks lost (e.g. across a reconnect): start over rather than stall for good
+    if (Date.now() - lastAckRef.current > 5000) {
+      inFlightRef.current = [];
+      return true;
+    }
+    return false;
   };
 
   const startDirectStreaming = () => {
@@ -284,6 +356,11 @@ const VideoStream = ({ interviewId, pythonServiceUrl, onError, onEvent, isActive
       return;
     }
 
+    if (!hasFrameCredit()) {
+      console.log('⏸️ Waiting for frame acks from ML service');
+      return;
+    }
+
     console.log('📸 Capturing video frame...');
 
     try {
@@ -291,9 +368,8 @@ const VideoStream = ({ interviewId, pythonServiceUrl, onError, onEvent, isActive
       const video = videoRef.current;
       const ctx = canvas.getContext('2d');
 
-      // Use higher resolution for ML model analysis
-      const maxWidth = 640;
-      const maxHeight = 480;
+      // Resolution and quality recommended by the ML service
+      const { width: maxWidth, height: maxHeight, quality } = captureSettingsRef.current;
       const videoWidth = video.videoWidth;
       const videoHeight = video.videoHeight;
       
@@ -319,16 +395,34 @@ const VideoStream = ({ interviewId, pythonServiceUrl, onError, onEvent, isActive
       // Draw video frame to canvas with scaling
       ctx.drawImage(video, 0, 0, canvasWidth, canvasHeight);
 
+      // Binary protocol: send raw JPEG bytes with a small header
+      if (binaryProtocolRef.current && wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
+        const capturedAt = Date.now();
+        const seq = frameSeqRef.current++;
+        inFlightRef.current.push(seq);
+        canvasToBlob(canvas, 'image/jpeg', quality)
+          .then((blob) => encodeBinaryFrame(blob, seq, capturedAt))
+          .then((frame) => {
+            if (wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
+              wsRef.current.send(frame);
+            }
+          })
+          .catch((err) => console.error('Error encoding binary frame:', err));
+        return;
+      }
+
       // Convert canvas to base64 with better quality for ML analysis
-      const imageData = canvas.toDataURL('image/jpeg', 0.7); // Higher quality for ML model
+      const imageData = canvas.toDataURL('image/jpeg', quality);
       const base64Data = imageData.split(',')[1];
 
       // Send to Python service for ML analysis
       if (wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
         const message = {
           image: base64Data,
+          seq: frameSeqRef.current++,
           timestamp: Date.now()
         };
+        inFlightRef.current.push(message.seq);
         console.log('📤 Sending frame to Python ML service');
         console.log('🔍 WebSocket readyState:', wsRef.current.readyState);
         console.log('🔍 Message size:', JSON.stringify(message).length, 'bytes');
@@ -359,6 +453,11 @@ const VideoStream = ({ interviewId, pythonServiceUrl, onError, onEvent, isActive
       console.log('✅ Cleared streaming interval');
     }
 
+    if (frameTimerRef.current) {
+      clearTimeout(frameTimerRef.current);
+      frameTimerRef.current = null;
+    }
+
     if (stream) {
       console.log('🛑 Stopping media tracks...');
       stream.getTracks().forEach(track => {
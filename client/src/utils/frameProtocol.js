@@ -0,0 +1,33 @@
+// Binary frame protocol for the Python ML service /stream WebSocket.
+// Mirrors app/frame_protocol.py: a 16-byte big-endian header followed by the
+// encoded image bytes, which saves the base64 overhead of the JSON protocol.
+//
+//   magic 'PF' (2 bytes) | version u8 | format u8 | seq u32 | captured f64 (ms)
+
+export const FRAME_VERSION = 1;
+export const FRAME_FORMAT_JPEG = 1;
+export const FRAME_FORMAT_WEBP = 2;
+const HEADER_SIZE = 16;
+
+export const helloMessage = () => JSON.stringify({
+  type: 'hello',
+  protocol: 'binary',
+  version: FRAME_VERSION
+});
+
+export const encodeBinaryFrame = async (blob, seq, capturedAt, format = FRAME_FORMAT_JPEG) => {
+  const image = new Uint8Array(await blob.arrayBuffer());
+  const frame = new Uint8Array(HEADER_SIZE + image.length);
+  const view = new DataView(frame.buffer);
+  view.setUint8(0, 0x50); // 'P'
+  view.setUint8(1, 0x46); // 'F'
+  view.setUint8(2, FRAME_VERSION);
+  view.setUint8(3, format);
+  view.setUint32(4, seq >>> 0);
+  view.setFloat64(8, capturedAt);
+  frame.set(image, HEADER_SIZE);
+  return frame.buffer;
+};
+
+export const canvasToBlob = (canvas, type = 'image/jpeg', quality = 0.7) =>
+  new Promise((resolve) => canvas.toBlob(resolve, type, quality));
@@ -13,7 +13,7 @@ const eventSchema = new mongoose.Schema({
   eventType: {
     type: String,
     required: true,
-    enum: ['focus_lost', 'face_missing', 'multiple_faces', 'suspicious_object', 'eye_closure', 'drowsiness', 'audio_detected']
+    enum: ['focus_lost', 'face_missing', 'multiple_faces', 'suspicious_object', 'suspicious_object_gone', 'eye_closure', 'drowsiness', 'audio_detected']
   },
   message: {
     type: String,
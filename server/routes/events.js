@@ -46,4 +46,42 @@ router.post('/:id', async (req, res) => {
   }
 });
 
+// Bulk events endpoint for ML service (coalesced per interview)
+router.post('/:id/bulk', async (req, res) => {
+  try {
+    const { id } = req.params;
+    const events = Array.isArray(req.body.events) ? req.body.events : [];
+
+    if (events.length === 0) {
+      return res.status(400).json({ error: 'No events provided' });
+    }
+
+    console.log(`📊 Received ${events.length} events for interview ${id}`);
+
+    // Store all events in one round-trip
+    await Event.insertMany(events.map(eventData => ({
+      interviewId: id,
+      eventType: eventData.eventType,
+      message: eventData.message,
+      severity: eventData.severity,
+      metadata: eventData.metadata,
+      timestamp: new Date(eventData.timestamp * 1000) // Convert from Unix timestamp
+    })));
+    console.log(`✅ ${events.length} events saved to database for interview ${id}`);
+
+    // Forward events to interviewer via Socket.IO
+    const io = req.app.get('io');
+    if (io) {
+      events.forEach(eventData => io.to(id).emit('proctoring-event', eventData));
+    } else {
+      console.error('❌ Socket.IO instance not available');
+    }
+
+    res.json({ success: true, count: events.length });
+  } catch (error) {
+    console.error('❌ Error handling bulk events:', error);
+    res.status(500).json({ error: 'Failed to handle events' });
+  }
+});
+
 export default router;